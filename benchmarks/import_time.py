@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""
+Measure how long ``import fretboard2`` takes in a fresh interpreter.
+
+Each run starts a new python process and times only the import itself
+(not interpreter startup). The script exits non-zero if the median import
+time exceeds the budget, or if any of the heavy, lazily-loaded
+dependencies get imported along with the package.
+
+    python benchmarks/import_time.py [--runs 20] [--budget 15]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# Dependencies that must not be imported by `import fretboard2` itself
+LAZY_MODULES = ("svgwrite", "yaml", "attrdict")
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import fretboard2
+elapsed = time.perf_counter() - start
+loaded = [m for m in {lazy!r} if m in sys.modules]
+print(elapsed, ",".join(loaded))
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(runs):
+    """Return a list of import timings (in seconds) and any eagerly-loaded modules"""
+    timings = []
+    loaded = set()
+    probe = PROBE.format(lazy=LAZY_MODULES)
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", probe],
+            cwd=ROOT,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        elapsed, _, modules = result.stdout.strip().partition(" ")
+        timings.append(float(elapsed))
+        loaded.update(m for m in modules.split(",") if m)
+    return timings, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20, help="number of imports")
+    parser.add_argument(
+        "--budget", type=float, default=15.0, help="maximum median import time (ms)"
+    )
+    args = parser.parse_args()
+
+    # make sure we're timing the import, not compiling bytecode
+    subprocess.run(
+        [sys.executable, "-m", "compileall", "-q", os.path.join(ROOT, "fretboard2")],
+        check=True,
+    )
+
+    timings, loaded = measure(args.runs)
+    median = statistics.median(timings) * 1000
+    print(
+        f"import fretboard2: median {median:.2f}ms, "
+        f"min {min(timings) * 1000:.2f}ms, max {max(timings) * 1000:.2f}ms "
+        f"over {args.runs} runs (budget {args.budget:.2f}ms)"
+    )
+
+    failed = False
+    if loaded:
+        print(f"FAIL: imported eagerly: {', '.join(sorted(loaded))}")
+        failed = True
+    if median > args.budget:
+        print("FAIL: import time is over budget")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+"""
+Measure how much memory fretboards and chords hold on to.
+
+Builds a batch of diagrams (full-neck scale fretboards, and drawn chord
+diagrams) and reports the bytes allocated per diagram, as traced by
+tracemalloc. Diagrams are kept alive, as a render service holding a batch
+of them would, but not rendered.
+
+For comparison it also measures the per-string and per-marker records
+as they used to be stored, as one AttrDict each (if attrdict is installed),
+against the String records and Markers columns used now.
+
+    python benchmarks/memory.py [--count 2000]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fretboard2 import GuitarChord, GuitarFretboard  # noqa: E402
+from fretboard2.markers import Markers, String  # noqa: E402
+
+SCALE = ("1", "2", "b3", "4", "5", "b6", "b7")
+CHORDS = ("xx0232", "x32010", "133211", "320003", "x02210", "x-x-12-12-12-x")
+
+
+def traced(build, count):
+    """Bytes allocated (and still held) per item by build(), over count items"""
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    items = [build(index) for index in range(count)]
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del items
+    return used / count
+
+
+def scale_fretboard(index):
+    fb = GuitarFretboard(frets=(0, 12))
+    fb.add_notes(SCALE, root=index % 12, label="interval")
+    return fb
+
+
+def chord(index):
+    diagram = GuitarChord(positions=CHORDS[index % len(CHORDS)], fingers="-1234-")
+    diagram.draw()
+    return diagram
+
+
+def scale_records():
+    """The positions and labels scale_fretboard() marks, to build records from"""
+    fb = scale_fretboard(0)
+    return list(fb.markers)
+
+
+def attrdict_records(markers):
+    import attrdict
+
+    def build(index):
+        strings = [
+            attrdict.AttrDict({"color": None, "label": None, "font_color": None})
+            for _ in range(6)
+        ]
+        records = [
+            attrdict.AttrDict(
+                {
+                    "fret": marker.fret,
+                    "string": marker.string,
+                    "color": marker.color,
+                    "label": marker.label,
+                    "font_color": marker.font_color,
+                }
+            )
+            for marker in markers
+        ]
+        return strings, records
+
+    return build
+
+
+def slots_records(markers):
+    def build(index):
+        strings = [String() for _ in range(6)]
+        records = Markers()
+        records.extend(
+            [marker.string for marker in markers],
+            [marker.fret for marker in markers],
+            labels=[marker.label for marker in markers],
+        )
+        return strings, records
+
+    return build
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--count", type=int, default=2000, help="number of diagrams to build"
+    )
+    args = parser.parse_args()
+
+    markers = scale_records()
+    print(f"scale fretboard ({len(markers)} markers): ", end="")
+    print(f"{traced(scale_fretboard, args.count):,.0f} bytes/diagram")
+    print(f"drawn chord: {traced(chord, args.count):,.0f} bytes/diagram")
+
+    print(f"string and marker records, for a {len(markers)} marker scale:")
+    try:
+        import attrdict  # noqa: F401
+    except ImportError:
+        print("  AttrDict:        (attrdict is not installed)")
+    else:
+        before = traced(attrdict_records(markers), args.count)
+        print(f"  AttrDict:        {before:,.0f} bytes/diagram")
+    after = traced(slots_records(markers), args.count)
+    print(f"  String, Markers: {after:,.0f} bytes/diagram")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
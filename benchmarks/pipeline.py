@@ -0,0 +1,310 @@
+#!/usr/bin/env python
+"""
+Time each stage of the chord and fretboard render pipeline.
+
+Stages are timed separately, for chords on every instrument, in both
+orientations, in open and high positions, and for full-neck fretboards
+with a marker on every position:
+
+    compile_style      compiling a style override, uncached (per orientation)
+    init               Chord(...) (parsing positions, looking up the style),
+                       or Fretboard(...) and add_notes()
+    draw               Chord.draw() (building the fretboard and its markers)
+    calculate_layout   Fretboard.calculate_layout()
+    draw_*             each of the Fretboard.draw_* methods
+    render             render() to a string
+    save               save() to a file
+
+Results are written as JSON, with --output, and can be compared against a
+baseline from an earlier run; regressions beyond a threshold are listed,
+and make the script exit non-zero:
+
+    python benchmarks/pipeline.py --output baseline.json
+    ... make changes ...
+    python benchmarks/pipeline.py --compare baseline.json [--threshold 10]
+    python benchmarks/pipeline.py --compare baseline.json --against new.json
+
+Timings are the fastest of several repeats (the least disturbed by
+whatever else the machine is doing), per call.
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import fretboard2  # noqa: E402
+from fretboard2 import style as style_module  # noqa: E402
+from fretboard2.backends import get_backend  # noqa: E402
+from fretboard2.chord import BassChord, GuitarChord, UkuleleChord  # noqa: E402
+from fretboard2.fretboard import (  # noqa: E402
+    BassFretboard,
+    GuitarFretboard,
+    UkuleleFretboard,
+)
+
+ORIENTATIONS = ("portrait", "landscape")
+
+# changes smaller than this (in seconds) are noise, however big in percent
+NOISE_FLOOR = 1e-6
+
+# instrument -> (chord class, open chord, high chord), as (positions, fingers)
+CHORDS = {
+    "guitar": (GuitarChord, ("x32010", "-32-1-"), ("x-15-14-12-13-12", "-43121")),
+    "bass": (BassChord, ("x221", "-321"), ("x-7-9-9", "-134")),
+    "ukulele": (UkuleleChord, ("0003", "---3"), ("7-7-7-10", "1114")),
+}
+
+# instrument -> (fretboard class, frets shown)
+FRETBOARDS = {
+    "guitar": (GuitarFretboard, (0, 24)),
+    "bass": (BassFretboard, (0, 24)),
+    "ukulele": (UkuleleFretboard, (0, 15)),
+}
+
+NOTES = ("C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B")
+
+DRAW_METHODS = (
+    "draw_background",
+    "draw_frets",
+    "draw_inlays",
+    "draw_fret_label",
+    "draw_strings",
+    "draw_nut",
+    "draw_markers",
+    "draw_title",
+)
+
+
+def orientation_style(orientation):
+    return {"drawing": {"orientation": orientation}}
+
+
+def chord_scenarios():
+    """(name, make a chord) for every chord benchmarked"""
+    for instrument, (cls, *shapes) in CHORDS.items():
+        for position, (positions, fingers) in zip(("open", "high"), shapes):
+            for orientation in ORIENTATIONS:
+                style = orientation_style(orientation)
+
+                def make(cls=cls, positions=positions, fingers=fingers, style=style):
+                    return cls(positions, fingers, title="X", style=style)
+
+                yield f"{instrument}-chord-{position}-{orientation}", make
+
+
+def fretboard_scenarios():
+    """(name, make a fretboard) for every fretboard benchmarked"""
+    for instrument, (cls, frets) in FRETBOARDS.items():
+        for orientation in ORIENTATIONS:
+            style = orientation_style(orientation)
+
+            def make(cls=cls, frets=frets, style=style):
+                fretboard = cls(frets=frets, title="Chromatic", style=style)
+                fretboard.add_notes(NOTES, label="note")
+                return fretboard
+
+            yield f"{instrument}-neck-{orientation}", make
+
+
+def drawn(fretboard, backend):
+    """A fretboard with a fresh drawing and its layout, ready for draw_*()"""
+    fretboard.drawing = get_backend(backend)(
+        (fretboard.style.drawing.width, fretboard.style.drawing.height)
+    )
+    fretboard.calculate_layout()
+    return fretboard
+
+
+def stages(name, make, backend, directory):
+    """
+    Yield (stage, setup, call) for each stage of a scenario; setup() is run
+    before each batch of timed calls, and returns the object call() takes
+    """
+    is_chord = "-chord-" in name
+    yield "init", lambda: None, lambda _: make()
+
+    def fretboard():
+        if is_chord:
+            chord = make()
+            chord.draw()
+            return chord.fretboard
+        return make()
+
+    if is_chord:
+        yield "draw", make, lambda chord: chord.draw()
+    yield "calculate_layout", fretboard, lambda fb: fb.calculate_layout()
+    for method in DRAW_METHODS:
+        yield (
+            method,
+            lambda: drawn(fretboard(), backend),
+            lambda fb, method=method: getattr(fb, method)(),
+        )
+
+    filename = os.path.join(directory, f"{name}.svg")
+    yield "render", make, lambda diagram: diagram.render(backend=backend)
+    yield "save", make, lambda diagram: diagram.save(filename, backend=backend)
+
+
+def compile_uncached(orientation):
+    """Compile a style override, as if for the first time"""
+    style_module._cache.clear()
+    style_module.compile_style(orientation_style(orientation))
+
+
+def measure(setup, call, repeat, min_time):
+    """The fastest time per call (in seconds), over repeat batches"""
+    subject = setup()
+    timer = timeit.Timer(lambda: call(subject))
+    # calls per batch, enough to take min_time
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    times = []
+    for _ in range(repeat):
+        subject = setup()
+        timer = timeit.Timer(lambda: call(subject))
+        times.append(timer.timeit(number) / number)
+    return {
+        "best": min(times),
+        "median": statistics.median(times),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def run(backends, repeat, min_time, pattern=None, verbose=True):
+    results = {}
+
+    def record(key, setup, call):
+        if pattern is not None and not re.search(pattern, key):
+            return
+        results[key] = measure(setup, call, repeat, min_time)
+        if verbose:
+            print(f"{key:<58} {results[key]['best'] * 1e6:>10.1f} us")
+
+    for orientation in ORIENTATIONS:
+        record(
+            f"style-{orientation}/compile_style",
+            lambda orientation=orientation: orientation,
+            compile_uncached,
+        )
+
+    scenarios = list(chord_scenarios()) + list(fretboard_scenarios())
+    with tempfile.TemporaryDirectory() as directory:
+        for backend in backends:
+            for name, make in scenarios:
+                for stage, setup, call in stages(name, make, backend, directory):
+                    record(f"{name}/{stage}[{backend}]", setup, call)
+    return {
+        "meta": {
+            "fretboard2": fretboard2.__version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold, pattern=None):
+    """
+    Print each timing against the baseline's, and return the keys which got
+    slower by more than threshold percent (and NOISE_FLOOR)
+    """
+    regressions = []
+    before = baseline["results"]
+    after = current["results"]
+    for key in sorted(before.keys() & after.keys()):
+        old = before[key]["best"]
+        new = after[key]["best"]
+        change = (new - old) / old * 100 if old else 0.0
+        flag = ""
+        if abs(new - old) < NOISE_FLOOR:
+            pass
+        elif change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(key)
+        elif change < -threshold:
+            flag = "  faster"
+        print(
+            f"{key:<58} {old * 1e6:>10.1f} -> {new * 1e6:>10.1f} us "
+            f"{change:>+7.1f}%{flag}"
+        )
+    for key in sorted(before.keys() - after.keys()):
+        if pattern is not None and not re.search(pattern, key):
+            continue
+        print(f"{key:<58} (missing from the new results)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-o", "--output", help="write the results to a JSON file")
+    parser.add_argument(
+        "--backend",
+        action="append",
+        help="backend to render with, may be repeated (default: string)",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="timed batches per stage (default: 5)"
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.05,
+        help="seconds each batch should take (default: 0.05)",
+    )
+    parser.add_argument(
+        "-k", "--filter", help="only run benchmarks whose name matches this regex"
+    )
+    parser.add_argument("--compare", metavar="BASELINE", help="baseline JSON file")
+    parser.add_argument(
+        "--against",
+        metavar="RESULTS",
+        help="compare these results with the baseline, rather than running",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="percent slower that counts as a regression (default: 10)",
+    )
+    args = parser.parse_args()
+
+    if args.against:
+        with open(args.against) as fd:
+            current = json.load(fd)
+    else:
+        current = run(
+            args.backend or ["string"],
+            args.repeat,
+            args.min_time,
+            args.filter,
+            verbose=not args.compare,
+        )
+        if args.output:
+            with open(args.output, "w") as fd:
+                json.dump(current, fd, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as fd:
+            baseline = json.load(fd)
+        regressions = compare(baseline, current, args.threshold, args.filter)
+        if regressions:
+            print(f"FAIL: {len(regressions)} regressed by over {args.threshold:g}%")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
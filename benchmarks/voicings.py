@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""
+Time find_voicings over every root and chord quality, on a full neck.
+
+The search for all twelve roots of every quality in fretboard2.theory is
+timed, fastest of several repeats, for each instrument. The script exits
+non-zero if any instrument's search takes longer than the budget.
+
+    python benchmarks/voicings.py [--frets 0 24] [--repeats 5] [--budget 750]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fretboard2.chord import BassChord, GuitarChord, UkuleleChord  # noqa: E402
+from fretboard2.theory import CHORD_QUALITIES  # noqa: E402
+from fretboard2.voicings import find_voicings  # noqa: E402
+
+INSTRUMENTS = {"guitar": GuitarChord, "bass": BassChord, "ukulele": UkuleleChord}
+
+
+def measure(chord_cls, frets, repeats):
+    """The fastest time (in seconds) to search every chord, and the voicings found"""
+    best = None
+    for _ in range(repeats):
+        found = 0
+        start = time.perf_counter()
+        for intervals in CHORD_QUALITIES.values():
+            for root in range(12):
+                found += len(find_voicings(chord_cls, (root, intervals), frets=frets))
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--frets",
+        type=int,
+        nargs=2,
+        default=(0, 24),
+        metavar=("FIRST", "LAST"),
+        help="the window of frets to search",
+    )
+    parser.add_argument("--repeats", type=int, default=5, help="searches to time")
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=750.0,
+        help="maximum time to search every chord on an instrument (ms)",
+    )
+    args = parser.parse_args()
+    frets = tuple(args.frets)
+
+    failed = False
+    for instrument, chord_cls in INSTRUMENTS.items():
+        elapsed, found = measure(chord_cls, frets, args.repeats)
+        print(
+            f"{instrument}: {len(CHORD_QUALITIES) * 12} chords, {found} voicings "
+            f"on frets {frets[0]}-{frets[1]} in {elapsed * 1000:.1f}ms "
+            f"(budget {args.budget:.1f}ms)"
+        )
+        if elapsed * 1000 > args.budget:
+            print(f"FAIL: {instrument} is over budget")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,36 @@
-import collections.abc
-
 from .chord import BassChord, GuitarChord, UkuleleChord  # noqa: E402
 from .fretboard import BassFretboard, GuitarFretboard, UkuleleFretboard  # noqa: E402
+from .style import Style, compile_style  # noqa: E402
 
 __version__ = "1.0.0"
 __author__ = "Derek Payton <derek.payton@gmail.com>"
 __license__ = "MIT"
+
+
+# modules that aren't needed to draw a diagram are imported on first use,
+# to keep `import fretboard2` fast
+_LAZY = {
+    "RenderCache": ".cache",
+    "render_many": ".batch",
+    "from_spec": ".specs",
+    "Songsheet": ".sheet",
+    "find_voicings": ".voicings",
+    "VoicingIndex": ".voicings",
+    "identify": ".naming",
+    "Profiler": ".profiling",
+    "ChordLibrary": ".library",
+    "write_library": ".library",
+    "OutputStore": ".store",
+}
+
+
+def __getattr__(name):
+    try:
+        module = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    import importlib
+
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
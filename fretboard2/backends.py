@@ -0,0 +1,107 @@
+"""
+Drawing backends.
+
+A backend is a callable taking the drawing size, as ``(width, height)``,
+and returning a drawing object supporting the subset of the
+``svgwrite.Drawing`` API used by ``Fretboard``.
+
+Backends can be chosen per call, e.g. ``chord.render(backend="string")``,
+or globally by setting ``Fretboard.backend``. Either accepts one of the
+names registered in ``BACKENDS``, or a callable.
+
+The "minified" backend (see fretboard2.minify) writes smaller SVG, with
+numbers rounded to two decimal places; ``minified(precision)`` returns
+one with a different precision.
+
+The "css" backend (see fretboard2.css) styles elements with classes and a
+``<style>`` block; ``css(embed=False)`` leaves the stylesheet out.
+"""
+
+import functools
+
+from .svg import SVGDrawing
+
+
+def svgwrite_drawing(size):
+    """The original backend, building a tree of svgwrite elements"""
+    # imported here so only this backend pays for it
+    import svgwrite
+
+    return svgwrite.Drawing(size=size)
+
+
+def minified_drawing(size, precision=2):
+    """Smaller output, see fretboard2.minify"""
+    from .minify import MinifiedDrawing
+
+    return MinifiedDrawing(size, precision=precision)
+
+
+def minified(precision=2):
+    """The minified backend, rounding numbers to precision decimal places"""
+    return functools.partial(minified_drawing, precision=precision)
+
+
+def css_drawing(size, embed=True):
+    """Elements styled by class, see fretboard2.css"""
+    from .css import CSSDrawing
+
+    return CSSDrawing(size, embed=embed)
+
+
+def css(embed=True):
+    """The css backend, with or without an embedded stylesheet"""
+    return functools.partial(css_drawing, embed=embed)
+
+
+BACKENDS = {
+    "svgwrite": svgwrite_drawing,
+    "string": SVGDrawing,
+    "minified": minified_drawing,
+    "css": css_drawing,
+}
+
+
+def get_backend(backend):
+    """Look up a backend by name, passing callables through unchanged"""
+    if callable(backend):
+        return backend
+    try:
+        return BACKENDS[backend]
+    except KeyError:
+        raise ValueError(
+            f"Unknown backend {backend!r}, expected one of {', '.join(BACKENDS)}"
+        ) from None
+
+
+def backend_name(backend):
+    """A stable name for a backend, for use in cache keys"""
+    if isinstance(backend, str):
+        return backend
+    if isinstance(backend, functools.partial):
+        arguments = [repr(arg) for arg in backend.args]
+        arguments.extend(
+            f"{key}={value!r}" for key, value in sorted(backend.keywords.items())
+        )
+        return f"{backend_name(backend.func)}({', '.join(arguments)})"
+    return f"{backend.__module__}.{backend.__qualname__}"
+
+
+class DrawingTarget(object):
+    """
+    Redirect a fretboard's drawing into a container.
+
+    Fretboard's draw_* methods create elements with ``self.drawing.line()``
+    etc, and add them with ``self.drawing.add()``. Setting
+    ``fretboard.drawing`` to one of these makes them create elements with
+    ``drawing`` as usual, but add them to ``container`` (e.g. a group,
+    symbol, or plain list) instead.
+    """
+
+    def __init__(self, drawing, container):
+        self.drawing = drawing
+        self.container = container
+        self.add = container.append if isinstance(container, list) else container.add
+
+    def __getattr__(self, name):
+        return getattr(self.drawing, name)
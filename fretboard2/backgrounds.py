@@ -0,0 +1,34 @@
+"""
+A process-wide pool of drawn fretboard backgrounds.
+
+Most of a diagram doesn't depend on what's marked on it: its background,
+frets, inlays, string lines and nut are the same for every diagram of the
+same shape, that is, the same instrument, number of frets shown, position
+(open, with a nut, or up the neck), inlay placement, string colours, title
+or no title, style and backend. Only the fret numbers, string labels,
+markers and title differ.
+
+Each shape's background elements are drawn once and kept here, so a
+fretboard of a shape already drawn (by any diagram) only draws its own
+fret labels, string labels, markers and title around them::
+
+    from fretboard2 import backgrounds
+
+    backgrounds.pool.stats  # hits, misses, evictions
+    backgrounds.pool.maxsize = 1024
+
+The pool is only used by backends whose elements are finished values that
+can be shared between drawings: the "string" and "minified" backends.
+svgwrite elements belong to the drawing they were made for, and the "css"
+backend notes what's drawn with it; these only reuse a fretboard's own
+background, when it is rendered again (see Fretboard.get_static_layer).
+"""
+
+from .cache import LRUCache
+
+# each shape is a few dozen short strings; a songbook has a handful of shapes
+POOL_SIZE = 256
+
+# static_key() -> (style, layers): the style is kept so its id() (which
+# the key uses, being much quicker to hash) can't be reused
+pool = LRUCache(maxsize=POOL_SIZE)
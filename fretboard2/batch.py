@@ -0,0 +1,172 @@
+"""
+Rendering many diagrams at once, spread across a pool of processes.
+
+    for result in render_many(specs, workers=8):
+        print(result.index, len(result.svg))
+
+Specs are dicts as understood by ``fretboard2.specs.from_spec``, or
+Chord/Fretboard instances. Specs with a ``filename`` are saved to that file
+by the worker, rather than having their SVG sent back.
+
+Work is handed to the pool in chunks, and only a bounded number of chunks
+are in flight at once, so arbitrarily long (lazy) iterables of specs can
+be rendered in constant memory.
+"""
+
+import os
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+from .compat import StringIO
+from .fretboard import Fretboard
+from .profiling import Profiler
+from .specs import from_spec
+
+RenderResult = namedtuple("RenderResult", "index spec svg filename error")
+RenderResult.__doc__ = """
+The outcome of rendering one spec.
+
+index:    position of the spec in the input
+spec:     the spec itself
+svg:      the rendered document, unless it was saved to ``filename``
+filename: where the document was saved, if the spec asked for it
+error:    a description of the failure, if rendering failed and errors
+          were not raised
+"""
+
+
+def render_spec(spec, backend=None):
+    """Render a single spec, returning (svg, filename)"""
+    filename = spec.get("filename") if isinstance(spec, dict) else None
+    diagram = from_spec(spec)
+    if filename is not None:
+        diagram.save(filename, backend=backend)
+        return None, filename
+    return diagram.render(StringIO(), backend=backend).getvalue(), None
+
+
+def _render_chunk(start, chunk, backend, raise_errors, profiler=None):
+    """
+    Render a chunk of specs, in a worker process, returning the results and
+    the profiler (if any) they were recorded with
+    """
+    if profiler is not None:
+        previous = Fretboard.profiler
+        Fretboard.profiler = profiler
+
+    results = []
+    try:
+        for offset, spec in enumerate(chunk):
+            try:
+                svg, filename = render_spec(spec, backend)
+            except Exception as exc:
+                if raise_errors:
+                    raise
+                results.append(
+                    (start + offset, None, None, f"{type(exc).__name__}: {exc}")
+                )
+            else:
+                results.append((start + offset, svg, filename, None))
+    finally:
+        if profiler is not None:
+            Fretboard.profiler = previous
+    return results, profiler
+
+
+def _chunks(specs, size):
+    iterator = iter(specs)
+    start = 0
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+
+def render_many(
+    specs,
+    workers=None,
+    ordered=True,
+    chunksize=64,
+    backend=None,
+    raise_errors=True,
+    profiler=None,
+):
+    """
+    Render an iterable of specs, yielding a RenderResult for each.
+
+    workers:      number of worker processes. Defaults to the number of CPUs;
+                  0 or 1 renders in this process, without a pool.
+    ordered:      yield results in input order. Otherwise they are yielded
+                  as soon as each chunk is finished.
+    chunksize:    number of specs sent to a worker at a time
+    backend:      drawing backend, see fretboard2.backends. Defaults to
+                  ``Fretboard.backend`` in this process.
+    raise_errors: re-raise the first rendering error. Otherwise failures
+                  are reported in ``RenderResult.error`` and rendering
+                  carries on.
+    profiler:     a fretboard2.profiling.Profiler, to gather per-phase
+                  statistics for every diagram into, from every worker
+    """
+    if backend is None:
+        # resolve it here, workers may not share our class attributes
+        backend = Fretboard.backend
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1:
+        for start, chunk in _chunks(specs, chunksize):
+            results, _ = _render_chunk(start, chunk, backend, raise_errors, profiler)
+            yield from _results(start, chunk, results)
+        return
+
+    # keep every worker busy, without queueing up the whole input
+    max_pending = workers * 2
+    chunks = _chunks(specs, chunksize)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # (future, start, chunk), in submission order
+        pending = deque()
+
+        def submit():
+            for start, chunk in islice(chunks, max_pending - len(pending)):
+                future = executor.submit(
+                    _render_chunk,
+                    start,
+                    chunk,
+                    backend,
+                    raise_errors,
+                    # each chunk is recorded separately, and added to ours
+                    (
+                        None
+                        if profiler is None
+                        else Profiler(max_shapes=profiler.max_shapes)
+                    ),
+                )
+                pending.append((future, start, chunk))
+
+        submit()
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                finished, _ = wait(
+                    [future for future, _, _ in pending], return_when=FIRST_COMPLETED
+                )
+                done = [item for item in pending if item[0] in finished]
+                for item in done:
+                    pending.remove(item)
+
+            for future, start, chunk in done:
+                results, recorded = future.result()
+                if recorded is not None:
+                    profiler.merge(recorded)
+                yield from _results(start, chunk, results)
+            submit()
+
+
+def _results(start, chunk, results):
+    for index, svg, filename, error in results:
+        yield RenderResult(index, chunk[index - start], svg, filename, error)
@@ -0,0 +1,206 @@
+"""
+Caching of rendered diagrams.
+
+``RenderCache`` keeps rendered SVG documents, keyed on a hash of
+everything that affects the output: the diagram class, its contents
+(positions, fingers, barre, markers, title...), the compiled style and
+the backend used. It has a bounded in-memory LRU tier and an optional
+on-disk tier, which persists across processes.
+
+Caches are enabled per call::
+
+    cache = RenderCache(maxsize=2048, directory=".svgcache")
+    chord.render(cache=cache)
+
+or for every diagram, by setting ``Chord.cache`` / ``Fretboard.cache``.
+"""
+
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+# bump whenever rendered output changes, so disk tiers (and output stores,
+# see fretboard2.store) don't hand back documents drawn the old way
+FORMAT = 1
+
+
+class CacheStats(object):
+    """
+    Counters for a cache, to help size it.
+
+    ``hits`` and ``misses`` count in-memory lookups. For caches with an
+    on-disk tier, ``disk_hits`` counts the misses that were found on disk.
+    """
+
+    __slots__ = ("hits", "misses", "evictions", "disk_hits", "disk_writes")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_hits = 0
+        self.disk_writes = 0
+
+    @property
+    def lookups(self):
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        values = ", ".join(f"{k}={v}" for k, v in self.as_dict().items())
+        return f"CacheStats({values})"
+
+
+class LRUCache(object):
+    """
+    A bounded, thread-safe, least-recently-used mapping, with statistics.
+
+    Misses return None rather than raising, so None can't be stored.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.stats = CacheStats()
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.stats.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.stats.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.stats.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+def digest(key):
+    """
+    A stable hash of a cache key.
+
+    Keys are tuples of plain values (strings, numbers, None, nested tuples)
+    and compiled styles, all of which have a repr that is stable across
+    processes. The package version and FORMAT are hashed in too, so a disk
+    tier never serves documents drawn by a different renderer.
+    """
+    # imported here, as LRUCache is needed to draw (for fretboard2.backgrounds)
+    # and this is not; and the package imports this module before it defines
+    # __version__
+    import hashlib
+
+    from . import __version__
+
+    versioned = (__version__, FORMAT, key)
+    return hashlib.sha256(repr(versioned).encode("utf-8")).hexdigest()
+
+
+class RenderCache(object):
+    """
+    Rendered SVG documents, in a bounded LRU and (optionally) on disk.
+
+    maxsize:   the number of documents kept in memory
+    directory: if given, documents are also stored here, one file per
+               document, and looked up on an in-memory miss.
+    """
+
+    def __init__(self, maxsize=1024, directory=None):
+        self.memory = LRUCache(maxsize)
+        self.stats = self.memory.stats
+        self.directory = directory
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self.memory)
+
+    def path(self, digest):
+        return os.path.join(self.directory, digest[:2], f"{digest}.svg")
+
+    def get(self, digest):
+        svg = self.memory.get(digest)
+        if svg is None and self.directory is not None:
+            svg = self._read(digest)
+            if svg is not None:
+                self.stats.disk_hits += 1
+                self.memory.set(digest, svg)
+        return svg
+
+    def set(self, digest, svg):
+        self.memory.set(digest, svg)
+        if self.directory is not None:
+            self._write(digest, svg)
+
+    def fetch(self, key, render):
+        """
+        Return the document for ``key``, calling ``render()`` to produce (and
+        store) it on a miss.
+        """
+        key = digest(key)
+        svg = self.get(key)
+        if svg is None:
+            svg = render()
+            self.set(key, svg)
+        return svg
+
+    def clear(self, disk=False):
+        """Empty the in-memory tier, and the on-disk one if asked"""
+        self.memory.clear()
+        if disk and self.directory is not None:
+            for root, _, files in os.walk(self.directory):
+                for name in files:
+                    if name.endswith(".svg"):
+                        os.unlink(os.path.join(root, name))
+
+    def _read(self, digest):
+        try:
+            with open(self.path(digest), encoding="utf-8") as fd:
+                return fd.read()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, digest, svg):
+        path = self.path(digest)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write to a temporary file and move it into place, so concurrent
+        # processes never see a partially-written document
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as output:
+                output.write(svg)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self.stats.disk_writes += 1
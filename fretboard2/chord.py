@@ -1,16 +1,36 @@
 import copy
 
-import attrdict
-import yaml
-
 from . import fretboard
 
 # from .config import settings
 from ._defaults import CHORD, DEFAULTS
+from .backends import backend_name
 from .compat import StringIO
+from .stream import is_compressed, save_file, write_text
+from .style import compile_style
 from .utils import convert_int, dict_merge
 
 
+def parse_positions(positions):
+    """
+    Positions as accepted by Chord (e.g. 'xx0232' or 'x-x-0-14-15-14'), as a
+    list of frets, with None for muted strings
+    """
+    if positions is None:
+        positions = []
+    elif isinstance(positions, str):
+        if "-" in positions:
+            # use - to separate numbers when frets go above 9, e.g., x-x-0-10-10-10
+            positions = positions.split("-")
+        else:
+            positions = list(positions)
+    # oops,. did we put in something like 5333 without quoting?
+    if isinstance(positions, int):
+        positions = list(str(positions))
+
+    return [convert_int(p) for p in positions]
+
+
 class Chord(object):
     """
     Create a chord diagram.
@@ -27,25 +47,19 @@ class Chord(object):
 
     inlays = None
     strings = None
-    default_style = dict_merge(DEFAULTS, CHORD)
+    # a fretboard2.cache.RenderCache, used when none is passed to render()
+    cache = None
+    # a fretboard2.store.OutputStore, used when none is passed to save()
+    store = None
+    # name untitled chords from their positions (see fretboard2.naming)
+    auto_title = False
+    default_style = dict_merge(copy.deepcopy(DEFAULTS), CHORD)
 
     def __init__(
         self, positions=None, fingers=None, barre=None, title=None, style=None
     ):
-        if positions is None:
-            positions = []
-        elif isinstance(positions, str):
-            if "-" in positions:
-                # use - to separate numbers when frets go above 9, e.g., x-x-0-10-10-10
-                positions = positions.split("-")
-            else:
-                positions = list(positions)
-        # oops,. did we put in something like 5333 without quoting?
-        if isinstance(positions, int):
-            positions = list(str(positions))
-
         try:
-            self.positions = [convert_int(p) for p in positions]
+            self.positions = parse_positions(positions)
         except Exception:
             print(positions)
 
@@ -56,9 +70,8 @@ class Chord(object):
 
         self.barre = barre
 
-        self.style = attrdict.AttrDict(
-            dict_merge(copy.deepcopy(self.default_style), style or {})
-        )
+        # compiled once per distinct override, and passed on to our fretboard
+        self.style = compile_style(style, self.default_style)
 
         self.title = title
 
@@ -89,22 +102,38 @@ class Chord(object):
             first_fret = min(filter(lambda pos: pos != 0, fretted_positions))
         return (first_fret, first_fret + 4)
 
+    def get_title(self):
+        """The title to draw: ours, or the chord's name if auto_title is set"""
+        if self.title is None and self.auto_title:
+            # only needed for auto titles
+            from .naming import identify
+
+            matches = identify(self.positions, type(self))
+            if matches:
+                return matches[0].name
+        return self.title
+
     def draw(self):
+        previous = self.fretboard
         self.fretboard = self.fretboard_cls(
             strings=self.strings,
             frets=self.get_fret_range(),
             inlays=self.inlays,
-            title=self.title,
+            title=self.get_title(),
             style=self.style,
         )
+        if previous is not None:
+            # redrawing (e.g. after a change): keep what we can
+            self.fretboard._static = previous._static
 
         # Check for a barred fret (we'll need to know this later)
-        if self.barre is not None:
+        barre = self.barre
+        if barre is not None:
             # when barre is overridden, barre all strings.
             self.fretboard.add_barre(
-                fret=self.barre,
+                fret=barre,
                 strings=(0, self.fretboard.string_count - 1),
-                finger=self.fingers[self.positions.index(self.barre)],
+                finger=self.fingers[self.positions.index(barre)],
             )
         else:
             # Otherwise check for a barred fret
@@ -112,9 +141,9 @@ class Chord(object):
                 if (isinstance(finger, int) or finger.isdigit()) and self.fingers.count(
                     finger
                 ) > 1:
-                    self.barre = self.positions[index]
+                    barre = self.positions[index]
                     self.fretboard.add_barre(
-                        fret=self.barre,
+                        fret=barre,
                         strings=(
                             index,
                             len(self.fingers) - self.fingers[::-1].index(finger) - 1,
@@ -149,7 +178,7 @@ class Chord(object):
                         else self.style.string.open_font_color
                     ),
                 )
-            elif fret is not None and fret != self.barre:
+            elif fret is not None and fret != barre:
                 # Add the fret marker
                 try:
                     finger = self.fingers[string]
@@ -162,18 +191,112 @@ class Chord(object):
                     label=finger,
                 )
 
-    def render(self, output=None):
-        self.draw()
+    def cache_key(self, backend=None):
+        """
+        Everything that affects the rendered output, as a tuple of plain values
+        """
+        return (
+            type(self).__module__,
+            type(self).__qualname__,
+            tuple(self.positions),
+            tuple(self.fingers),
+            self.barre,
+            self.get_title(),
+            self.style,
+            backend_name(backend or self.fretboard_cls.backend),
+        )
+
+    def render(self, output=None, backend=None, cache=None):
+        """
+        Render the chord as SVG into output (a new StringIO if not given).
 
+        When a cache is used (either passed here, or set as ``Chord.cache``)
+        and already holds this chord, it is not drawn at all, so
+        ``self.fretboard`` is not (re)built.
+        """
         if output is None:
             output = StringIO()
 
-        self.fretboard.render(output)
+        if cache is None:
+            cache = self.cache
+
+        if cache is not None:
+            output.write(self._cached(cache, backend))
+            return output
+
+        return self._render(output, backend)
+
+    def _cached(self, cache, backend=None):
+        return cache.fetch(
+            self.cache_key(backend),
+            lambda: self._render(StringIO(), backend).getvalue(),
+        )
+
+    def _render(self, output, backend=None):
+        self._with_fretboard("_render", output, backend)
         return output
 
-    def save(self, filename):
-        with open(filename, "w") as output:
-            self.render(output)
+    def _with_fretboard(self, method, *args):
+        """
+        Draw, and have the fretboard finish the job with one of its methods
+        (_render or _stream); profiled, if the fretboard class has a profiler
+        """
+        profiler = self.fretboard_cls.profiler
+        if profiler is None:
+            self.draw()
+            return getattr(self.fretboard, method)(*args)
+
+        recording = profiler.begin(self)
+        self.draw()
+        recording.mark("chord")
+        self.fretboard._recording = recording
+        try:
+            result = getattr(self.fretboard, method)(*args)
+        finally:
+            self.fretboard._recording = None
+        recording.finish()
+        return result
+
+    def stream(self, fileobj, backend=None, cache=None, compress=False):
+        """
+        Write the SVG to a binary file object (or socket) as it's produced,
+        gzipped if compress is set (see fretboard2.stream).
+
+        Returns the number of bytes written.
+        """
+        if cache is None:
+            cache = self.cache
+
+        if cache is not None:
+            return write_text(self._cached(cache, backend), fileobj, compress)
+
+        return self._with_fretboard("_stream", fileobj, backend, compress)
+
+    def save(self, filename, backend=None, cache=None, store=None):
+        """
+        Save as SVG, or gzipped SVG if filename ends with .svgz. With a store
+        (see fretboard2.store), identical diagrams share one file.
+        """
+        if store is None:
+            store = self.store
+
+        if store is not None:
+            store.save(self, filename, backend=backend, cache=cache)
+            return
+
+        if is_compressed(filename):
+            save_file(
+                filename,
+                lambda output: self.stream(
+                    output, backend=backend, cache=cache, compress=True
+                ),
+                binary=True,
+            )
+            return
+
+        save_file(
+            filename, lambda output: self.render(output, backend=backend, cache=cache)
+        )
 
 
 class GuitarChord(Chord):
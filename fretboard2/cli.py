@@ -0,0 +1,523 @@
+"""
+The ``fretboard2`` command.
+
+``fretboard2 render`` reads chord and fretboard specs (see
+fretboard2.specs), as JSON lines or a stream of YAML documents, from a file
+or stdin, renders them across a pool of worker processes (see
+fretboard2.batch) and writes them to a directory, or as a tar stream::
+
+    fretboard2 render chords.jsonl --output svg/ --workers 8
+    generate-chords | fretboard2 render --tar - > chords.tar
+    fretboard2 render songbook.yaml --format yaml --tar chords.tar.gz
+
+Input is read as it's rendered, and only a bounded number of specs are in
+flight at once, so there's no limit on how many can be piped in.
+
+Each diagram is written to its spec's ``filename``, relative to the output
+directory (or as its name in the tar stream), or else to a name made from
+its position in the input, such as ``00000042.svg``.
+
+Failures (unreadable input, invalid specs, diagrams that can't be drawn)
+are reported on stderr as they happen, by the line of the input they came
+from, and rendering carries on. A summary, with throughput, is written to
+stderr at the end, and the exit status is 1 if anything failed.
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+from .backends import BACKENDS
+
+# directories made so far; forgotten when there are this many, so
+# millions of diagrams in as many directories don't pile up in memory
+_MAX_SEEN_DIRECTORIES = 4096
+
+
+def read_jsonl(stream, report):
+    """
+    Yield (line number, spec) per line of JSON. Blank lines are skipped, and
+    lines that aren't valid JSON are passed to report(where, message).
+    """
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError as exc:
+            report(f"line {number}", f"invalid JSON: {exc}")
+
+
+def read_yaml(stream, report):
+    """
+    Yield (line number, spec) for the specs in a stream of YAML documents,
+    each of which is a spec, or a list of specs. A document that can't be
+    parsed ends the stream, as there's no telling where the next one starts.
+    """
+    import yaml
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)(stream)
+    try:
+        while True:
+            try:
+                if not loader.check_node():
+                    return
+                node = loader.get_node()
+                document = loader.construct_document(node)
+            except yaml.YAMLError as exc:
+                # the problem and its line, rather than the several lines
+                # that str(exc) runs to
+                mark = getattr(exc, "problem_mark", None)
+                where = f"line {mark.line + 1}" if mark is not None else "input"
+                problem = getattr(exc, "problem", None) or exc
+                report(where, f"invalid YAML: {problem}")
+                return
+            if isinstance(document, list):
+                for item, spec in zip(node.value, document):
+                    yield item.start_mark.line + 1, spec
+            elif document is not None:
+                yield node.start_mark.line + 1, document
+    finally:
+        loader.dispose()
+
+
+READERS = {"jsonl": read_jsonl, "yaml": read_yaml}
+
+
+def input_format(filename):
+    """The input format to expect, going by a filename"""
+    if filename.lower().endswith((".yaml", ".yml")):
+        return "yaml"
+    return "jsonl"
+
+
+def safe_filename(filename):
+    """
+    A spec's filename, as a relative path that stays inside the output
+    directory, or None if it would escape it
+    """
+    path = os.path.normpath(filename)
+    if os.path.isabs(path) or path == ".." or path.startswith(".." + os.sep):
+        return None
+    return path
+
+
+class TarWriter(object):
+    """
+    Write a tar archive to a (binary, possibly unseekable) file object, a
+    file at a time.
+
+    Unlike tarfile in streaming mode, nothing is kept per file written, so
+    archives of any number of files are written in constant memory.
+    """
+
+    def __init__(self, fileobj, compress=False):
+        import gzip
+        import tarfile
+
+        self._tarfile = tarfile
+        self._raw = fileobj
+        self._gzip = None
+        if compress:
+            fileobj = self._gzip = gzip.GzipFile(fileobj=fileobj, mode="wb", mtime=0)
+        self.fileobj = fileobj
+        # bytes of tar written, before any compression
+        self.written = 0
+
+    def _write(self, data):
+        self.fileobj.write(data)
+        self.written += len(data)
+
+    def add(self, name, data, mtime=0):
+        tarfile = self._tarfile
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = mtime
+        info.mode = 0o644
+        self._write(info.tobuf(tarfile.PAX_FORMAT, "utf-8", "surrogateescape"))
+        self._write(data)
+        remainder = len(data) % tarfile.BLOCKSIZE
+        if remainder:
+            self._write(tarfile.NUL * (tarfile.BLOCKSIZE - remainder))
+
+    def close(self):
+        tarfile = self._tarfile
+        # two empty blocks end the archive, which is padded to a whole record
+        self._write(tarfile.NUL * (tarfile.BLOCKSIZE * 2))
+        remainder = self.written % tarfile.RECORDSIZE
+        if remainder:
+            self._write(tarfile.NUL * (tarfile.RECORDSIZE - remainder))
+        if self._gzip is not None:
+            # writes the gzip trailer, leaving the file itself open
+            self._gzip.close()
+        self._raw.flush()
+
+
+class Report(object):
+    """Counts, and reports, what was rendered and what failed"""
+
+    def __init__(self, output=None, quiet=False):
+        self.output = output or sys.stderr
+        self.quiet = quiet
+        self.rendered = 0
+        self.failed = 0
+        self.start = time.perf_counter()
+
+    def failure(self, where, message):
+        self.failed += 1
+        if not self.quiet:
+            print(f"{where}: {message}", file=self.output)
+
+    def summary(self, archived=None):
+        elapsed = time.perf_counter() - self.start
+        rate = self.rendered / elapsed if elapsed else 0.0
+        summary = (
+            f"rendered {self.rendered:,} diagrams in {elapsed:.2f}s "
+            f"({rate:,.0f}/s), {self.failed:,} failed"
+        )
+        if archived is not None:
+            summary += f", {archived:,} bytes of tar"
+        print(summary, file=self.output)
+
+
+def _open_input(filename):
+    if filename == "-":
+        return sys.stdin
+    return open(filename, encoding="utf-8")
+
+
+def _open_tar(filename):
+    if filename == "-":
+        return sys.stdout.buffer, False
+    return open(filename, "wb"), filename.lower().endswith((".gz", ".tgz"))
+
+
+def _document(name, svg):
+    """A rendered document, as the bytes to write as name"""
+    if name.endswith(".svgz"):
+        from .stream import write_text
+
+        data = io.BytesIO()
+        write_text(svg, data, compress=True)
+        return data.getvalue()
+    return svg.encode("utf-8")
+
+
+def render_command(args):
+    from .batch import render_many
+
+    report = Report(quiet=args.quiet)
+    extension = ".svgz" if args.compress else ".svg"
+    reader = READERS[args.format or input_format(args.input)]
+    # render index -> (line of the input, name), for the specs in flight
+    placed = {}
+    seen_directories = set()
+
+    def specs(stream):
+        """The specs to render, with where each one goes"""
+        index = 0
+        read = reader(stream, report.failure)
+        for position, (line, spec) in enumerate(read):
+            if not isinstance(spec, dict):
+                report.failure(f"line {line}", "expected a mapping")
+                continue
+
+            spec = dict(spec)
+            name = spec.pop("filename", None) or f"{position:08d}{extension}"
+            name = safe_filename(str(name))
+            if name is None:
+                report.failure(f"line {line}", "filename is outside the output")
+                continue
+
+            if args.output is not None and store is None:
+                filename = os.path.join(args.output, name)
+                directory = os.path.dirname(filename)
+                if directory not in seen_directories:
+                    os.makedirs(directory, exist_ok=True)
+                    if len(seen_directories) >= _MAX_SEEN_DIRECTORIES:
+                        seen_directories.clear()
+                    seen_directories.add(directory)
+                # workers save it there themselves
+                spec["filename"] = filename
+            placed[index] = (line, name)
+            yield spec
+            index += 1
+
+    store = None
+    if args.dedupe:
+        from .store import OutputStore
+
+        # documents come back here, to be stored once each
+        store = OutputStore(args.output)
+
+    tar = None
+    if args.tar is not None:
+        fileobj, compress = _open_tar(args.tar)
+        tar = TarWriter(fileobj, compress=compress)
+        mtime = int(time.time())
+
+    stream = _open_input(args.input)
+    try:
+        for result in render_many(
+            specs(stream),
+            workers=args.workers,
+            ordered=False,
+            chunksize=args.chunksize,
+            backend=args.backend,
+            raise_errors=False,
+        ):
+            line, name = placed.pop(result.index)
+            if result.error is not None:
+                report.failure(f"line {line}", result.error)
+                continue
+            report.rendered += 1
+            if tar is not None:
+                tar.add(name, _document(name, result.svg), mtime)
+            elif store is not None:
+                store.add(os.path.join(args.output, name), _document(name, result.svg))
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        if tar is not None:
+            tar.close()
+            if fileobj is not sys.stdout.buffer:
+                fileobj.close()
+        if store is not None:
+            store.write_manifest()
+
+    report.summary(tar.written if tar is not None else None)
+    if store is not None:
+        print(
+            f"{len(store.files):,} files, {store.stats['documents']:,} new "
+            f"documents, {len(store.changed()):,} changed; manifest in "
+            f"{store.manifest}",
+            file=report.output,
+        )
+    return 1 if report.failed else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="fretboard2", description="Draw chord and fretboard diagrams as SVG."
+    )
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    commands.required = True
+
+    render = commands.add_parser(
+        "render",
+        help="render a stream of specs",
+        description=(
+            "Render chord and fretboard specs (one JSON object per line, or "
+            "YAML documents) to a directory or a tar stream."
+        ),
+    )
+    render.add_argument(
+        "input", nargs="?", default="-", help="file to read specs from (default stdin)"
+    )
+    render.add_argument(
+        "-f",
+        "--format",
+        choices=sorted(READERS),
+        help="input format (default: from the file's extension, or jsonl)",
+    )
+    output = render.add_mutually_exclusive_group(required=True)
+    output.add_argument("-o", "--output", help="directory to write diagrams to")
+    output.add_argument(
+        "--tar",
+        metavar="FILE",
+        help="write diagrams to a tar file (gzipped if named .gz or .tgz), "
+        "or - for stdout",
+    )
+    render.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=None,
+        help="worker processes (default: one per CPU; 0 renders in-process)",
+    )
+    render.add_argument(
+        "-b",
+        "--backend",
+        choices=list(BACKENDS),
+        default="string",
+        help="drawing backend (default: string)",
+    )
+    render.add_argument(
+        "--chunksize",
+        type=int,
+        default=64,
+        help="specs handed to a worker at a time (default: 64)",
+    )
+    render.add_argument(
+        "-z",
+        "--compress",
+        action="store_true",
+        help="gzip diagrams not given a filename, as .svgz",
+    )
+    render.add_argument(
+        "--dedupe",
+        action="store_true",
+        help="write each distinct diagram once, hard linking the files to it, "
+        "and a manifest of their digests (see fretboard2.store); the manifest "
+        "is kept in memory, so this uses memory in proportion to the number "
+        "of files",
+    )
+    render.add_argument(
+        "-q", "--quiet", action="store_true", help="don't report each failure"
+    )
+    render.set_defaults(handler=render_command)
+
+    serve = commands.add_parser(
+        "serve",
+        help="serve chord diagrams over HTTP",
+        description=(
+            "Serve chord diagrams over HTTP, at URLs like "
+            "/guitar/xx0232.svg?fingers=---132&title=D (see fretboard2.server)."
+        ),
+    )
+    add_server_arguments(serve)
+    serve.set_defaults(handler=serve_command)
+
+    loadtest = commands.add_parser(
+        "loadtest",
+        help="benchmark a render server",
+        description=(
+            "Send requests to a render server, and report requests per second "
+            "and latency percentiles (see fretboard2.loadgen)."
+        ),
+    )
+    add_server_arguments(loadtest)
+    loadtest.add_argument(
+        "--local",
+        action="store_true",
+        help="start a server in this process, on a free port, to test",
+    )
+    loadtest.add_argument(
+        "-n", "--requests", type=int, default=10000, help="requests to send"
+    )
+    loadtest.add_argument(
+        "-c",
+        "--connections",
+        type=int,
+        default=32,
+        help="concurrent connections (default: 32)",
+    )
+    loadtest.add_argument(
+        "--distinct",
+        type=int,
+        default=500,
+        help="different chords to request (default: 500)",
+    )
+    loadtest.add_argument(
+        "--conditional",
+        action="store_true",
+        help="revalidate with If-None-Match, once a chord has been fetched",
+    )
+    loadtest.add_argument(
+        "--gzip", action="store_true", help="ask for gzipped responses"
+    )
+    loadtest.set_defaults(handler=loadtest_command)
+
+    return parser
+
+
+def add_server_arguments(parser):
+    parser.add_argument(
+        "--host", default="127.0.0.1", help="address to use (default: 127.0.0.1)"
+    )
+    parser.add_argument(
+        "-p", "--port", type=int, default=8080, help="port to use (default: 8080)"
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=None,
+        help="rendering processes (default: one per CPU; 0 renders in-process)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="renders in flight at once (default: twice the workers)",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=None,
+        help="rendered diagrams to keep in memory",
+    )
+    parser.add_argument(
+        "-b",
+        "--backend",
+        choices=list(BACKENDS),
+        default="string",
+        help="drawing backend (default: string)",
+    )
+
+
+def _server_options(args):
+    options = {
+        "host": args.host,
+        "port": args.port,
+        "workers": args.workers,
+        "concurrency": args.concurrency,
+        "backend": args.backend,
+    }
+    if args.cache_size is not None:
+        options["cache_size"] = args.cache_size
+    return options
+
+
+def serve_command(args):
+    from .server import serve
+
+    serve(**_server_options(args))
+    return 0
+
+
+def loadtest_command(args):
+    import asyncio
+
+    from . import loadgen
+    from .server import RenderServer
+
+    async def run():
+        server = None
+        host, port = args.host, args.port
+        if args.local:
+            server = RenderServer(**dict(_server_options(args), port=0))
+            host, port = await server.start()
+        try:
+            return await loadgen.run(
+                host,
+                port,
+                requests=args.requests,
+                connections=args.connections,
+                distinct=args.distinct,
+                conditional=args.conditional,
+                gzip=args.gzip,
+            )
+        finally:
+            if server is not None:
+                server.close()
+
+    result = asyncio.run(run())
+    for line in loadgen.report(result):
+        print(line)
+    return 0 if set(result.statuses) <= {200, 304} else 1
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, "dedupe", False) and args.output is None:
+        parser.error("--dedupe needs --output")
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+"""
+Styling diagrams with a stylesheet, rather than attributes on each element.
+
+With the "css" backend, each element is given a class for its role
+(``fret``, ``string``, ``marker``, ``marker-label``...), and the style's
+settings for those roles are written once, as a ``<style>`` block::
+
+    <style>.fret{stroke:darkgray;stroke-width:2}...</style>
+    <line class="fret" x1="30.0" ... />
+
+Anything an element sets differently from its class, such as a marker's
+own colour, is set on the element, in a ``style`` attribute. Sizes that
+depend on the diagram's layout (string widths, barre widths) stay
+attributes.
+
+When many diagrams share a page stylesheet, the per-diagram ``<style>``
+can be left out, with ``backend=css(embed=False)`` (see
+fretboard2.backends), and the page given ``stylesheet(style)`` instead.
+
+Diagrams drawn with different styles into one document (on a Songsheet)
+get a class prefix per style after the first, e.g. ``s1-fret``.
+"""
+
+from .svg import SVGDrawing, attribute_name
+
+
+def role_attributes(style):
+    """
+    The presentation attributes the draw methods give each role by default,
+    as keyword arguments (stroke_width, not stroke-width)
+    """
+    drawing = style.drawing
+    marker = style.marker
+    label_font = {"font_family": drawing.font_family, "font_weight": "bold"}
+    return {
+        "background": {"fill": drawing.background_color},
+        "fret": {"stroke": style.fret.color, "stroke_width": style.fret.size},
+        "string": {"stroke": style.string.color},
+        "string-label": {
+            "font_family": style.string.label_font_family or drawing.font_family,
+            "font_size": style.string.label_font_size or drawing.font_size,
+            "font_weight": "bold",
+            "fill": marker.color,
+            "text_anchor": "middle",
+            "dominant_baseline": "hanging",
+        },
+        "nut": {"stroke": style.nut.color, "stroke_width": style.nut.size},
+        "inlay": {"fill": style.inlays.color},
+        "fret-label": dict(
+            label_font,
+            font_size=style.fret.label.font_size or drawing.font_size,
+            font_style="italic",
+            fill=drawing.font_color,
+            text_anchor="middle",
+        ),
+        "marker": {
+            "fill": marker.color,
+            "stroke": marker.border_color,
+            "stroke_width": marker.stroke_width,
+        },
+        "marker-label": dict(
+            label_font,
+            font_size=drawing.font_size,
+            fill=marker.font_color,
+            text_anchor="middle",
+            alignment_baseline="central",
+            dominant_baseline="middle",
+        ),
+        "barre-border": {"stroke": marker.border_color, "stroke_linecap": "round"},
+        "barre": {
+            "stroke": marker.color,
+            "stroke_linecap": "round",
+            "stroke_width": marker.radius * 2,
+        },
+        "barre-label": dict(
+            label_font,
+            font_size=drawing.font_size,
+            fill=marker.font_color,
+            text_anchor="middle",
+            alignment_baseline="central",
+            dominant_baseline="middle",
+        ),
+        "title": dict(
+            label_font,
+            font_size=drawing.font_size,
+            fill=style.title.font_color,
+            text_anchor="middle",
+            alignment_baseline="central",
+            dominant_baseline="hanging",
+        ),
+    }
+
+
+_roles = {}
+# styles are few, but don't let unusual callers grow this forever
+_ROLE_CACHE_SIZE = 1024
+
+
+def get_roles(style):
+    """role_attributes(style), without unset values, cached per style"""
+    try:
+        return _roles[style]
+    except KeyError:
+        pass
+
+    roles = {
+        role: {key: value for key, value in attributes.items() if value is not None}
+        for role, attributes in role_attributes(style).items()
+    }
+    if len(_roles) >= _ROLE_CACHE_SIZE:
+        _roles.clear()
+    _roles[style] = roles
+    return roles
+
+
+# unlike presentation attributes, CSS lengths need units
+LENGTHS = frozenset(("font_size", "stroke_width"))
+
+
+def css_value(key, value):
+    if key in LENGTHS and isinstance(value, (int, float)):
+        return f"{value}px"
+    return value
+
+
+def declarations(attributes):
+    return ";".join(
+        f"{attribute_name(key)}:{css_value(key, value)}"
+        for key, value in attributes.items()
+    )
+
+
+def stylesheet(style, prefix="", roles=None):
+    """
+    The CSS rules for a style's roles (all of them, or those given), with
+    class names prefixed by prefix
+    """
+    style_roles = get_roles(style)
+    return "".join(
+        f".{prefix}{role}{{{declarations(style_roles[role])}}}"
+        for role in (roles or style_roles)
+        if style_roles[role]
+    )
+
+
+class CSSDrawing(SVGDrawing):
+    """
+    An SVG document whose elements are styled by class.
+
+    embed: include a <style> block, for the styles used; otherwise the
+           document relies on the page it's in for its stylesheet
+    """
+
+    # elements are drawn for, and noted in, one drawing
+    shared_elements = False
+
+    def __init__(self, size=("100%", "100%"), embed=True):
+        super().__init__(size)
+        self.embed = embed
+        # style -> class name prefix
+        self.prefixes = {}
+        # style -> roles used, in order
+        self.used = {}
+        # the style last used, and its prefix, roles and roles used:
+        # consecutive elements almost always share a style
+        self._style = None
+
+    def classes(self, role, style, attributes):
+        """The attributes for an element: a class, and any overrides"""
+        if style is not self._style:
+            if style not in self.prefixes:
+                self.prefixes[style] = (
+                    f"s{len(self.prefixes)}-" if self.prefixes else ""
+                )
+            self._style = style
+            self._prefix = self.prefixes[style]
+            self._roles = get_roles(style)
+            self._used = self.used.setdefault(style, {})
+        self._used[role] = True
+
+        declared = self._roles[role]
+        kept = {"class_": self._prefix + role}
+        overrides = {}
+        for key, value in attributes.items():
+            if key not in declared:
+                kept[key] = value
+            elif value is not None and value != declared[key]:
+                overrides[key] = value
+        if overrides:
+            kept["style"] = declarations(overrides)
+        return kept
+
+    def stylesheet(self):
+        """The rules for every class used in the document"""
+        return "".join(
+            stylesheet(style, self.prefixes[style], roles)
+            for style, roles in self.used.items()
+        )
+
+    def header(self):
+        header = super().header()
+        if self.embed and self.used:
+            header += f"<style>{self.stylesheet()}</style>"
+        return header
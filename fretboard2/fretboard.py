@@ -1,19 +1,32 @@
-import copy
-
-import attrdict
-import svgwrite
-
 # fretboard = Fretboard(strings=6, frets=(3, 8))
 # fretboard.add_string_label(string=1, label='X', color='')
 # fretboard.add_barre(fret=1, strings=(0, 5), label='')
 # fretboard.add_marker(fret=1, string=1, label='', color='')
+from . import backgrounds
 from ._defaults import DEFAULTS
+from .backends import DrawingTarget, backend_name, get_backend
 from .compat import StringIO
-from .utils import dict_merge
+from .layout import get_layout
+from .markers import Markers, String
+from .profiling import tell
+from .stream import is_compressed, save_file, write_drawing, write_text
+from .style import compile_style
+from .theory import get_pitch_table, interval, note_name, pitch_class
 
 
 class Fretboard(object):
     default_style = DEFAULTS
+    # drawing backend used when none is passed to draw()/render(),
+    # see fretboard2.backends
+    backend = "svgwrite"
+    # a fretboard2.cache.RenderCache, used when none is passed to render()
+    cache = None
+    # a fretboard2.store.OutputStore, used when none is passed to save()
+    store = None
+    # open string pitches (e.g. "E2"), from string 0; set by the subclasses
+    tuning = None
+    # a fretboard2.profiling.Profiler, recording each render's phases
+    profiler = None
 
     def __init__(
         self,
@@ -23,51 +36,65 @@ class Fretboard(object):
         title=None,
         style=None,
         label_all_frets=False,
+        tuning=None,
+        capo=0,
     ):
         self.frets = list(range(max(frets[0] - 1, 0), frets[1] + 1))
-        self.strings = [
-            attrdict.AttrDict(
-                {
-                    "color": None,
-                    "label": None,
-                    "font_color": None,
-                }
-            )
-            for x in range(self.string_count)
-        ]
+        self.strings = [String() for x in range(self.string_count)]
 
-        self.markers = []
+        # column storage, see fretboard2.markers
+        self.markers = Markers()
+        self.barres = Markers()
 
         # Guitars and basses have different inlay patterns than, e.g., ukulele
         # A double inlay will be added at the 12th/24th/... fret regardless.
         self.inlays = inlays or self.inlays
 
-        self.layout = attrdict.AttrDict()
+        # set by calculate_layout()
+        self.layout = None
 
-        self.style = attrdict.AttrDict(
-            dict_merge(copy.deepcopy(self.default_style), style or {})
-        )
+        # compiled styles are immutable and shared between diagrams
+        self.style = compile_style(style, self.default_style)
 
         self.title = title
 
+        if tuning is not None:
+            if len(tuning) != self.string_count:
+                raise ValueError(
+                    f"{type(self).__name__} has {self.string_count} strings, "
+                    f"but the tuning has {len(tuning)} notes"
+                )
+            self.tuning = tuple(tuning)
+        self.capo = capo
+
         self.drawing = None
 
+        # (key, layers) for the static layer last drawn, see get_static_layer()
+        self._static = None
+
+        # the profiling.Recording of the render under way, if profiling
+        self._recording = None
+
     def add_string_label(self, string, label, font_color=None):
         self.strings[string].label = label
         self.strings[string].font_color = font_color
 
     def add_marker(self, string, fret, color=None, label=None, font_color=None):
-        self.markers.append(
-            attrdict.AttrDict(
-                {
-                    "fret": fret,
-                    "string": string,
-                    "color": color,
-                    "label": label,
-                    "font_color": font_color,
-                }
-            )
-        )
+        if isinstance(string, (list, tuple)):
+            # a (first, last) pair of strings is a barre
+            self.barres.append((string[0], string[1]), fret, color, label, font_color)
+        else:
+            self.markers.append(string, fret, color, label, font_color)
+
+    def add_markers(self, strings, frets, labels=None, colors=None, font_colors=None):
+        """
+        Add many markers at once.
+
+        strings, frets: the string and fret of each marker
+        labels, colors, font_colors: a value for each marker, or a single
+                                     value (e.g. a string, or None) for all
+        """
+        self.markers.extend(strings, frets, colors, labels, font_colors)
 
     def add_barre(self, fret, strings, finger):
         self.add_marker(
@@ -76,11 +103,95 @@ class Fretboard(object):
             label=finger,
         )
 
+    @property
+    def pitch_table(self):
+        """The pitch of every string and fret (see fretboard2.theory.PitchTable)"""
+        if self.tuning is None:
+            raise ValueError(f"{type(self).__name__} has no tuning")
+        return get_pitch_table(self.tuning, self.capo, max(24, self.frets[-1]))
+
+    def note_at(self, string, fret):
+        """The MIDI number played on a string at a fret"""
+        return self.pitch_table.notes[string][fret]
+
+    def marker_frets(self):
+        """The frets markers can go on: those shown, and open strings at the nut"""
+        first = self.frets[0]
+        for fret in range(first if first == 0 else first + 1, self.frets[-1] + 1):
+            # frets behind a capo can't be played
+            if fret == 0 or fret > self.capo:
+                yield fret
+
+    def add_notes(
+        self,
+        notes,
+        root=None,
+        label=None,
+        color=None,
+        root_color=None,
+        font_color=None,
+    ):
+        """
+        Add a marker at every position on the frets shown that plays one of
+        the given notes, e.g. for scales and arpeggios.
+
+        notes:      note names ("C", "Eb") or pitch classes; or, when root is
+                    given, interval names ("1", "b3", "5")
+        root:       root note name (or pitch class), for interval names
+        label:      None, "note" or "interval", to label markers with their
+                    note or interval name
+        root_color: marker colour for the root, if different
+        """
+        flats = False
+        if root is not None:
+            if not isinstance(root, int):
+                flats = "b" in root[1:]
+                root = pitch_class(root)
+            names = {(root + interval(name)) % 12: name for name in notes}
+        else:
+            names = {}
+            for note in notes:
+                if isinstance(note, int):
+                    names[note % 12] = note_name(note)
+                else:
+                    names[pitch_class(note)] = note
+
+        if label == "interval":
+            if root is None:
+                raise ValueError("Interval labels need a root")
+            labels = names
+        elif label == "note":
+            labels = {
+                pc: name if root is None else note_name(pc, flats)
+                for pc, name in names.items()
+            }
+        elif label is None:
+            labels = dict.fromkeys(names)
+        else:
+            raise ValueError(f"Unknown label {label!r}, expected note or interval")
+
+        pitch_classes = self.pitch_table.pitch_classes
+        frets = list(self.marker_frets())
+        found = [
+            (string, fret, pitch_classes[string][fret])
+            for string in range(len(self.strings))
+            for fret in frets
+            if pitch_classes[string][fret] in labels
+        ]
+        self.add_markers(
+            strings=[string for string, _, _ in found],
+            frets=[fret for _, fret, _ in found],
+            labels=[labels[pc] for _, _, pc in found],
+            colors=[
+                root_color if root_color and pc == root else color for _, _, pc in found
+            ],
+            font_colors=font_color,
+        )
+
     def calculate_layout(self):
         """Figure out spacing on left, right, top etc.
 
         Taking into account whether this is portrait or landscape.
-        Some of these variable names could do with being clearer
 
         Uses the configurtion read in from your config.yml (or defaults)
         Key vars/settings
@@ -95,7 +206,8 @@ class Fretboard(object):
         The config includes settings for title fonts etc too, sizes are taken
         into consideration
 
-        Calculates (as self.layout.THING):
+        Sets self.layout to a fretboard2.layout.Layout, shared by all diagrams
+        of the same shape, which has (amongst its precomputed tables):
             self.layout:
               x:            x coordinate of fretboard (measured from left)
               y:            y coord of fretboard (measured from top)
@@ -103,294 +215,154 @@ class Fretboard(object):
               height:       height of fretboard
               string_space: spacing between strings
               fret_space:   spacing between frets
-              marker_size:  size (diameter/stroke size) for markers and barres
+              radius:       size (diameter/stroke size) for markers and barres
         """
-        # common calculations for both portrait and landscape layouts
-        # both orientations have the title at the top, if there is one
-        self.layout.y = self.style.drawing.spacing
-
-        # if there is a title, it needs some extra space
-        if self.title:
-            self.layout.y += self.style.drawing.spacing + self.style.title.font_size
-
-        # we always have at least the default margin on the left
-        self.layout.x = self.style.drawing.spacing
-
-        # now cope with portrait and landscape differences
-        # portrait:
-        # string labels & title on top
-        # inlays on left, fret numbers on right
-        if self.style.drawing.orientation == "portrait":
-            # fret length, wdith from str[0]->[-1]
-            # ALWAYS leave space on the right for fret labels
-            self.layout.width = self.style.drawing.width - (
-                self.layout.x + self.style.drawing.spacing + self.style.fret_label.width
-            )
-
-            # length of strings, from top to bottom of grid
-            self.layout.height = self.style.drawing.height - (
-                self.layout.y + self.style.drawing.spacing
-            )
-
-            self.layout.string_space = self.layout.width / (len(self.strings) - 1)
-            self.layout.fret_space = (self.layout.height - self.style.nut.size * 2) / (
-                len(self.frets) - 1
-            )
-
-        # landscape:
-        # title and fret numbers (if shown) on top
-        # string labels on left
-        # inlays on bottom
-        else:
-            # if you still have your drawing width < height, this will appear quite sqaushed.
-            self.layout.width = self.style.drawing.height - (
-                self.style.drawing.spacing * 2.25
-            )
-
-            self.layout.height = self.style.drawing.width - (
-                self.style.drawing.spacing * 2 + self.style.fret_label.width
-            )
-
-            self.layout.x = (
-                self.style.drawing.spacing + self.style.string.label_font_size
-            )
-
-            self.layout.y += self.style.fret_label.width
-
-            self.layout.string_space = self.layout.height / (len(self.strings) - 1)
-            self.layout.fret_space = self.layout.width / (len(self.frets) - 1)
-
-        # radius for markers and barres - no more than 60% of the width of a fret
-        self.layout.radius = (
-            min([self.layout.fret_space, self.layout.string_space]) * 0.3
+        self.layout = get_layout(
+            len(self.strings), len(self.frets), self.title, self.style
         )
 
     def get_layout_string_index(self, string_index):
-        if self.style.drawing.orientation == "portrait":
-            return string_index
-        else:
-            return len(self.strings) - string_index - 1
+        return self.layout.layout_string_index(string_index, len(self.strings))
+
+    def presentation(self, role, **attributes):
+        """
+        Presentation attributes (stroke, fill, fonts...) for an element with
+        a role such as "fret" or "marker-label". Normally they're returned
+        unchanged; a drawing with a ``classes`` method (the "css" backend, see
+        fretboard2.css) swaps those its stylesheet sets for a class name.
+        """
+        classes = getattr(self.drawing, "classes", None)
+        if classes is None:
+            return attributes
+        return classes(role, self.style, attributes)
 
     def draw_frets(self):
-        for index, fret in enumerate(self.frets):
+        for index, (start, end) in enumerate(self.layout.frets):
             if index == 0 and self.frets[0] == 0:
                 # The first fret is the nut, don't draw it.
                 continue
-            else:
-                if self.style.drawing.orientation == "portrait":
-                    top = self.layout.y + self.style.nut.size
-                    start = (self.layout.x, top + (self.layout.fret_space * index))
-                    end = (
-                        self.layout.x + self.layout.width,
-                        top + (self.layout.fret_space * index),
-                    )
-                else:
-                    left = self.layout.x + self.style.nut.size
-                    fret_x = left + (self.layout.fret_space * index)
-                    start = (fret_x, self.layout.y)
-                    end = (fret_x, self.layout.y + self.layout.height)
 
-                self.drawing.add(
-                    self.drawing.line(
-                        start=start,
-                        end=end,
+            self.drawing.add(
+                self.drawing.line(
+                    start=start,
+                    end=end,
+                    **self.presentation(
+                        "fret",
                         stroke=self.style.fret.color,
                         stroke_width=self.style.fret.size,
-                    )
+                    ),
                 )
-
-    def draw_strings(self):
-        """
-        Draw lines to represent strings
-        """
-        if self.style.drawing.orientation == "portrait":
-            # vertical strings, y is a constant
-            start = self.layout.y
-            end = start + self.layout.height
-            label_y = (
-                self.layout.y
-                - self.style.drawing.spacing
-                + self.style.drawing.font_size / 2
-            )
-        else:
-            # horizontal strings, x is a constant
-            start = self.layout.x
-            end = start + self.layout.width
-            # x coordinate for string labels
-            label_x = (
-                self.layout.x
-                + self.style.drawing.font_size / 2
-                - self.style.drawing.spacing
             )
 
-        for index, string in enumerate(self.strings):
-            # do we want all our strings the same thickness
-            if self.style.string.equal_weight:
-                string_width = self.style.string.size
-            # otherwise (old default) they get thinner from L->R
-            # or from B->T in landscape orientation
-            else:
-                string_width = self.style.string.size - (
-                    (self.style.string.size / (len(self.strings) * 1.5)) * index
-                )
-
-            # Offset the first and last strings, so they're not drawn outside the edge of the nut.
-            offset = 0
-            str_index = self.get_layout_string_index(index)
-
-            if str_index == 0:
-                offset += string_width / 2.0
-            elif str_index == len(self.strings) - 1:
-                offset -= string_width / 2.0
-
-            if self.style.drawing.orientation == "portrait":
-                # horizontal position of str and its label
-                label_x = (
-                    self.layout.x + (self.layout.string_space * str_index) + offset
-                )
-                string_start = (label_x, start)
-                string_stop = (label_x, end)
+    def get_string_positions(self):
+        """
+        Work out where each string (and its label) goes.
 
-            elif self.style.drawing.orientation == "landscape":
-                # strings go left to right, so only the ex coordinate changes
-                label_y = (
-                    self.layout.y + (self.layout.string_space * str_index) + offset
-                )
-                string_start = (start, label_y)
-                string_stop = (end, label_y)
+        Yields (string, width, start, end, label_position) for each string.
+        """
+        for string, position in zip(self.strings, self.layout.strings):
+            yield (string, *position)
 
+    def draw_strings(self, labels=True):
+        """
+        Draw lines to represent strings, and their labels unless asked not to
+        """
+        for string, width, start, end, label_position in self.get_string_positions():
             self.drawing.add(
                 self.drawing.line(
-                    start=string_start,
-                    end=string_stop,
-                    stroke=string.color or self.style.string.color,
-                    stroke_width=string_width,
+                    start=start,
+                    end=end,
+                    **self.presentation(
+                        "string",
+                        stroke=string.color or self.style.string.color,
+                        stroke_width=width,
+                    ),
                 )
             )
 
             # Draw the label obove the string
+            if labels and string.label is not None:
+                self.draw_string_label(string, label_position)
+
+    def draw_string_labels(self):
+        """
+        Draw only the string labels (e.g. X and O for muted and open strings)
+        """
+        for string, _, _, _, label_position in self.get_string_positions():
             if string.label is not None:
-                self.drawing.add(
-                    self.drawing.text(
-                        string.label,
-                        insert=(label_x, label_y),
-                        font_family=self.style.string.label_font_family
-                        or self.style.drawing.font_family,
-                        font_size=self.style.string.label_font_size
-                        or self.style.drawing.font_size,
-                        font_weight="bold",
-                        fill=string.font_color or self.style.marker.color,
-                        text_anchor="middle",
-                        dominant_baseline="hanging",
-                    )
-                )
+                self.draw_string_label(string, label_position)
 
-    def draw_nut(self):
-        if self.style.drawing.orientation == "portrait":
-            top = self.layout.y + (self.style.nut.size / 2)
-            nut_start = (self.layout.x, top)
-            nut_end = (self.layout.x + self.layout.width, top)
-        else:
-            left = self.layout.x + (self.style.nut.size / 2)
-            nut_start = (left, self.layout.y)
-            nut_end = (left, self.layout.y + self.layout.height)
+    def draw_string_label(self, string, position):
+        self.drawing.add(
+            self.drawing.text(
+                string.label,
+                insert=position,
+                **self.presentation(
+                    "string-label",
+                    font_family=self.style.string.label_font_family
+                    or self.style.drawing.font_family,
+                    font_size=self.style.string.label_font_size
+                    or self.style.drawing.font_size,
+                    font_weight="bold",
+                    fill=string.font_color or self.style.marker.color,
+                    text_anchor="middle",
+                    dominant_baseline="hanging",
+                ),
+            )
+        )
 
+    def draw_nut(self):
         if self.frets[0] == 0:
+            nut_start, nut_end = self.layout.nut
             self.drawing.add(
                 self.drawing.line(
                     start=nut_start,
                     end=nut_end,
-                    stroke=self.style.nut.color,
-                    stroke_width=self.style.nut.size,
+                    **self.presentation(
+                        "nut",
+                        stroke=self.style.nut.color,
+                        stroke_width=self.style.nut.size,
+                    ),
                 )
             )
 
-    def draw_inlays(self):
-        for index, fret in enumerate(self.frets):
-            if index == 0:
-                continue
-
-            inlay_dist = (
-                self.style.nut.size
-                + self.layout.fret_space * index
-                - self.layout.fret_space / 2
-            )
-
-            if self.style.drawing.orientation == "portrait":
-                x = self.style.drawing.spacing - (self.style.inlays.radius * 4)
-                y = self.layout.y + inlay_dist
-            else:
-                x = self.layout.x + inlay_dist
-                y = self.layout.y + self.layout.height + (self.style.inlays.radius * 4)
-
+    def get_inlay_kinds(self):
+        """
+        The inlay at each fret shown: 1 for a single dot, 2 for a double dot
+        (at the 12th, 24th...), or 0 for none. The first fret shown (the nut,
+        or the fret behind the first one played) never has one.
+        """
+        kinds = [0]
+        for fret in self.frets[1:]:
             if fret in self.inlays or fret - 12 in self.inlays:
-                # Single dot inlay
-                self.drawing.add(
-                    self.drawing.circle(
-                        center=(x, y),
-                        r=self.style.inlays.radius,
-                        fill=self.style.inlays.color,
-                    )
-                )
+                kinds.append(1)
             elif fret > 0 and not fret % 12:
-                if self.style.drawing.orientation == "portrait":
-                    dot_1 = (x, y - (self.style.inlays.radius * 2))
-                    dot_2 = (x, y + (self.style.inlays.radius * 2))
-                else:
-                    dot_1 = (x - (self.style.inlays.radius * 2), y)
-                    dot_2 = (x + (self.style.inlays.radius * 2), y)
+                kinds.append(2)
+            else:
+                kinds.append(0)
+        return kinds
 
-                # Double dot inlay
-                self.drawing.add(
-                    self.drawing.circle(
-                        center=dot_1,
-                        r=self.style.inlays.radius,
-                        fill=self.style.inlays.color,
-                    )
-                )
+    def draw_inlays(self):
+        for index, kind in enumerate(self.get_inlay_kinds()):
+            if not kind:
+                continue
+
+            single, double = self.layout.inlays[index]
+            for center in (single,) if kind == 1 else double:
                 self.drawing.add(
                     self.drawing.circle(
-                        center=dot_2,
+                        center=center,
                         r=self.style.inlays.radius,
-                        fill=self.style.inlays.color,
+                        **self.presentation("inlay", fill=self.style.inlays.color),
                     )
                 )
 
     def draw_fret_label(self):
         if self.frets[0] > 0:
-            if self.style.drawing.orientation == "portrait":
-                # in portrait, x stays constant
-                px = sum(
-                    (
-                        self.layout.x,
-                        self.layout.width,
-                        self.layout.radius,
-                        self.style.marker.stroke_width,
-                        self.style.fret_label.width / 2,
-                    )
-                )
-            else:
-                # in landscape, y stays constant
-                ly = (
-                    self.layout.y
-                    - self.layout.radius
-                    - self.style.marker.stroke_width
-                    - self.style.fret_label.width / 2
-                )
-
-            fretlabels = []
-            for i, f in enumerate(self.frets[:-1]):
-                offset = sum(
-                    (
-                        self.style.nut.size,
-                        self.layout.fret_space / 2,
-                        self.layout.fret_space * i,
-                    )
-                )
-                if self.style.drawing.orientation == "portrait":
-                    fretlabels.append((px, self.layout.y + offset, str(f)))
-                else:
-                    fretlabels.append((self.layout.x + offset, ly, str(f)))
+            fretlabels = [
+                (x, y, str(f))
+                for (x, y), f in zip(self.layout.fret_labels, self.frets[:-1])
+            ]
 
             # if we aren't in first (open) position
             if not self.style.drawing.label_all_frets:
@@ -402,55 +374,54 @@ class Fretboard(object):
                     self.drawing.text(
                         label,
                         insert=(x, y),
-                        font_family=self.style.drawing.font_family,
-                        font_size=self.style.fret.label.font_size
-                        or self.style.drawing.font_size,
-                        font_style="italic",
-                        font_weight="bold",
-                        fill=self.style.drawing.font_color,
-                        text_anchor="middle",
+                        **self.presentation(
+                            "fret-label",
+                            font_family=self.style.drawing.font_family,
+                            font_size=self.style.fret.label.font_size
+                            or self.style.drawing.font_size,
+                            font_style="italic",
+                            font_weight="bold",
+                            fill=self.style.drawing.font_color,
+                            text_anchor="middle",
+                        ),
                     )
                 )
 
-    def draw_markers(self):
-        for marker in self.markers:
-            if isinstance(marker.string, (list, tuple)):
-                self.draw_barre(marker)
-            else:
-                self.draw_marker(marker)
+    def draw_markers(self, positions=None):
+        """
+        Draw barres, then markers.
+
+        positions: optionally, precomputed positions for each barre and then
+                   each marker (see fretboard2.vectorized), as would be
+                   returned by self.layout.barre_position()/marker_position()
+        """
+        barre_count = len(self.barres)
+        if positions is None:
+            positions = [None] * (barre_count + len(self.markers))
+
+        for barre, position in zip(self.barres, positions):
+            self.draw_barre(barre, position)
+        for marker, position in zip(self.markers, positions[barre_count:]):
+            self.draw_marker(marker, position)
 
-    def draw_marker(self, marker):
+    def draw_marker(self, marker, position=None):
         # Fretted position, add the marker to the fretboard.
-        marker_string = self.get_layout_string_index(marker.string)
-
-        if self.style.drawing.orientation == "portrait":
-            x = self.layout.x + (self.layout.string_space * marker_string)
-            y = sum(
-                (
-                    self.layout.y,
-                    self.style.nut.size,
-                    (self.layout.fret_space * (marker.fret - self.frets[0]))
-                    - (self.layout.fret_space / 2),
-                )
+        if position is None:
+            position = self.layout.marker_position(
+                marker.string, marker.fret - self.frets[0]
             )
-        else:
-            x = sum(
-                (
-                    self.layout.x,
-                    self.style.nut.size,
-                    (self.layout.fret_space * (marker.fret - self.frets[0]))
-                    - (self.layout.fret_space / 2),
-                )
-            )
-            y = self.layout.y + (self.layout.string_space * marker_string)
+        x, y = position
 
         self.drawing.add(
             self.drawing.circle(
                 center=(x, y),
                 r=self.layout.radius,
-                fill=marker.color or self.style.marker.color,
-                stroke=self.style.marker.border_color,
-                stroke_width=self.style.marker.stroke_width,
+                **self.presentation(
+                    "marker",
+                    fill=marker.color or self.style.marker.color,
+                    stroke=self.style.marker.border_color,
+                    stroke_width=self.style.marker.stroke_width,
+                ),
             )
         )
 
@@ -460,59 +431,25 @@ class Fretboard(object):
                 self.drawing.text(
                     marker.label,
                     insert=(x, y),
-                    font_family=self.style.drawing.font_family,
-                    font_size=self.style.drawing.font_size,
-                    font_weight="bold",
-                    fill=marker.font_color or self.style.marker.font_color,
-                    text_anchor="middle",
-                    alignment_baseline="central",
-                    dominant_baseline="middle",
-                )
-            )
-
-    def draw_barre(self, marker):
-        marker_string_0 = self.get_layout_string_index(marker.string[0])
-        marker_string_1 = self.get_layout_string_index(marker.string[1])
-
-        if self.style.drawing.orientation == "portrait":
-            y = sum(
-                (
-                    self.layout.y,
-                    self.style.nut.size,
-                    (self.layout.fret_space * (marker.fret - self.frets[0]))
-                    - (self.layout.fret_space / 2),
+                    **self.presentation(
+                        "marker-label",
+                        font_family=self.style.drawing.font_family,
+                        font_size=self.style.drawing.font_size,
+                        font_weight="bold",
+                        fill=marker.font_color or self.style.marker.font_color,
+                        text_anchor="middle",
+                        alignment_baseline="central",
+                        dominant_baseline="middle",
+                    ),
                 )
             )
-            start = (
-                self.style.drawing.spacing
-                + (self.layout.string_space * marker_string_0),
-                y,
-            )
-            end = (
-                self.style.drawing.spacing
-                + (self.layout.string_space * marker_string_1),
-                y,
-            )
 
-        else:
-            x = sum(
-                (
-                    self.layout.x,
-                    self.style.nut.size,
-                    (self.layout.fret_space * (marker.fret - self.frets[0]))
-                    - (self.layout.fret_space / 2),
-                )
-            )
-            start = (
-                x,
-                self.style.drawing.spacing
-                + (self.layout.string_space * marker_string_1),
-            )
-            end = (
-                x,
-                self.style.drawing.spacing
-                + (self.layout.string_space * marker_string_0),
+    def draw_barre(self, marker, position=None):
+        if position is None:
+            position = self.layout.barre_position(
+                marker.string[0], marker.string[1], marker.fret - self.frets[0]
             )
+        start, end = position
 
         # Lines don't support borders, so fake it by drawing
         # a slightly larger line behind it.
@@ -520,9 +457,12 @@ class Fretboard(object):
             self.drawing.line(
                 start=start,
                 end=end,
-                stroke=self.style.marker.border_color,
-                stroke_linecap="round",
-                stroke_width=self.layout.radius * 2,
+                **self.presentation(
+                    "barre-border",
+                    stroke=self.style.marker.border_color,
+                    stroke_linecap="round",
+                    stroke_width=self.layout.radius * 2,
+                ),
             )
         )
 
@@ -530,9 +470,12 @@ class Fretboard(object):
             self.drawing.line(
                 start=start,
                 end=end,
-                stroke=self.style.marker.color,
-                stroke_linecap="round",
-                stroke_width=self.style.marker.radius * 2,
+                **self.presentation(
+                    "barre",
+                    stroke=self.style.marker.color,
+                    stroke_linecap="round",
+                    stroke_width=self.style.marker.radius * 2,
+                ),
             )
         )
 
@@ -541,42 +484,39 @@ class Fretboard(object):
                 self.drawing.text(
                     marker.label,
                     insert=start,
-                    font_family=self.style.drawing.font_family,
-                    font_size=self.style.drawing.font_size,
-                    font_weight="bold",
-                    fill=self.style.marker.font_color,
-                    text_anchor="middle",
-                    alignment_baseline="central",
-                    dominant_baseline="middle",
+                    **self.presentation(
+                        "barre-label",
+                        font_family=self.style.drawing.font_family,
+                        font_size=self.style.drawing.font_size,
+                        font_weight="bold",
+                        fill=self.style.marker.font_color,
+                        text_anchor="middle",
+                        alignment_baseline="central",
+                        dominant_baseline="middle",
+                    ),
                 )
             )
 
     def draw_title(self):
         if self.title is not None:
-            x = self.layout.width / 2 + self.style.drawing.spacing
-            y = self.style.drawing.spacing
             self.drawing.add(
                 self.drawing.text(
                     self.title,
-                    insert=(x, y),
-                    font_family=self.style.drawing.font_family,
-                    font_size=self.style.drawing.font_size,
-                    font_weight="bold",
-                    fill=self.style.title.font_color,
-                    text_anchor="middle",
-                    alignment_baseline="central",
-                    dominant_baseline="hanging",
+                    insert=self.layout.title,
+                    **self.presentation(
+                        "title",
+                        font_family=self.style.drawing.font_family,
+                        font_size=self.style.drawing.font_size,
+                        font_weight="bold",
+                        fill=self.style.title.font_color,
+                        text_anchor="middle",
+                        alignment_baseline="central",
+                        dominant_baseline="hanging",
+                    ),
                 )
             )
 
-    def draw(self):
-        self.drawing = svgwrite.Drawing(
-            size=(
-                self.style.drawing.width,
-                self.style.drawing.height,
-            )
-        )
-
+    def draw_background(self):
         if self.style.drawing.background_color is not None:
             self.drawing.add(
                 self.drawing.rect(
@@ -585,43 +525,245 @@ class Fretboard(object):
                         self.style.drawing.width,
                         self.style.drawing.height,
                     ),
-                    fill=self.style.drawing.background_color,
+                    **self.presentation(
+                        "background", fill=self.style.drawing.background_color
+                    ),
                 )
             )
 
-        self.calculate_layout()
+    def static_key(self, backend=None):
+        """
+        Everything the static layer (see get_static_layer) depends on: the
+        shape of the diagram, rather than which frets are shown
+        """
+        return (
+            type(self),
+            backend_name(backend or self.backend),
+            # styles are slow to hash; backgrounds.pool keeps them alive
+            id(self.style),
+            len(self.frets),
+            # in open position, the nut is drawn rather than the first fret
+            self.frets[0] == 0,
+            tuple(self.get_inlay_kinds()),
+            tuple(string.color for string in self.strings),
+            # a title moves everything down
+            bool(self.title),
+        )
+
+    def get_static_layer(self, backend=None):
+        """
+        The elements which don't depend on markers, labels or which frets
+        are shown, drawn with self.drawing, as three lists: background,
+        frets and inlays; each string's line; and the nut.
+
+        They're kept, and reused by later draws until something they
+        depend on changes, so re-rendering after adding a marker or label
+        only draws the fret labels, markers, string labels and title again.
+        Backends whose elements can be shared between drawings also share
+        them between fretboards, see fretboard2.backgrounds.
+        """
+        key = self.static_key(backend)
+        if self._static is not None and self._static[0] == key:
+            return self._static[1][1]
+
+        drawing = self.drawing
+        shared = getattr(drawing, "shared_elements", False)
+        if shared:
+            entry = backgrounds.pool.get(key)
+            if entry is not None:
+                self._static = (key, entry)
+                return entry[1]
+
+        layers = ([], [], [])
+        self.drawing = DrawingTarget(drawing, layers[0])
+        self.draw_background()
         self.draw_frets()
         self.draw_inlays()
-        self.draw_fret_label()
-        self.draw_strings()
+        self.drawing = DrawingTarget(drawing, layers[1])
+        self.draw_strings(labels=False)
+        self.drawing = DrawingTarget(drawing, layers[2])
         self.draw_nut()
-        self.draw_markers()
+        self.drawing = drawing
+
+        entry = (self.style, layers)
+        if shared:
+            backgrounds.pool.set(key, entry)
+        # drawings which note what's drawn with them (the css backend's
+        # stylesheet) need every element drawn afresh
+        if getattr(drawing, "classes", None) is None:
+            self._static = (key, entry)
+        return layers
+
+    def draw(self, backend=None, marker_positions=None):
+        drawing_factory = get_backend(backend or self.backend)
+        self.drawing = drawing_factory(
+            (
+                self.style.drawing.width,
+                self.style.drawing.height,
+            )
+        )
+
+        self.calculate_layout()
+        recording = self._recording
+        if recording is not None:
+            recording.mark("layout", self.drawing)
+        before_strings, string_lines, after_strings = self.get_static_layer(backend)
+
+        add = self.drawing.add
+        for element in before_strings:
+            add(element)
+        if recording is not None:
+            recording.mark("static", self.drawing)
+        self.draw_fret_label()
+        if recording is not None:
+            recording.mark("fret_label", self.drawing)
+        for line, (string, _, _, _, label_position) in zip(
+            string_lines, self.get_string_positions()
+        ):
+            add(line)
+            if string.label is not None:
+                self.draw_string_label(string, label_position)
+        if recording is not None:
+            recording.mark("strings", self.drawing)
+        for element in after_strings:
+            add(element)
+        if recording is not None:
+            recording.mark("nut", self.drawing)
+
+        self.draw_markers(marker_positions)
+        if recording is not None:
+            recording.mark("markers", self.drawing)
         self.draw_title()
+        if recording is not None:
+            recording.mark("title", self.drawing)
 
-    def render(self, output=None):
-        self.draw()
+    def cache_key(self, backend=None):
+        """
+        Everything that affects the rendered output, as a tuple of plain values
+        """
+        return (
+            type(self).__module__,
+            type(self).__qualname__,
+            tuple(self.frets),
+            tuple((s.color, s.label, s.font_color) for s in self.strings),
+            tuple(self.barres),
+            tuple(self.markers),
+            tuple(self.inlays),
+            self.title,
+            self.style,
+            backend_name(backend or self.backend),
+        )
 
+    def render(self, output=None, backend=None, cache=None):
         if output is None:
             output = StringIO()
 
-        self.drawing.write(output)
+        if cache is None:
+            cache = self.cache
+
+        if cache is not None:
+            output.write(self._cached(cache, backend))
+            return output
+
+        return self._render(output, backend)
+
+    def _cached(self, cache, backend=None):
+        return cache.fetch(
+            self.cache_key(backend),
+            lambda: self._render(StringIO(), backend).getvalue(),
+        )
+
+    def _render(self, output, backend=None):
+        if self.profiler is not None and self._recording is None:
+            return self._profile(self._render, output, backend)
+
+        self.draw(backend=backend)
+        if self._recording is None:
+            self.drawing.write(output)
+        else:
+            start = tell(output)
+            self.drawing.write(output)
+            end = tell(output)
+            self._recording.mark("write", size=None if end is None else end - start)
         return output
 
-    def save(self, filename):
-        with open(filename, "w") as output:
-            self.render(output)
+    def _profile(self, render, *args):
+        """Run render(*args) (_render or _stream), recording it as a diagram"""
+        recording = self._recording = self.profiler.begin(self)
+        try:
+            result = render(*args)
+        finally:
+            self._recording = None
+        recording.finish()
+        return result
+
+    def stream(self, fileobj, backend=None, cache=None, compress=False):
+        """
+        Write the SVG to a binary file object (or socket) as it's produced,
+        gzipped if compress is set (see fretboard2.stream).
+
+        Returns the number of bytes written.
+        """
+        if cache is None:
+            cache = self.cache
+
+        if cache is not None:
+            return write_text(self._cached(cache, backend), fileobj, compress)
+
+        return self._stream(fileobj, backend, compress)
+
+    def _stream(self, fileobj, backend=None, compress=False):
+        if self.profiler is not None and self._recording is None:
+            return self._profile(self._stream, fileobj, backend, compress)
+
+        self.draw(backend=backend)
+        written = write_drawing(self.drawing, fileobj, compress=compress)
+        if self._recording is not None:
+            self._recording.mark("write", size=written)
+        return written
+
+    def save(self, filename, backend=None, cache=None, store=None):
+        """
+        Save as SVG, or gzipped SVG if filename ends with .svgz. With a store
+        (see fretboard2.store), identical diagrams share one file.
+        """
+        if store is None:
+            store = self.store
+
+        if store is not None:
+            store.save(self, filename, backend=backend, cache=cache)
+            return
+
+        if is_compressed(filename):
+            save_file(
+                filename,
+                lambda output: self.stream(
+                    output, backend=backend, cache=cache, compress=True
+                ),
+                binary=True,
+            )
+            return
+
+        save_file(
+            filename, lambda output: self.render(output, backend=backend, cache=cache)
+        )
 
 
 class GuitarFretboard(Fretboard):
     string_count = 6
     inlays = (3, 5, 7, 9)
+    # open string pitches, from string 0
+    tuning = ("E2", "A2", "D3", "G3", "B3", "E4")
 
 
 class BassFretboard(Fretboard):
     string_count = 4
     inlays = (3, 5, 7, 9)
+    tuning = ("E1", "A1", "D2", "G2")
 
 
 class UkuleleFretboard(Fretboard):
     string_count = 4
     inlays = (3, 5, 7, 10)
+    # re-entrant (high G) tuning
+    tuning = ("G4", "C4", "E4", "A4")
@@ -0,0 +1,478 @@
+"""
+Precomputed diagram geometry.
+
+Where everything goes on a diagram depends only on the number of strings,
+the number of frets shown, whether there is a title, and a handful of
+style settings (orientation, sizes, spacing). ``get_layout`` computes a
+``Layout`` holding coordinate tables for all of it once, and caches it, so
+every diagram with the same shape shares one table and drawing becomes a
+series of lookups.
+
+Each table is computed with exactly the arithmetic the draw methods
+used to do inline, so output is unchanged to the last decimal place.
+"""
+
+
+class Orientation(object):
+    """
+    The geometry that differs between orientations, as a strategy for
+    Layout. Positions are worked out as distances across the strings and
+    along them (down the neck), which point() turns into (x, y).
+
+    Layout picks its orientation once, for a diagram shape, so nothing per
+    element needs to ask which orientation it's in. Further orientations
+    are a subclass, registered in ORIENTATIONS.
+    """
+
+    name = None
+
+    def frame(self, layout, string_count, fret_count, geometry):
+        """Set the layout's x, y, width, height, string_space and fret_space"""
+        raise NotImplementedError
+
+    def origins(self, layout):
+        """Where the strings start (across them) and where the frets do (along)"""
+        raise NotImplementedError
+
+    def string_order(self, index, string_count):
+        """Position across the fretboard of a string, by index"""
+        return index
+
+    def point(self, across, along):
+        raise NotImplementedError
+
+    def span(self, first, last, along):
+        """Start and end points of a barre from first to last (across)"""
+        raise NotImplementedError
+
+    def string(self, layout, across, spacing, font_size):
+        """(start, end, label_position) of the string at across"""
+        raise NotImplementedError
+
+    def fret(self, layout, index, nut_size):
+        """(start, end) of a fret line"""
+        raise NotImplementedError
+
+    def inlay(self, layout, inlay_dist, spacing, radius):
+        """(single dot centre, (double dot centres)) for a fret"""
+        raise NotImplementedError
+
+    def fret_label(self, layout, offset, stroke_width, fret_label_width):
+        raise NotImplementedError
+
+    def nut(self, layout, nut_size):
+        raise NotImplementedError
+
+
+class Portrait(Orientation):
+    """
+    Vertical strings, string 0 on the left: string labels and title on top,
+    inlays on the left, fret numbers on the right
+    """
+
+    name = "portrait"
+
+    def frame(self, layout, string_count, fret_count, geometry):
+        width, height, spacing, nut_size, fret_label_width, _ = geometry
+        # fret length, wdith from str[0]->[-1]
+        # ALWAYS leave space on the right for fret labels
+        layout.width = width - (layout.x + spacing + fret_label_width)
+
+        # length of strings, from top to bottom of grid
+        layout.height = height - (layout.y + spacing)
+
+        layout.string_space = layout.width / (string_count - 1)
+        layout.fret_space = (layout.height - nut_size * 2) / (fret_count - 1)
+
+    def origins(self, layout):
+        return layout.x, layout.y
+
+    def point(self, across, along):
+        return (across, along)
+
+    def span(self, first, last, along):
+        return ((first, along), (last, along))
+
+    def string(self, layout, across, spacing, font_size):
+        # vertical strings, y is a constant
+        start = layout.y
+        end = start + layout.height
+        label_y = layout.y - spacing + font_size / 2
+        return (across, start), (across, end), (across, label_y)
+
+    def fret(self, layout, index, nut_size):
+        top = layout.y + nut_size
+        start = (layout.x, top + (layout.fret_space * index))
+        end = (layout.x + layout.width, top + (layout.fret_space * index))
+        return start, end
+
+    def inlay(self, layout, inlay_dist, spacing, radius):
+        x = spacing - (radius * 4)
+        y = layout.y + inlay_dist
+        return (x, y), ((x, y - (radius * 2)), (x, y + (radius * 2)))
+
+    def fret_label(self, layout, offset, stroke_width, fret_label_width):
+        # in portrait, x stays constant
+        px = sum(
+            (
+                layout.x,
+                layout.width,
+                layout.radius,
+                stroke_width,
+                fret_label_width / 2,
+            )
+        )
+        return (px, layout.y + offset)
+
+    def nut(self, layout, nut_size):
+        top = layout.y + (nut_size / 2)
+        return ((layout.x, top), (layout.x + layout.width, top))
+
+
+class Landscape(Orientation):
+    """
+    Horizontal strings, string 0 at the bottom: title and fret numbers on
+    top, string labels on the left, inlays on the bottom
+    """
+
+    name = "landscape"
+
+    def frame(self, layout, string_count, fret_count, geometry):
+        width, height, spacing, nut_size, fret_label_width, label_font_size = geometry
+        # if you still have your drawing width < height, this will appear quite sqaushed.
+        layout.width = height - (spacing * 2.25)
+
+        layout.height = width - (spacing * 2 + fret_label_width)
+
+        layout.x = spacing + label_font_size
+
+        layout.y += fret_label_width
+
+        layout.string_space = layout.height / (string_count - 1)
+        layout.fret_space = layout.width / (fret_count - 1)
+
+    def origins(self, layout):
+        return layout.y, layout.x
+
+    def string_order(self, index, string_count):
+        return string_count - index - 1
+
+    def point(self, across, along):
+        return (along, across)
+
+    def span(self, first, last, along):
+        return ((along, last), (along, first))
+
+    def string(self, layout, across, spacing, font_size):
+        # horizontal strings, x is a constant
+        start = layout.x
+        end = start + layout.width
+        # x coordinate for string labels
+        label_x = layout.x + font_size / 2 - spacing
+        return (start, across), (end, across), (label_x, across)
+
+    def fret(self, layout, index, nut_size):
+        left = layout.x + nut_size
+        fret_x = left + (layout.fret_space * index)
+        return (fret_x, layout.y), (fret_x, layout.y + layout.height)
+
+    def inlay(self, layout, inlay_dist, spacing, radius):
+        x = layout.x + inlay_dist
+        y = layout.y + layout.height + (radius * 4)
+        return (x, y), ((x - (radius * 2), y), (x + (radius * 2), y))
+
+    def fret_label(self, layout, offset, stroke_width, fret_label_width):
+        # in landscape, y stays constant
+        ly = layout.y - layout.radius - stroke_width - fret_label_width / 2
+        return (layout.x + offset, ly)
+
+    def nut(self, layout, nut_size):
+        left = layout.x + (nut_size / 2)
+        return ((left, layout.y), (left, layout.y + layout.height))
+
+
+# style.drawing.orientation -> Orientation
+ORIENTATIONS = {
+    orientation.name: orientation for orientation in (Portrait(), Landscape())
+}
+
+
+def get_orientation(name):
+    try:
+        return ORIENTATIONS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown orientation {name!r}, expected one of "
+            f"{', '.join(ORIENTATIONS)}"
+        ) from None
+
+
+class Layout(object):
+    """
+    Coordinates for one diagram shape. Treat as read-only, it is shared.
+
+    Scalars (as calculated by ``Fretboard.calculate_layout``):
+      x, y:          top left of the fretboard
+      width, height: size of the fretboard
+      string_space:  spacing between strings
+      fret_space:    spacing between frets
+      radius:        radius for markers and barres
+      fret_origin:   where the frets start, along the strings
+
+    Tables, by string index (as passed to add_marker etc):
+      strings:        (width, start, end, label_position) for each string
+      marker_strings: marker coordinate across the strings
+      barre_strings:  barre end coordinate across the strings
+      positions:      marker centre at each fret index, for each string
+
+    Tables, by fret index (position within the frets shown):
+      frets:          (start, end) of each fret line
+      fret_centres:   marker coordinate along the strings, for a fret
+      inlays:         (single dot centre, (double dot centres)) for a fret
+      fret_labels:    where each fret number goes
+
+    And:
+      orientation: the Orientation it was laid out for
+      nut:         (start, end) of the nut
+      title:       position of the title
+    """
+
+    __slots__ = (
+        "orientation",
+        "x",
+        "y",
+        "width",
+        "height",
+        "string_space",
+        "fret_space",
+        "radius",
+        "fret_origin",
+        "strings",
+        "marker_strings",
+        "barre_strings",
+        "positions",
+        "frets",
+        "fret_centres",
+        "inlays",
+        "fret_labels",
+        "nut",
+        "title",
+        "_nut_size",
+    )
+
+    def __init__(self, string_count, fret_count, has_title, geometry):
+        (
+            orientation,
+            width,
+            height,
+            spacing,
+            font_size,
+            title_font_size,
+            nut_size,
+            fret_label_width,
+            string_size,
+            equal_weight,
+            label_font_size,
+            inlay_radius,
+            stroke_width,
+        ) = geometry
+
+        self.orientation = orientation = get_orientation(orientation)
+        self._nut_size = nut_size
+
+        # common calculations for both portrait and landscape layouts
+        # both orientations have the title at the top, if there is one
+        self.y = spacing
+
+        # if there is a title, it needs some extra space
+        if has_title:
+            self.y += spacing + title_font_size
+
+        # we always have at least the default margin on the left
+        self.x = spacing
+
+        # now cope with portrait and landscape differences
+        orientation.frame(
+            self,
+            string_count,
+            fret_count,
+            (width, height, spacing, nut_size, fret_label_width, label_font_size),
+        )
+
+        # radius for markers and barres - no more than 60% of the width of a fret
+        self.radius = min([self.fret_space, self.string_space]) * 0.3
+
+        across, self.fret_origin = orientation.origins(self)
+
+        layout_strings = [
+            self.layout_string_index(index, string_count)
+            for index in range(string_count)
+        ]
+
+        self.strings = tuple(
+            self._string(
+                index,
+                layout_strings[index],
+                string_count,
+                spacing,
+                font_size,
+                string_size,
+                equal_weight,
+            )
+            for index in range(string_count)
+        )
+        self.marker_strings = tuple(
+            across + (self.string_space * layout_string)
+            for layout_string in layout_strings
+        )
+        self.barre_strings = tuple(
+            spacing + (self.string_space * layout_string)
+            for layout_string in layout_strings
+        )
+
+        self.frets = tuple(
+            orientation.fret(self, index, nut_size) for index in range(fret_count)
+        )
+        self.fret_centres = tuple(
+            self.fret_centre(index) for index in range(fret_count)
+        )
+        self.positions = tuple(
+            tuple(orientation.point(across, along) for along in self.fret_centres)
+            for across in self.marker_strings
+        )
+        self.inlays = tuple(
+            orientation.inlay(
+                self,
+                nut_size + self.fret_space * index - self.fret_space / 2,
+                spacing,
+                inlay_radius,
+            )
+            for index in range(fret_count)
+        )
+        self.fret_labels = tuple(
+            self._fret_label(index, nut_size, stroke_width, fret_label_width)
+            for index in range(fret_count - 1)
+        )
+
+        self.nut = orientation.nut(self, nut_size)
+
+        self.title = (self.width / 2 + spacing, spacing)
+
+    def layout_string_index(self, string_index, string_count):
+        return self.orientation.string_order(string_index, string_count)
+
+    def fret_centre(self, index):
+        """Coordinate along the strings of the middle of a fret"""
+        return sum(
+            (
+                self.fret_origin,
+                self._nut_size,
+                (self.fret_space * index) - (self.fret_space / 2),
+            )
+        )
+
+    def along(self, index):
+        """fret_centres[index], for frets outside those shown too"""
+        if 0 <= index < len(self.fret_centres):
+            return self.fret_centres[index]
+        # outside the frets shown, but we'll draw it anyway
+        return self.fret_centre(index)
+
+    def marker_position(self, string, index):
+        """Centre of a marker on a string (by index) and fret (by fret index)"""
+        if 0 <= index < len(self.fret_centres):
+            return self.positions[string][index]
+        return self.orientation.point(
+            self.marker_strings[string], self.fret_centre(index)
+        )
+
+    def barre_position(self, first_string, last_string, index):
+        """Start and end points of a barre across strings at a fret index"""
+        return self.orientation.span(
+            self.barre_strings[first_string],
+            self.barre_strings[last_string],
+            self.along(index),
+        )
+
+    def _string(
+        self,
+        index,
+        str_index,
+        string_count,
+        spacing,
+        font_size,
+        string_size,
+        equal_weight,
+    ):
+        # do we want all our strings the same thickness
+        if equal_weight:
+            string_width = string_size
+        # otherwise (old default) they get thinner from L->R
+        # or from B->T in landscape orientation
+        else:
+            string_width = string_size - ((string_size / (string_count * 1.5)) * index)
+
+        # Offset the first and last strings, so they're not drawn outside the edge of the nut.
+        offset = 0
+
+        if str_index == 0:
+            offset += string_width / 2.0
+        elif str_index == string_count - 1:
+            offset -= string_width / 2.0
+
+        # position across the strings of the string, and its label
+        across = self.orientation.origins(self)[0]
+        across = across + (self.string_space * str_index) + offset
+        return (
+            string_width,
+            *self.orientation.string(self, across, spacing, font_size),
+        )
+
+    def _fret_label(self, index, nut_size, stroke_width, fret_label_width):
+        offset = sum(
+            (
+                nut_size,
+                self.fret_space / 2,
+                self.fret_space * index,
+            )
+        )
+        return self.orientation.fret_label(self, offset, stroke_width, fret_label_width)
+
+
+def geometry_key(style):
+    """The style settings that affect a diagram's layout"""
+    return (
+        style.drawing.orientation,
+        style.drawing.width,
+        style.drawing.height,
+        style.drawing.spacing,
+        style.drawing.font_size,
+        style.title.font_size,
+        style.nut.size,
+        style.fret_label.width,
+        style.string.size,
+        style.string.equal_weight,
+        style.string.label_font_size,
+        style.inlays.radius,
+        style.marker.stroke_width,
+    )
+
+
+_layouts = {}
+# diagram shapes are few, but don't let unusual callers grow this forever
+_LAYOUT_CACHE_SIZE = 1024
+
+
+def get_layout(string_count, fret_count, has_title, style):
+    """The (shared) layout for a diagram shape"""
+    key = (string_count, fret_count, bool(has_title), geometry_key(style))
+    try:
+        return _layouts[key]
+    except KeyError:
+        pass
+
+    layout = Layout(*key)
+    if len(_layouts) >= _LAYOUT_CACHE_SIZE:
+        _layouts.clear()
+    _layouts[key] = layout
+    return layout
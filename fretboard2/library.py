@@ -0,0 +1,361 @@
+"""
+A compact binary format for large chord libraries.
+
+Each chord is a fixed-width record: the instrument, the fret on each
+string, the fingering, the barre and the index of its title in a table of
+(distinct) titles at the end of the file. Millions of voicings take a few
+tens of MB, and need no parsing to read::
+
+    write_library("voicings.fbl", chords)
+
+    with ChordLibrary("voicings.fbl") as library:
+        print(len(library))
+        chord = library[123456]          # a Chord, ready to render
+        for chord in library[1000:2000]:
+            ...
+
+The library is memory-mapped rather than read, so opening it costs nothing
+however big it is, and records are only decoded (and ``Chord`` objects
+only created) as they're asked for. Slices are views, sharing the mapping.
+
+``write_library`` takes Chord objects, chord specs (dicts, see
+fretboard2.specs) and voicings (see fretboard2.voicings). Styles aren't
+stored; pass one to ChordLibrary to use for every chord.
+
+File layout (little-endian):
+
+    header   magic, version, record size, record count, titles offset
+    records  RECORD, one per chord
+    titles   count, count + 1 offsets into the text, then the UTF-8 text
+"""
+
+import mmap
+import struct
+from collections.abc import Mapping, Sequence
+
+from .chord import Chord, parse_positions
+from .specs import INSTRUMENTS
+
+MAGIC = b"FB2CHORD"
+VERSION = 1
+
+HEADER = struct.Struct("<8sHHQQ4x")
+# instrument, strings, positions, fingers, barre, (padding), title
+RECORD = struct.Struct("<BB8s8sBxI")
+COUNT = struct.Struct("<Q")
+OFFSETS = struct.Struct("<QQ")
+
+MAX_STRINGS = 8
+# in positions and barre: a muted string, or no barre
+NONE = 255
+NO_TITLE = 0xFFFFFFFF
+
+# instrument code -> (name, chord class)
+INSTRUMENT_CODES = tuple((name, classes[0]) for name, classes in INSTRUMENTS.items())
+
+# records decoded at a time when iterating
+_CHUNK = 4096
+# decoded titles to keep
+_TITLE_CACHE_SIZE = 4096
+
+# stored fret -> fret, or None for a muted string; and back
+_FRETS = tuple(range(NONE)) + (None,)
+_CODES = {fret: code for code, fret in enumerate(_FRETS)}
+
+
+def instrument_code(chord_cls):
+    """The code for a Chord class (or one it derives from)"""
+    for code, (_, cls) in enumerate(INSTRUMENT_CODES):
+        if issubclass(chord_cls, cls):
+            return code
+    raise ValueError(f"{chord_cls.__name__} isn't a chord class a library can store")
+
+
+def chord_fields(item):
+    """
+    (chord class, positions, fingers, barre, title) for a Chord, a chord
+    spec or a voicing
+    """
+    if isinstance(item, Chord):
+        return type(item), item.positions, item.fingers, item.barre, item.title
+    if isinstance(item, Mapping):
+        if item.get("type", "chord") != "chord":
+            raise ValueError("Only chords can be stored in a library")
+        unknown = set(item) - {
+            "type",
+            "instrument",
+            "filename",
+            "positions",
+            "fingers",
+            "barre",
+            "title",
+        }
+        if unknown:
+            raise ValueError(f"Can't store {', '.join(sorted(unknown))} in a library")
+        instrument = item.get("instrument", "guitar")
+        try:
+            chord_cls = INSTRUMENTS[instrument][0]
+        except KeyError:
+            raise ValueError(
+                f"Unknown instrument {instrument!r}, "
+                f"expected one of {', '.join(INSTRUMENTS)}"
+            ) from None
+        return (
+            chord_cls,
+            parse_positions(item.get("positions")),
+            item.get("fingers") or "",
+            item.get("barre"),
+            item.get("title"),
+        )
+    # a fretboard2.voicings.Voicing
+    return (
+        item.chord_cls,
+        item.positions,
+        item.fingers_string,
+        None,
+        item.name,
+    )
+
+
+def encode_frets(frets, what="Fret"):
+    """Frets (None for muted strings) as bytes"""
+    try:
+        return bytes(map(_CODES.__getitem__, frets))
+    except (KeyError, TypeError):
+        bad = next(fret for fret in frets if fret not in _CODES)
+        raise ValueError(f"{what} {bad!r} is out of range (0-{NONE - 1})") from None
+
+
+def encode_fingers(fingers):
+    """Fingers (a string, or a list of one-character strings) as bytes"""
+    if not isinstance(fingers, str):
+        fingers = "".join(str(finger) for finger in fingers)
+    try:
+        encoded = fingers.encode("ascii")
+    except UnicodeEncodeError:
+        encoded = b""
+    if len(encoded) != len(fingers):
+        raise ValueError(f"Fingers must be single characters, not {fingers!r}")
+    return encoded
+
+
+class LibraryWriter(object):
+    """
+    Write a chord library, a chord at a time::
+
+        with LibraryWriter("voicings.fbl") as writer:
+            for voicing in voicings:
+                writer.add(voicing)
+
+    Only the distinct titles are kept in memory, so libraries of any number
+    of chords can be written.
+    """
+
+    def __init__(self, filename):
+        self.count = 0
+        # title -> index in the titles table
+        self._titles = {}
+        self._file = open(filename, "wb")
+        # placeholder, until we know the count
+        self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, 0, 0))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add(self, item):
+        """Add a Chord, chord spec or voicing"""
+        chord_cls, positions, fingers, barre, title = chord_fields(item)
+        if len(positions) > MAX_STRINGS:
+            raise ValueError(f"At most {MAX_STRINGS} strings can be stored")
+        fingers = encode_fingers(fingers)
+        if len(fingers) > MAX_STRINGS:
+            raise ValueError(f"At most {MAX_STRINGS} fingers can be stored")
+
+        if title is None:
+            title_index = NO_TITLE
+        else:
+            title_index = self._titles.setdefault(str(title), len(self._titles))
+
+        self._file.write(
+            RECORD.pack(
+                instrument_code(chord_cls),
+                len(positions),
+                encode_frets(positions),
+                fingers,
+                encode_frets((barre,), "Barre")[0],
+                title_index,
+            )
+        )
+        self.count += 1
+
+    def close(self):
+        if self._file is None:
+            return
+        output, self._file = self._file, None
+        with output:
+            titles_offset = output.tell()
+            encoded = [title.encode("utf-8") for title in self._titles]
+            output.write(COUNT.pack(len(encoded)))
+            offset = 0
+            for title in encoded:
+                output.write(COUNT.pack(offset))
+                offset += len(title)
+            output.write(COUNT.pack(offset))
+            for title in encoded:
+                output.write(title)
+
+            output.seek(0)
+            output.write(
+                HEADER.pack(MAGIC, VERSION, RECORD.size, self.count, titles_offset)
+            )
+
+
+def write_library(filename, chords):
+    """
+    Write Chord objects, chord specs or voicings to a library file, returning
+    the number written
+    """
+    with LibraryWriter(filename) as writer:
+        for chord in chords:
+            writer.add(chord)
+    return writer.count
+
+
+class _LibraryFile(object):
+    """An open library file, shared by a ChordLibrary and its views"""
+
+    def __init__(self, filename):
+        with open(filename, "rb") as fd:
+            self.data = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, version, record_size, count, titles = HEADER.unpack_from(self.data)
+        except struct.error:
+            magic = None
+        if magic != MAGIC:
+            self.data.close()
+            raise ValueError(f"{filename} isn't a chord library")
+        if version != VERSION or record_size != RECORD.size:
+            self.data.close()
+            raise ValueError(f"{filename} is a library version we can't read")
+        if titles < HEADER.size + count * record_size or titles > len(self.data):
+            self.data.close()
+            raise ValueError(f"{filename} is truncated")
+
+        self.count = count
+        self.title_count = COUNT.unpack_from(self.data, titles)[0]
+        self.title_offsets = titles + COUNT.size
+        self.title_text = self.title_offsets + (self.title_count + 1) * COUNT.size
+        # titles repeat (there are only so many chord names), so keep some
+        self.titles = {NO_TITLE: None}
+
+    def title(self, index):
+        try:
+            return self.titles[index]
+        except KeyError:
+            pass
+        start, end = OFFSETS.unpack_from(
+            self.data, self.title_offsets + index * COUNT.size
+        )
+        text = self.title_text
+        title = self.data[text + start : text + end].decode("utf-8")
+        if len(self.titles) >= _TITLE_CACHE_SIZE:
+            self.titles.clear()
+            self.titles[NO_TITLE] = None
+        self.titles[index] = title
+        return title
+
+
+class ChordLibrary(Sequence):
+    """
+    A chord library file (see write_library), as a read-only sequence of
+    Chord objects, created as they're asked for.
+
+    style: the style for every chord (as passed to Chord)
+
+    Slicing returns a view of part of the library. ``records()`` gives the
+    plain values, for filtering without creating Chord objects.
+    """
+
+    def __init__(self, filename, style=None):
+        self.filename = filename
+        self.style = style
+        self._file = _LibraryFile(filename)
+        self._range = range(self._file.count)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Close the file (for this library and all its views)"""
+        self._file.data.close()
+
+    def __len__(self):
+        return len(self._range)
+
+    def __repr__(self):
+        return f"<ChordLibrary {self.filename!r}, {len(self)} chords>"
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            view = object.__new__(type(self))
+            view.__dict__.update(self.__dict__)
+            view._range = self._range[index]
+            return view
+        return self.chord(self.record(index))
+
+    def __iter__(self):
+        for record in self.records():
+            yield self.chord(record)
+
+    def record(self, index):
+        """
+        The record at index, as (chord class, positions, fingers, barre,
+        title)
+        """
+        try:
+            position = self._range[index]
+        except IndexError:
+            raise IndexError("ChordLibrary index out of range") from None
+        return self._decode(
+            RECORD.unpack_from(self._file.data, HEADER.size + position * RECORD.size)
+        )
+
+    def records(self):
+        """Yield every record, as record() would"""
+        data = self._file.data
+        decode = self._decode
+        positions = self._range
+        if positions.step != 1:
+            for index in range(len(positions)):
+                yield self.record(index)
+            return
+
+        for start in range(positions.start, positions.stop, _CHUNK):
+            stop = min(start + _CHUNK, positions.stop)
+            chunk = data[
+                HEADER.size + start * RECORD.size : HEADER.size + stop * RECORD.size
+            ]
+            for values in RECORD.iter_unpack(chunk):
+                yield decode(values)
+
+    def _decode(self, values):
+        code, strings, frets, fingers, barre, title = values
+        return (
+            INSTRUMENT_CODES[code][1],
+            list(map(_FRETS.__getitem__, frets[:strings])),
+            fingers.rstrip(b"\0").decode("ascii"),
+            _FRETS[barre],
+            self._file.title(title),
+        )
+
+    def chord(self, record):
+        """A Chord for a record"""
+        chord_cls, positions, fingers, barre, title = record
+        return chord_cls(positions, fingers, barre, title, self.style)
@@ -0,0 +1,182 @@
+"""
+A load generator for the render service (see fretboard2.server).
+
+Sends requests from a number of concurrent, persistent connections, and
+reports throughput and latency percentiles::
+
+    fretboard2 loadtest --port 8080 --requests 20000 --connections 32
+
+or, with a server started in the same process, on a free port::
+
+    fretboard2 loadtest --local --workers 4
+
+Requests are spread over ``distinct`` different chord URLs, some much
+more popular than others, so both cache hits and renders are exercised.
+With ``conditional``, each connection remembers the ETags it has been sent,
+and revalidates with ``If-None-Match``, as a browser would.
+"""
+
+import asyncio
+import random
+import time
+from collections import Counter, namedtuple
+from urllib.parse import quote
+
+# common shapes, moved up the neck to make more distinct chords
+SHAPES = (
+    ("guitar", "x-{0}-{2}-{2}-{2}-{0}", "-13331"),
+    ("guitar", "{0}-{2}-{2}-{1}-{0}-{0}", "134211"),
+    ("guitar", "x-{0}-{2}-{2}-{1}-{0}", "-13421"),
+    ("ukulele", "{2}-{1}-{0}-{0}", "3211"),
+    ("bass", "x-{0}-{2}-{2}", "-134"),
+)
+
+LoadResult = namedtuple("LoadResult", "requests elapsed latencies statuses bytes")
+LoadResult.__doc__ = """
+The outcome of a load test.
+
+requests:  number of responses received
+elapsed:   seconds from the first request to the last response
+latencies: seconds each request took, sorted
+statuses:  a Counter of response status codes
+bytes:     response body bytes received
+"""
+
+
+def chord_paths(distinct=500):
+    """distinct chord URLs (paths), built from a few common shapes"""
+    paths = []
+    for index in range(distinct):
+        instrument, positions, fingers = SHAPES[index % len(SHAPES)]
+        fret = 1 + (index // len(SHAPES)) % 12
+        title = f"{index}"
+        positions = positions.format(fret, fret + 1, fret + 2)
+        paths.append(
+            f"/{instrument}/{quote(positions)}.svg"
+            f"?fingers={quote(fingers)}&title={quote(title)}"
+        )
+    return paths
+
+
+def percentile(values, percent):
+    """The nearest-rank percentile of sorted values"""
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, round(percent / 100 * len(values)) - 1))
+    return values[rank]
+
+
+async def _read_response(reader):
+    """Read a response, returning (status, headers, body)"""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Server closed the connection")
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, headers, body
+
+
+async def _connection(host, port, next_path, result, conditional, gzip):
+    """Send requests on one connection until there are none left"""
+    etags = {}
+    reader = writer = None
+    try:
+        while True:
+            path = next_path()
+            if path is None:
+                return
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+
+            headers = [f"GET {path} HTTP/1.1", f"Host: {host}:{port}"]
+            if gzip:
+                headers.append("Accept-Encoding: gzip")
+            if conditional and path in etags:
+                headers.append(f"If-None-Match: {etags[path]}")
+            start = time.perf_counter()
+            writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1"))
+            status, response_headers, body = await _read_response(reader)
+            result.latencies.append(time.perf_counter() - start)
+            result.statuses[status] += 1
+            result.bytes[0] += len(body)
+
+            if "etag" in response_headers:
+                etags[path] = response_headers["etag"]
+            if response_headers.get("connection", "").lower() == "close":
+                writer.close()
+                reader = writer = None
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+async def run(
+    host="127.0.0.1",
+    port=8080,
+    requests=10000,
+    connections=32,
+    paths=None,
+    distinct=500,
+    conditional=False,
+    gzip=False,
+    seed=0,
+):
+    """
+    Send requests to a server, returning a LoadResult.
+
+    paths:       URL paths to request; by default, distinct chord URLs (see
+                 chord_paths). A few are requested much more often than the
+                 rest, as real traffic would.
+    connections: concurrent connections, each sending a request at a time
+    """
+    if paths is None:
+        paths = chord_paths(distinct)
+    chooser = random.Random(seed)
+    # Zipf-like popularity: the n-th path is picked in proportion to 1/n
+    weights = [1 / rank for rank in range(1, len(paths) + 1)]
+    order = iter(chooser.choices(paths, weights, k=requests))
+
+    def next_path():
+        return next(order, None)
+
+    result = LoadResult(0, 0.0, [], Counter(), [0])
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _connection(host, port, next_path, result, conditional, gzip)
+            for _ in range(connections)
+        )
+    )
+    elapsed = time.perf_counter() - start
+    return result._replace(
+        requests=len(result.latencies),
+        elapsed=elapsed,
+        latencies=sorted(result.latencies),
+        bytes=result.bytes[0],
+    )
+
+
+def report(result):
+    """A LoadResult, as lines of text"""
+    rate = result.requests / result.elapsed if result.elapsed else 0.0
+    latencies = ", ".join(
+        f"p{percent} {percentile(result.latencies, percent) * 1000:.2f}ms"
+        for percent in (50, 90, 99)
+    )
+    maximum = result.latencies[-1] * 1000 if result.latencies else 0.0
+    statuses = ", ".join(
+        f"{status}: {count:,}" for status, count in sorted(result.statuses.items())
+    )
+    return [
+        f"{result.requests:,} requests in {result.elapsed:.2f}s: {rate:,.0f}/s",
+        f"latency: {latencies}, max {maximum:.2f}ms",
+        f"statuses: {statuses}",
+        f"received: {result.bytes:,} bytes",
+    ]
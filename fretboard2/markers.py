@@ -0,0 +1,128 @@
+"""
+Compact storage for a fretboard's strings, markers and barres.
+
+Rather than an object per marker, ``Markers`` keeps one list per field
+(strings, frets, colors, labels, font_colors), so adding hundreds of
+markers at once is a few list extends, and drawing walks the lists
+directly. Reading a single marker gives a ``Marker`` tuple.
+
+A fretboard keeps its barres in a separate ``Markers``, whose strings are
+(first, last) pairs.
+
+Each string's colour and label is a small ``String`` record, changed by
+attribute, e.g. ``fretboard.strings[0].color = "red"``.
+"""
+
+from collections import namedtuple
+
+Marker = namedtuple("Marker", "string fret color label font_color")
+
+
+class Markers(object):
+    __slots__ = ("strings", "frets", "colors", "labels", "font_colors")
+
+    def __init__(self):
+        self.strings = []
+        self.frets = []
+        self.colors = []
+        self.labels = []
+        self.font_colors = []
+
+    def __len__(self):
+        return len(self.frets)
+
+    def __iter__(self):
+        return map(
+            Marker._make,
+            zip(self.strings, self.frets, self.colors, self.labels, self.font_colors),
+        )
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        return Marker(
+            self.strings[index],
+            self.frets[index],
+            self.colors[index],
+            self.labels[index],
+            self.font_colors[index],
+        )
+
+    def __repr__(self):
+        return f"Markers({list(self)!r})"
+
+    def append(self, string, fret, color=None, label=None, font_color=None):
+        self.strings.append(string)
+        self.frets.append(fret)
+        self.colors.append(color)
+        self.labels.append(label)
+        self.font_colors.append(font_color)
+
+    def extend(self, strings, frets, colors=None, labels=None, font_colors=None):
+        """
+        Add many markers. strings and frets have an entry per marker; colors,
+        labels and font_colors may too, or be a single value for them all.
+        """
+        strings = list(strings)
+        frets = list(frets)
+        count = len(strings)
+        if len(frets) != count:
+            raise ValueError(f"Got {count} strings, but {len(frets)} frets")
+
+        columns = []
+        for name, values in (
+            ("colors", colors),
+            ("labels", labels),
+            ("font_colors", font_colors),
+        ):
+            if values is None or isinstance(values, (str, int)):
+                values = [values] * count
+            else:
+                values = list(values)
+                if len(values) != count:
+                    raise ValueError(f"Got {count} markers, but {len(values)} {name}")
+            columns.append(values)
+
+        self.strings.extend(strings)
+        self.frets.extend(frets)
+        self.colors.extend(columns[0])
+        self.labels.extend(columns[1])
+        self.font_colors.extend(columns[2])
+
+    def clear(self):
+        for column in (
+            self.strings,
+            self.frets,
+            self.colors,
+            self.labels,
+            self.font_colors,
+        ):
+            column.clear()
+
+
+class String(object):
+    """Drawing settings for a string: colour, and label (e.g. X or O)"""
+
+    __slots__ = ("color", "label", "font_color")
+
+    def __init__(self, color=None, label=None, font_color=None):
+        self.color = color
+        self.label = label
+        self.font_color = font_color
+
+    def __repr__(self):
+        return (
+            f"String(color={self.color!r}, label={self.label!r}, "
+            f"font_color={self.font_color!r})"
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, String):
+            return NotImplemented
+        return (self.color, self.label, self.font_color) == (
+            other.color,
+            other.label,
+            other.font_color,
+        )
+
+    __hash__ = None
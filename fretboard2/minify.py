@@ -0,0 +1,259 @@
+"""
+A backend for small SVG output.
+
+``MinifiedDrawing`` works like the "string" backend (fretboard2.svg), but
+trades exact svgwrite compatibility for size:
+
+- numbers are rounded to ``precision`` decimal places, and written without
+  trailing zeros (``40`` rather than ``40.0``, ``.5`` rather than ``0.5``)
+- attributes set to their SVG initial values (``font-weight="normal"``,
+  ``x="0"``...) are left out
+- runs of sibling elements sharing inherited presentation attributes
+  (``stroke``, ``font-family``, ``text-anchor``...) are wrapped in a
+  ``<g>`` that sets them once
+- the XML declaration, and svgwrite's ``baseProfile``, ``version`` and
+  unused namespaces are left out
+
+Use it with ``backend="minified"``, or ``backend=minified(precision=1)``
+(see fretboard2.backends) for a different precision.
+"""
+
+from .svg import (
+    _TEXT_ESCAPES,
+    SVGContainer,
+    SVGDrawing,
+    attribute_name,
+    format_value,
+)
+
+# attributes which children inherit from a <g>
+INHERITED = frozenset(
+    (
+        "fill",
+        "fill-opacity",
+        "font-family",
+        "font-size",
+        "font-style",
+        "font-weight",
+        "stroke",
+        "stroke-linecap",
+        "stroke-opacity",
+        "stroke-width",
+        "text-anchor",
+    )
+)
+
+# initial values of attributes, which needn't be written. Only elements
+# with no inherited attributes set (other than by grouping, below) are
+# ever drawn, so these are always the values that would apply.
+INITIAL_VALUES = {
+    "alignment-baseline": "auto",
+    "dominant-baseline": "auto",
+    "fill-opacity": "1",
+    "font-style": "normal",
+    "font-weight": "normal",
+    "opacity": "1",
+    "stroke-linecap": "butt",
+    "stroke-opacity": "1",
+    "stroke-width": "1",
+    "text-anchor": "start",
+    "cx": "0",
+    "cy": "0",
+    "x": "0",
+    "x1": "0",
+    "x2": "0",
+    "y": "0",
+    "y1": "0",
+    "y2": "0",
+}
+
+# the markup a group adds: <g></g>
+GROUP_OVERHEAD = 7
+
+
+def format_number(value, precision):
+    """A number, rounded, with no trailing zeros or leading zero"""
+    if isinstance(value, int):
+        return str(value)
+    text = f"{value:.{precision}f}"
+    if "." in text:
+        text = text.rstrip("0").rstrip(".")
+    if text.startswith("0."):
+        text = text[1:]
+    elif text.startswith("-0."):
+        text = "-" + text[2:]
+    return "0" if text in ("-0", "") else text
+
+
+class Element(object):
+    """An element, with its attributes formatted but not yet written"""
+
+    __slots__ = ("tag", "attributes", "text")
+
+    def __init__(self, tag, attributes, text=None):
+        self.tag = tag
+        # xml name -> formatted value
+        self.attributes = attributes
+        self.text = text
+
+    def inherited(self):
+        return {
+            name: value for name, value in self.attributes.items() if name in INHERITED
+        }
+
+    def format(self, exclude=()):
+        attributes = "".join(
+            f' {name}="{value}"'
+            for name, value in self.attributes.items()
+            if name not in exclude
+        )
+        if self.text is None:
+            return f"<{self.tag}{attributes}/>"
+        return f"<{self.tag}{attributes}>{self.text}</{self.tag}>"
+
+    __str__ = format
+
+
+def _length(attributes):
+    return sum(len(name) + len(value) + 4 for name, value in attributes.items())
+
+
+def serialise(elements):
+    """
+    Yield the markup for a list of elements (and containers), grouping
+    runs of elements which share inherited attributes where that saves space
+    """
+    index = 0
+    count = len(elements)
+    while index < count:
+        element = elements[index]
+        shared = element.inherited() if isinstance(element, Element) else None
+        if not shared:
+            yield str(element)
+            index += 1
+            continue
+
+        # grow the run as long as it has something in common, and keep the
+        # longest one that saves the most
+        best_end, best_shared, best_saving = index + 1, None, 0
+        end = index + 1
+        while end < count:
+            following = elements[end]
+            if not isinstance(following, Element):
+                break
+            shared = {
+                name: value
+                for name, value in shared.items()
+                if following.attributes.get(name) == value
+            }
+            if not shared:
+                break
+            end += 1
+            saving = (end - index - 1) * _length(shared) - GROUP_OVERHEAD
+            if saving > best_saving:
+                best_end, best_shared, best_saving = end, shared, saving
+
+        if best_shared is None:
+            yield str(element)
+            index += 1
+            continue
+
+        group = "".join(f' {name}="{value}"' for name, value in best_shared.items())
+        yield "".join(
+            (
+                f"<g{group}>",
+                *(member.format(best_shared) for member in elements[index:best_end]),
+                "</g>",
+            )
+        )
+        index = best_end
+
+
+class MinifiedContainer(SVGContainer):
+    def __init__(self, tag, attributes, precision):
+        super().__init__(tag, attributes)
+        self.precision = precision
+
+    def __str__(self):
+        attributes = "".join(
+            f' {name}="{value}"'
+            for name, value in _format_attributes(
+                self.attributes, self.precision
+            ).items()
+        )
+        if not self.elements:
+            return f"<{self.tag}{attributes}/>"
+        children = "".join(serialise(self.elements))
+        return f"<{self.tag}{attributes}>{children}</{self.tag}>"
+
+
+def _format_attributes(attributes, precision):
+    formatted = {}
+    for key in sorted(attributes, key=attribute_name):
+        value = attributes[key]
+        if value is None:
+            continue
+        name = attribute_name(key) if key != "xlink:href" else key
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = format_number(value, precision)
+        else:
+            value = format_value(value)
+        if INITIAL_VALUES.get(name) == value:
+            continue
+        formatted[name] = value
+    return formatted
+
+
+class MinifiedDrawing(SVGDrawing):
+    """
+    An SVG document, written as compactly as possible.
+
+    precision: decimal places to round numbers (coordinates, sizes) to
+    """
+
+    def __init__(self, size=("100%", "100%"), precision=2):
+        super().__init__(size)
+        self.precision = precision
+        self.defs = MinifiedContainer("defs", {}, precision)
+        self.uses_xlink = False
+
+    def element(self, tag, attributes, text=None):
+        if text is not None:
+            text = str(text).translate(_TEXT_ESCAPES)
+        return Element(tag, _format_attributes(attributes, self.precision), text)
+
+    def g(self, **extra):
+        return MinifiedContainer("g", extra, self.precision)
+
+    def symbol(self, **extra):
+        return MinifiedContainer("symbol", extra, self.precision)
+
+    def use(self, href, insert=None, size=None, **extra):
+        self.uses_xlink = True
+        return super().use(href, insert=insert, size=size, **extra)
+
+    def header(self):
+        namespaces = 'xmlns="http://www.w3.org/2000/svg"'
+        if self.uses_xlink:
+            namespaces += ' xmlns:xlink="http://www.w3.org/1999/xlink"'
+        width, height = (
+            (
+                format_number(value, self.precision)
+                if isinstance(value, (int, float))
+                else format_value(value)
+            )
+            for value in (self.width, self.height)
+        )
+        defs = str(self.defs) if self.defs.elements else ""
+        return f'<svg {namespaces} width="{width}" height="{height}">{defs}'
+
+    def fragments(self):
+        yield self.header()
+        yield from serialise(self.elements)
+        yield self.footer()
+
+    def tostring(self):
+        return "".join(self.fragments())
+
+    def write(self, fd):
+        fd.write(self.tostring())
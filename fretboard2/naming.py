@@ -0,0 +1,161 @@
+"""
+Naming chords from their positions.
+
+Every chord quality in ``fretboard2.theory.CHORD_QUALITIES``, on every root,
+is a set of pitch classes, which fits in a 12-bit mask. ``CHORD_TABLE``
+holds, for each of the 4096 possible masks, the chords with exactly those
+notes, so naming a set of notes is a single lookup::
+
+    >>> identify("x32010", GuitarChord)[0]
+    Match(name='C', root=0, quality='', bass=0, inversion=0)
+    >>> identify("032010", GuitarChord)[0].name
+    'C/E'
+
+Chords of four or more notes are also listed without their fifth, which is
+often left out, after the chords with every note.
+"""
+
+from collections import namedtuple
+
+from .chord import parse_positions
+from .theory import CHORD_QUALITIES, chord_mask, chord_name, note_number, parse_chord
+from .voicings import FIFTH, fretboard_class
+
+# name:      e.g. "Am7", or "C/E" when the bass note isn't the root
+# bass:      pitch class of the lowest note
+# inversion: 0 for root position, 1 when the bass is the chord's second note
+#            (in interval order), and so on
+Match = namedtuple("Match", "name root quality bass inversion")
+
+
+def _build_table():
+    table = [[] for _ in range(4096)]
+    for order, (quality, intervals) in enumerate(CHORD_QUALITIES.items()):
+        for root in range(12):
+            # (omitted fifth, number of notes, quality order): simplest first
+            rank = (False, len(intervals), order)
+            table[chord_mask(root, intervals)].append((rank, root, quality))
+            if len(intervals) >= 4 and FIFTH in intervals:
+                without_fifth = tuple(i for i in intervals if i != FIFTH)
+                rank = (True, len(intervals), order)
+                table[chord_mask(root, without_fifth)].append((rank, root, quality))
+    return tuple(
+        tuple((root, quality) for _, root, quality in sorted(entries))
+        for entries in table
+    )
+
+
+# pitch class mask -> ((root, quality), ...), most likely first
+CHORD_TABLE = _build_table()
+
+_tunings = {}
+
+# distinct positions identify_many remembers; songbooks repeat a few dozen
+# chords, but a stream of generated voicings mustn't grow this forever
+_SEEN_CACHE_SIZE = 4096
+
+
+def open_notes(chord_cls):
+    """MIDI numbers of a Chord class's open strings"""
+    try:
+        return _tunings[chord_cls]
+    except KeyError:
+        notes = _tunings[chord_cls] = tuple(
+            note_number(note) for note in fretboard_class(chord_cls).tuning
+        )
+        return notes
+
+
+def sounding_notes(positions, chord_cls):
+    """(pitch class mask, bass pitch class) of positions, bass None if silent"""
+    if not isinstance(positions, list):
+        positions = parse_positions(positions)
+    mask = 0
+    bass = None
+    for open_note, fret in zip(open_notes(chord_cls), positions):
+        if fret is None:
+            continue
+        note = open_note + fret
+        mask |= 1 << (note % 12)
+        if bass is None or note < bass:
+            bass = note
+    return mask, None if bass is None else bass % 12
+
+
+def _matches(mask, bass, flats=False):
+    candidates = CHORD_TABLE[mask]
+    matches = []
+    for root, quality in candidates:
+        name = chord_name(root, quality, flats)
+        if bass == root:
+            inversion = 0
+        else:
+            name = f"{name}/{chord_name(bass, '', flats)}"
+            intervals = CHORD_QUALITIES[quality]
+            inversion = sorted(intervals).index((bass - root) % 12)
+        matches.append(Match(name, root, quality, bass, inversion))
+    # root position chords first, otherwise keep the table's order
+    matches.sort(key=lambda match: match.inversion > 0)
+    return matches
+
+
+def identify(positions, chord_cls, flats=False):
+    """
+    Name the chord played by positions (as accepted by Chord).
+
+    Returns a list of Match tuples, most likely first, or an empty list if
+    the notes aren't a known chord.
+    """
+    mask, bass = sounding_notes(positions, chord_cls)
+    if bass is None:
+        return []
+    return _matches(mask, bass, flats)
+
+
+def identify_many(positions, chord_cls, flats=False):
+    """
+    The most likely Match for each of many positions, or None for those that
+    aren't a known chord.
+
+    Positions are often repeated (the same chords, over and over), so each
+    distinct one is only looked up once (while there aren't too many to
+    remember).
+    """
+    seen = {}
+    results = []
+    for item in positions:
+        key = item if isinstance(item, str) else tuple(item)
+        try:
+            match = seen[key]
+        except KeyError:
+            mask, bass = sounding_notes(item, chord_cls)
+            matches = _matches(mask, bass, flats) if bass is not None else ()
+            match = matches[0] if matches else None
+            if len(seen) >= _SEEN_CACHE_SIZE:
+                seen.clear()
+            seen[key] = match
+        results.append(match)
+    return results
+
+
+def title_matches(chord):
+    """
+    Does a chord's title name the chord its positions play? Useful for
+    checking user-submitted chords.
+
+    Titles are compared by root and quality, so "C#m" matches "Dbmin", and
+    a slash chord's title ("C/E") must also have the right bass note.
+    """
+    if not chord.title:
+        return False
+    title, _, bass_name = chord.title.partition("/")
+    try:
+        root, quality = parse_chord(title)
+        bass_pc = parse_chord(bass_name)[0] if bass_name else root
+    except ValueError:
+        return False
+
+    mask, bass = sounding_notes(chord.positions, type(chord))
+    if bass is None or bass != bass_pc:
+        return False
+    return (root, quality) in CHORD_TABLE[mask]
@@ -0,0 +1,336 @@
+"""
+Opt-in instrumentation of rendering, to find slow styles and diagram shapes.
+
+A ``Profiler`` records, for each phase of each diagram rendered, the wall
+time taken, the number of SVG elements added and their size in bytes, and
+aggregates them per phase and per diagram shape::
+
+    from fretboard2 import Profiler
+    from fretboard2.fretboard import Fretboard
+
+    profiler = Fretboard.profiler = Profiler()
+    ... render diagrams ...
+    print(profiler.report())
+
+Setting ``Fretboard.profiler`` covers every chord and fretboard rendered
+(or set it on a subclass, or an instance). Left as None, the default, the
+only cost is a check per phase.
+
+The phases are:
+
+    chord       Chord.draw(): building the fretboard and its markers
+    layout      creating the drawing and calculate_layout()
+    static      the background, frets and inlays, drawn or reused
+    fret_label  draw_fret_label()
+    strings     each string, and its label
+    nut         the nut
+    markers     draw_markers()
+    title       draw_title()
+    write       serialising the document (bytes being the output's size)
+
+``render_many(..., profiler=profiler)`` (see fretboard2.batch) gathers
+the statistics from its worker processes into ``profiler``. A ``hook``,
+called with each diagram's ``Recording``, only sees diagrams rendered in
+its own process.
+
+Element sizes are measured by serialising each element again, so profiling
+does slow rendering down, noticeably so with the svgwrite backend.
+"""
+
+import threading
+import time
+
+PHASES = (
+    "chord",
+    "layout",
+    "static",
+    "fret_label",
+    "strings",
+    "nut",
+    "markers",
+    "title",
+    "write",
+)
+
+
+def element_size(element):
+    """The size of an element's markup, in bytes"""
+    if not isinstance(element, str):
+        # svgwrite elements, or records (fretboard2.minify)
+        tostring = getattr(element, "tostring", None)
+        element = tostring() if tostring is not None else str(element)
+    return len(element.encode("utf-8"))
+
+
+class PhaseStats(object):
+    """Totals for a phase (or a whole diagram), over a number of diagrams"""
+
+    __slots__ = ("count", "seconds", "max_seconds", "elements", "bytes")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.elements = 0
+        self.bytes = 0
+
+    def add(self, seconds, elements=0, size=0):
+        self.count += 1
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.elements += elements
+        self.bytes += size
+
+    def merge(self, other):
+        self.count += other.count
+        self.seconds += other.seconds
+        self.max_seconds = max(self.max_seconds, other.max_seconds)
+        self.elements += other.elements
+        self.bytes += other.bytes
+
+    @property
+    def mean_seconds(self):
+        return self.seconds / self.count if self.count else 0.0
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        values = ", ".join(f"{k}={v!r}" for k, v in self.as_dict().items())
+        return f"PhaseStats({values})"
+
+    def __getstate__(self):
+        return self.as_dict()
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+
+class Recording(object):
+    """
+    The phases of one diagram's render, as they're recorded.
+
+    phases: phase name -> (seconds, elements, bytes)
+    """
+
+    __slots__ = ("profiler", "diagram", "phases", "_last", "_count")
+
+    def __init__(self, profiler, diagram):
+        self.profiler = profiler
+        self.diagram = diagram
+        self.phases = {}
+        self._count = 0
+        self._last = time.perf_counter()
+
+    def mark(self, phase, drawing=None, size=None):
+        """
+        End a phase: the time since the last one ended, and the elements
+        added to drawing since (or size bytes written)
+        """
+        elapsed = time.perf_counter() - self._last
+        elements = 0
+        if drawing is not None:
+            added = drawing.elements[self._count :]
+            self._count = len(drawing.elements)
+            elements = len(added)
+            if size is None:
+                size = sum(map(element_size, added))
+        self.phases[phase] = (elapsed, elements, size or 0)
+        # measuring the elements isn't part of the next phase
+        self._last = time.perf_counter()
+
+    @property
+    def seconds(self):
+        return sum(seconds for seconds, _, _ in self.phases.values())
+
+    def finish(self):
+        self.profiler.finish(self)
+
+
+def tell(output):
+    """A file object's position, if it has one (pipes and sockets don't)"""
+    try:
+        return output.tell()
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def describe_style(style):
+    """A short description of a style, to tell styles apart in reports"""
+    drawing = style.drawing
+    return (
+        f"{drawing.orientation} {drawing.width}x{drawing.height} "
+        f"[{hash(style) & 0xFFFF:04x}]"
+    )
+
+
+class ShapeStats(object):
+    """Whole-diagram totals for diagrams of one shape"""
+
+    __slots__ = ("kind", "frets", "open_position", "style", "stats")
+
+    def __init__(self, kind, frets, open_position, style):
+        self.kind = kind
+        self.frets = frets
+        self.open_position = open_position
+        self.style = style
+        self.stats = PhaseStats()
+
+    def describe(self):
+        position = "open" if self.open_position else "closed"
+        return (
+            f"{self.kind}, {self.frets} frets, {position}, "
+            f"{describe_style(self.style)}"
+        )
+
+    def __getstate__(self):
+        return (self.kind, self.frets, self.open_position, self.style, self.stats)
+
+    def __setstate__(self, state):
+        self.kind, self.frets, self.open_position, self.style, self.stats = state
+
+
+class Profiler(object):
+    """
+    Per-phase statistics for the diagrams rendered while it's installed.
+
+    hook:       called with each diagram's Recording, when it's finished
+    max_shapes: distinct diagram shapes to keep statistics for; diagrams of
+                further shapes only count towards the phase totals
+    """
+
+    def __init__(self, hook=None, max_shapes=1024):
+        self.hook = hook
+        self.max_shapes = max_shapes
+        self.diagrams = 0
+        # phase -> PhaseStats
+        self.phases = {}
+        # (kind, frets shown, open, id(style)) -> ShapeStats, keeping the
+        # style (so its id can't be reused) without hashing it per diagram
+        self.shapes = {}
+        self._lock = threading.Lock()
+
+    def begin(self, diagram):
+        return Recording(self, diagram)
+
+    def finish(self, recording):
+        diagram = recording.diagram
+        fretboard = getattr(diagram, "fretboard", None) or diagram
+        key = (
+            type(diagram).__name__,
+            len(fretboard.frets),
+            fretboard.frets[0] == 0,
+            id(fretboard.style),
+        )
+        with self._lock:
+            self.diagrams += 1
+            for phase, (seconds, elements, size) in recording.phases.items():
+                try:
+                    stats = self.phases[phase]
+                except KeyError:
+                    stats = self.phases[phase] = PhaseStats()
+                stats.add(seconds, elements, size)
+
+            shape = self.shapes.get(key)
+            if shape is None and len(self.shapes) < self.max_shapes:
+                shape = self.shapes[key] = ShapeStats(*key[:3], fretboard.style)
+            if shape is not None and recording.phases:
+                seconds, elements, size = map(sum, zip(*recording.phases.values()))
+                shape.stats.add(seconds, elements, size)
+
+        if self.hook is not None:
+            self.hook(recording)
+
+    def merge(self, other):
+        """Add another profiler's statistics (e.g. from a worker process)"""
+        with self._lock:
+            self.diagrams += other.diagrams
+            for phase, stats in other.phases.items():
+                self.phases.setdefault(phase, PhaseStats()).merge(stats)
+
+            # styles from elsewhere are copies: match them up by value
+            styles = {shape.style: shape.style for shape in self.shapes.values()}
+            for shape in other.shapes.values():
+                style = styles.setdefault(shape.style, shape.style)
+                key = (shape.kind, shape.frets, shape.open_position, id(style))
+                mine = self.shapes.get(key)
+                if mine is None:
+                    if len(self.shapes) >= self.max_shapes:
+                        continue
+                    mine = self.shapes[key] = ShapeStats(*key[:3], style)
+                mine.stats.merge(shape.stats)
+
+    def reset(self):
+        with self._lock:
+            self.diagrams = 0
+            self.phases.clear()
+            self.shapes.clear()
+
+    def slowest_shapes(self, limit=10):
+        """The ShapeStats with the highest mean render time, slowest first"""
+        shapes = sorted(
+            self.shapes.values(),
+            key=lambda shape: shape.stats.mean_seconds,
+            reverse=True,
+        )
+        return shapes[:limit]
+
+    def as_dict(self):
+        return {
+            "diagrams": self.diagrams,
+            "phases": {
+                phase: stats.as_dict() for phase, stats in self._ordered_phases()
+            },
+            "shapes": [
+                dict(shape.stats.as_dict(), shape=shape.describe())
+                for shape in self.slowest_shapes(limit=None)
+            ],
+        }
+
+    def _ordered_phases(self):
+        order = {phase: index for index, phase in enumerate(PHASES)}
+        return sorted(
+            self.phases.items(), key=lambda item: order.get(item[0], len(order))
+        )
+
+    def report(self, limit=10):
+        """The statistics, as a table of phases and the slowest shapes"""
+        total = sum(stats.seconds for stats in self.phases.values()) or 1.0
+        diagrams = self.diagrams or 1
+        lines = [
+            f"{self.diagrams:,} diagrams",
+            f"{'phase':<12}{'total ms':>11}{'mean us':>10}{'max us':>10}"
+            f"{'share':>8}{'elements':>10}{'bytes':>10}",
+        ]
+        for phase, stats in self._ordered_phases():
+            lines.append(
+                f"{phase:<12}{stats.seconds * 1e3:>11.2f}"
+                f"{stats.mean_seconds * 1e6:>10.1f}{stats.max_seconds * 1e6:>10.1f}"
+                f"{stats.seconds / total:>8.1%}"
+                f"{stats.elements / diagrams:>10.1f}{stats.bytes / diagrams:>10.0f}"
+            )
+
+        shapes = self.slowest_shapes(limit)
+        if shapes:
+            lines.append("slowest shapes (mean us per diagram, diagrams):")
+            for shape in shapes:
+                lines.append(
+                    f"  {shape.stats.mean_seconds * 1e6:>9.1f} "
+                    f"{shape.stats.count:>8,}  {shape.describe()}"
+                )
+        return "\n".join(lines)
+
+    def __getstate__(self):
+        # for sending statistics back from worker processes; hooks stay put
+        return {
+            "max_shapes": self.max_shapes,
+            "diagrams": self.diagrams,
+            "phases": self.phases,
+            "shapes": self.shapes,
+        }
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.hook = None
+        self._lock = threading.Lock()
@@ -0,0 +1,388 @@
+"""
+A small asyncio HTTP service rendering chord diagrams.
+
+Chords are addressed by instrument and positions, with the fingering,
+title and barre in the query string::
+
+    GET /guitar/xx0232.svg?fingers=---132&title=D
+    GET /ukulele/0003.svg
+    GET /guitar/x-x-12-12-12-x.svg?fingers=--111-
+
+Start it with ``fretboard2 serve`` (see fretboard2.cli), or::
+
+    asyncio.run(RenderServer(port=8080).serve_forever())
+
+Rendering is done off the event loop, by a pool of worker processes, with
+at most ``concurrency`` renders in flight; identical requests arriving
+together share one render. Rendered documents are kept in an in-memory
+LRU cache (see fretboard2.cache), and served with a strong ``ETag``, so
+clients revalidating with ``If-None-Match`` get a ``304 Not Modified``.
+Clients sending ``Accept-Encoding: gzip`` get gzipped documents.
+
+``GET /_stats`` returns request and cache counters, as JSON.
+
+It speaks just enough HTTP/1.1 (persistent connections, GET and HEAD) to
+sit behind a proxy, or be benchmarked on localhost with the bundled load
+generator (see fretboard2.loadgen).
+"""
+
+import asyncio
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from .cache import LRUCache
+from .specs import INSTRUMENTS
+
+# query parameters, and the spec keys they set
+QUERY_KEYS = ("fingers", "title", "barre")
+
+# rendered chords are a few KB each
+CACHE_SIZE = 4096
+
+# don't let a client hold a connection open with endless headers
+MAX_HEADERS = 100
+# nothing takes a body; anything bigger than this is a mistake
+MAX_BODY = 64 * 1024
+
+REASONS = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Content Too Large",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+}
+
+
+def render_document(spec, backend="string", compress=False):
+    """
+    Render a spec to bytes, returning (etag, body). Run in worker processes.
+    """
+    import hashlib
+
+    from .specs import from_spec
+    from .stream import write_text
+
+    svg = from_spec(spec).render(backend=backend).getvalue()
+    if compress:
+        output = io.BytesIO()
+        write_text(svg, output, compress=True)
+        body = output.getvalue()
+    else:
+        body = svg.encode("utf-8")
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"', body
+
+
+def accepts_gzip(header):
+    """Does an Accept-Encoding header allow gzip?"""
+    for coding in header.split(","):
+        name, _, parameters = coding.partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            quality = parameters.strip().lower().replace(" ", "")
+            return quality not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def etag_matches(header, etag):
+    """Does an If-None-Match header match an ETag? (a weak comparison)"""
+    if header.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag for candidate in header.split(",")
+    )
+
+
+class RequestError(Exception):
+    """A request that can't be served, with the status to say so"""
+
+    def __init__(self, status, message, headers=()):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers
+
+
+class RenderServer(object):
+    """
+    host, port:  where to listen
+    workers:     rendering processes (default: one per CPU); 0 renders in a
+                 thread of this process
+    concurrency: renders in flight at once, across all connections
+                 (default: twice the number of workers)
+    cache_size:  rendered documents to keep
+    backend:     drawing backend (see fretboard2.backends)
+    """
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=8080,
+        workers=None,
+        concurrency=None,
+        cache_size=CACHE_SIZE,
+        backend="string",
+    ):
+        self.host = host
+        self.port = port
+        if workers is None:
+            workers = os.cpu_count() or 1
+        self.workers = workers
+        self.concurrency = concurrency or max(1, workers) * 2
+        self.backend = backend
+        self.cache = LRUCache(maxsize=cache_size)
+        self.stats = {
+            "requests": 0,
+            "renders": 0,
+            "not_modified": 0,
+            "errors": 0,
+        }
+        self.server = None
+        self._executor = None
+        self._limit = None
+        # cache key -> task, for renders in flight
+        self._rendering = {}
+
+    async def start(self):
+        """Start listening, returning the (host, port) bound to"""
+        if self.workers > 0:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        self._limit = asyncio.Semaphore(self.concurrency)
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        # port 0 picks a free port; say which
+        self.host, self.port = self.server.sockets[0].getsockname()[:2]
+        return self.host, self.port
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    async def handle(self, reader, writer):
+        """Serve the requests on one connection"""
+        try:
+            while True:
+                try:
+                    request = await self.read_request(reader)
+                except RequestError as exc:
+                    self.stats["errors"] += 1
+                    await self.send(writer, exc.status, (), str(exc).encode(), False)
+                    return
+                if request is None:
+                    return
+
+                method, target, version, headers = request
+                keep_alive = self.keep_alive(version, headers)
+                status, response_headers, body = await self.respond(
+                    method, target, headers
+                )
+                if method == "HEAD":
+                    response_headers = (
+                        *response_headers,
+                        ("Content-Length", str(len(body))),
+                    )
+                    body = b""
+                await self.send(writer, status, response_headers, body, keep_alive)
+                if not keep_alive:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # the server is shutting down. Nothing awaits connection handlers,
+            # so there's no one to tell (and asyncio would log it as an error)
+            pass
+        finally:
+            writer.close()
+
+    async def read_request(self, reader):
+        """
+        Read a request, returning (method, target, version, headers), or
+        None if the client has gone
+        """
+        try:
+            line = await reader.readline()
+        except ValueError:
+            raise RequestError(400, "Request line too long") from None
+        if not line:
+            return None
+        parts = line.decode("latin-1").split()
+        if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+            raise RequestError(400, "Malformed request line")
+        method, target, version = parts
+
+        headers = {}
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                raise RequestError(431, "Header too long") from None
+            if line in (b"\r\n", b"\n", b""):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise RequestError(431, "Too many headers")
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        # nothing here takes a body, but keep the connection in step
+        length = headers.get("content-length", "0")
+        if not length.isdigit():
+            raise RequestError(400, "Invalid Content-Length")
+        if int(length) > MAX_BODY:
+            raise RequestError(413, "Request body too large")
+        if int(length):
+            await reader.readexactly(int(length))
+        return method, target, version, headers
+
+    @staticmethod
+    def keep_alive(version, headers):
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    async def send(self, writer, status, headers, body, keep_alive):
+        lines = [f"HTTP/1.1 {status} {REASONS[status]}"]
+        names = set()
+        for name, value in headers:
+            lines.append(f"{name}: {value}")
+            names.add(name)
+        if status != 304 and "Content-Length" not in names:
+            lines.append(f"Content-Length: {len(body)}")
+        if not keep_alive:
+            lines.append("Connection: close")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def respond(self, method, target, headers):
+        """The (status, headers, body) for a request"""
+        self.stats["requests"] += 1
+        try:
+            if method not in ("GET", "HEAD"):
+                raise RequestError(405, "Only GET and HEAD", (("Allow", "GET, HEAD"),))
+            url = urlsplit(target)
+            if url.path == "/_stats":
+                return 200, (("Content-Type", "application/json"),), self.stats_json()
+            return await self.respond_chord(url, headers)
+        except RequestError as exc:
+            self.stats["errors"] += 1
+            return (
+                exc.status,
+                (("Content-Type", "text/plain; charset=utf-8"), *exc.headers),
+                f"{exc}\n".encode("utf-8"),
+            )
+
+    async def respond_chord(self, url, headers):
+        spec, compress = self.parse(url, headers)
+        key = (tuple(sorted(spec.items())), compress)
+        entry = self.cache.get(key)
+        if entry is None:
+            entry = await self.render(key, spec, compress)
+        etag, body = entry
+
+        response_headers = [
+            ("ETag", etag),
+            # the URL says everything about the diagram, so it never changes
+            ("Cache-Control", "public, max-age=31536000, immutable"),
+            ("Vary", "Accept-Encoding"),
+        ]
+        if etag_matches(headers.get("if-none-match", ""), etag):
+            self.stats["not_modified"] += 1
+            return 304, response_headers, b""
+
+        response_headers.append(("Content-Type", "image/svg+xml"))
+        if compress:
+            response_headers.append(("Content-Encoding", "gzip"))
+        return 200, response_headers, body
+
+    def parse(self, url, headers):
+        """The spec a chord URL asks for, and whether to gzip it"""
+        parts = url.path.strip("/").split("/")
+        if len(parts) != 2 or not parts[1].endswith(".svg"):
+            raise RequestError(404, "Expected /<instrument>/<positions>.svg")
+        instrument, filename = parts
+        if instrument not in INSTRUMENTS:
+            raise RequestError(
+                404, f"Unknown instrument, expected one of {', '.join(INSTRUMENTS)}"
+            )
+
+        spec = {"instrument": instrument, "positions": unquote(filename[:-4])}
+        for name, value in parse_qsl(url.query):
+            if name not in QUERY_KEYS:
+                raise RequestError(400, f"Unknown parameter {name!r}")
+            spec[name] = value
+        if "barre" in spec:
+            try:
+                spec["barre"] = int(spec["barre"])
+            except ValueError:
+                raise RequestError(400, "barre must be a fret number") from None
+        return spec, accepts_gzip(headers.get("accept-encoding", ""))
+
+    async def render(self, key, spec, compress):
+        """Render a spec in the pool, once however many requests want it"""
+        task = self._rendering.get(key)
+        if task is None:
+            task = asyncio.create_task(self._render(spec, compress))
+            task.add_done_callback(lambda task: self._rendered(key, task))
+            self._rendering[key] = task
+        # a request giving up (its client went away) mustn't cancel the
+        # render for everyone else
+        return await asyncio.shield(task)
+
+    async def _render(self, spec, compress):
+        async with self._limit:
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    self._executor, render_document, spec, self.backend, compress
+                )
+            except ValueError as exc:
+                raise RequestError(400, f"Invalid chord: {exc}") from None
+            except Exception as exc:
+                raise RequestError(500, f"{type(exc).__name__}: {exc}") from None
+
+    def _rendered(self, key, task):
+        del self._rendering[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        self.stats["renders"] += 1
+        self.cache.set(key, task.result())
+
+    def stats_json(self):
+        stats = dict(
+            self.stats, cache=self.cache.stats.as_dict(), cached=len(self.cache)
+        )
+        return json.dumps(stats).encode("utf-8")
+
+
+def serve(**kwargs):
+    """Run a RenderServer until interrupted (see RenderServer for arguments)"""
+    server = RenderServer(**kwargs)
+
+    async def run():
+        host, port = await server.start()
+        print(f"serving on http://{host}:{port}")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,153 @@
+"""
+Many diagrams in one SVG document.
+
+Chord diagrams on a songsheet mostly repeat the same grid of frets,
+strings, nut and inlays. A ``Songsheet`` draws each distinct grid once,
+as a ``<symbol>`` in the document's ``<defs>``, and each diagram as a
+``<use>`` of its grid plus its own markers, string labels and title::
+
+    sheet = Songsheet(columns=4)
+    for positions, title in (("xx0232", "D"), ("320003", "G"), ("x02020", "A7")):
+        sheet.add(GuitarChord(positions=positions, title=title))
+    sheet.save("chords.svg")
+
+Diagrams share a grid when they are the same instrument with the same fret
+range, style, string colours and inlays, and either all have titles or
+all don't (a title moves the grid down).
+"""
+
+from .backends import DrawingTarget, get_backend
+from .chord import Chord
+from .compat import StringIO
+from .fretboard import Fretboard
+from .specs import from_spec
+from .stream import is_compressed, save_file, write_drawing
+
+
+class Songsheet(object):
+    """
+    A grid of chord diagrams and fretboards, in a single document.
+
+    columns: the number of diagrams per row. Each diagram is given a cell
+             the size of the largest diagram on the sheet.
+    """
+
+    def __init__(self, diagrams=(), columns=6):
+        self.columns = columns
+        self.diagrams = []
+        self.drawing = None
+        for diagram in diagrams:
+            self.add(diagram)
+
+    def add(self, diagram):
+        """Add a Chord, Fretboard or spec (see fretboard2.specs) to the sheet"""
+        self.diagrams.append(from_spec(diagram))
+
+    def get_fretboards(self):
+        fretboards = []
+        for diagram in self.diagrams:
+            if isinstance(diagram, Chord):
+                diagram.draw()
+                diagram = diagram.fretboard
+            fretboards.append(diagram)
+        return fretboards
+
+    @staticmethod
+    def grid_key(fretboard):
+        """Everything that affects a fretboard's background grid"""
+        return (
+            type(fretboard),
+            tuple(fretboard.frets),
+            tuple(string.color for string in fretboard.strings),
+            tuple(fretboard.inlays),
+            bool(fretboard.title),
+            fretboard.style,
+        )
+
+    def draw_grid(self, fretboard, grid_id):
+        """Draw the parts of a fretboard shared with other diagrams, as a symbol"""
+        width = fretboard.style.drawing.width
+        height = fretboard.style.drawing.height
+        symbol = self.drawing.symbol(id=grid_id, viewBox=f"0 0 {width} {height}")
+
+        fretboard.drawing = DrawingTarget(self.drawing, symbol)
+        fretboard.draw_background()
+        fretboard.draw_frets()
+        fretboard.draw_inlays()
+        fretboard.draw_fret_label()
+        fretboard.draw_strings(labels=False)
+        fretboard.draw_nut()
+
+        self.drawing.defs.add(symbol)
+
+    def draw(self, backend=None):
+        fretboards = self.get_fretboards()
+        cell_width = max((fb.style.drawing.width for fb in fretboards), default=0)
+        cell_height = max((fb.style.drawing.height for fb in fretboards), default=0)
+        rows = -(-len(fretboards) // self.columns)
+
+        drawing_factory = get_backend(backend or Fretboard.backend)
+        self.drawing = drawing_factory(
+            (cell_width * min(len(fretboards), self.columns), cell_height * rows)
+        )
+
+        grids = {}
+        for index, fretboard in enumerate(fretboards):
+            fretboard.calculate_layout()
+
+            key = self.grid_key(fretboard)
+            grid_id = grids.get(key)
+            if grid_id is None:
+                grid_id = grids[key] = f"grid-{len(grids)}"
+                self.draw_grid(fretboard, grid_id)
+
+            row, column = divmod(index, self.columns)
+            group = self.drawing.g(
+                transform=f"translate({column * cell_width},{row * cell_height})"
+            )
+            group.add(
+                self.drawing.use(
+                    f"#{grid_id}",
+                    insert=(0, 0),
+                    size=(
+                        fretboard.style.drawing.width,
+                        fretboard.style.drawing.height,
+                    ),
+                )
+            )
+
+            fretboard.drawing = DrawingTarget(self.drawing, group)
+            fretboard.draw_string_labels()
+            fretboard.draw_markers()
+            fretboard.draw_title()
+
+            self.drawing.add(group)
+
+    def render(self, output=None, backend=None):
+        self.draw(backend=backend)
+
+        if output is None:
+            output = StringIO()
+
+        self.drawing.write(output)
+        return output
+
+    def stream(self, fileobj, backend=None, compress=False):
+        """
+        Write the sheet to a binary file object (or socket) as it's
+        serialised, diagram by diagram, gzipped if compress is set.
+        """
+        self.draw(backend=backend)
+        return write_drawing(self.drawing, fileobj, compress=compress)
+
+    def save(self, filename, backend=None):
+        """Save as SVG, or gzipped SVG if filename ends with .svgz"""
+        if is_compressed(filename):
+            save_file(
+                filename,
+                lambda output: self.stream(output, backend=backend, compress=True),
+                binary=True,
+            )
+            return
+
+        save_file(filename, lambda output: self.render(output, backend=backend))
@@ -0,0 +1,107 @@
+"""
+Build diagrams from plain-data specifications.
+
+A spec is a dict (as read from JSON or YAML) describing a chord::
+
+    {"instrument": "guitar", "positions": "xx0232", "fingers": "---132",
+     "title": "D", "style": {"drawing": {"orientation": "landscape"}}}
+
+or, with ``"type": "fretboard"``, a fretboard with explicit markers::
+
+    {"type": "fretboard", "instrument": "guitar", "frets": [5, 8],
+     "markers": [{"string": 0, "fret": 5, "label": "A", "color": "salmon"}],
+     "barres": [{"strings": [0, 5], "fret": 5, "finger": "1"}],
+     "string_labels": [{"string": 2, "label": "O"}]}
+
+Fretboards can also take a ``tuning`` and ``capo``, and ``notes`` to mark
+(as keyword arguments to ``Fretboard.add_notes``)::
+
+    {"type": "fretboard", "frets": [0, 12],
+     "notes": {"notes": ["1", "b3", "4", "5", "b7"], "root": "A",
+               "label": "interval"}}
+
+``instrument`` is one of "guitar" (the default), "bass" or "ukulele".
+A ``filename`` key is allowed, and ignored here; it is used by the batch
+renderer to decide where to save a diagram.
+"""
+
+from .chord import BassChord, Chord, GuitarChord, UkuleleChord
+from .fretboard import BassFretboard, Fretboard, GuitarFretboard, UkuleleFretboard
+
+INSTRUMENTS = {
+    "guitar": (GuitarChord, GuitarFretboard),
+    "bass": (BassChord, BassFretboard),
+    "ukulele": (UkuleleChord, UkuleleFretboard),
+}
+
+CHORD_KEYS = {"positions", "fingers", "barre", "title", "style"}
+FRETBOARD_KEYS = {
+    "frets",
+    "inlays",
+    "title",
+    "style",
+    "markers",
+    "barres",
+    "string_labels",
+    "tuning",
+    "capo",
+    "notes",
+}
+COMMON_KEYS = {"type", "instrument", "filename"}
+
+
+def from_spec(spec):
+    """
+    Build a Chord or Fretboard from a spec.
+
+    Diagrams that are already Chord or Fretboard instances are returned
+    unchanged, so specs and diagrams can be mixed freely.
+    """
+    if isinstance(spec, (Chord, Fretboard)):
+        return spec
+
+    kind = spec.get("type", "chord")
+    instrument = spec.get("instrument", "guitar")
+    try:
+        chord_cls, fretboard_cls = INSTRUMENTS[instrument]
+    except KeyError:
+        raise ValueError(
+            f"Unknown instrument {instrument!r}, "
+            f"expected one of {', '.join(INSTRUMENTS)}"
+        ) from None
+
+    if kind == "chord":
+        _check_keys(spec, CHORD_KEYS)
+        return chord_cls(**{k: v for k, v in spec.items() if k in CHORD_KEYS})
+
+    if kind == "fretboard":
+        _check_keys(spec, FRETBOARD_KEYS)
+        kwargs = {
+            k: spec[k]
+            for k in ("frets", "inlays", "title", "style", "tuning", "capo")
+            if k in spec
+        }
+        if "frets" in kwargs:
+            kwargs["frets"] = tuple(kwargs["frets"])
+        fb = fretboard_cls(**kwargs)
+        for barre in spec.get("barres", ()):
+            fb.add_barre(
+                fret=barre["fret"],
+                strings=tuple(barre["strings"]),
+                finger=barre.get("finger"),
+            )
+        for marker in spec.get("markers", ()):
+            fb.add_marker(**marker)
+        for label in spec.get("string_labels", ()):
+            fb.add_string_label(**label)
+        if "notes" in spec:
+            fb.add_notes(**spec["notes"])
+        return fb
+
+    raise ValueError(f"Unknown diagram type {kind!r}, expected chord or fretboard")
+
+
+def _check_keys(spec, allowed):
+    unknown = set(spec) - allowed - COMMON_KEYS
+    if unknown:
+        raise ValueError(f"Unknown keys in spec: {', '.join(sorted(unknown))}")
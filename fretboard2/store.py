@@ -0,0 +1,228 @@
+"""
+A content-addressed output directory, for saving many copies of few diagrams.
+
+A songbook saves the same D, G and A7 diagrams over and over. With an
+``OutputStore``, each distinct document is written once, to a file named
+after a hash of its contents, and every filename saved is a hard link to
+it (or a copy, where hard links aren't possible)::
+
+    store = OutputStore("svg")
+    chord.save("svg/song-1/D.svg", store=store)
+    ...
+    store.write_manifest()
+
+or for every diagram, by setting ``Chord.store`` / ``Fretboard.store``.
+
+Diagrams already saved (going by their cache_key, see fretboard2.cache)
+aren't rendered again, and files already linked to the right document are
+left alone. ``write_manifest()`` writes a JSON object of each filename
+saved (relative to the directory) and its document's SHA-256 digest, so
+anything publishing the files can tell which have changed since the last
+manifest; ``changed()`` and ``removed()`` say so too. Each filename saved
+is kept (in ``files``) until then, so a store's memory grows with the number
+of files, a few hundred bytes each.
+
+As files are hard links, editing one in place edits them all. fretboard2's
+own saves (``Chord.save`` without a store, the command line without
+``--dedupe``) replace files rather than writing over them, so they leave
+the others alone; and a store checks the documents it keeps against their
+digests before using them again, replacing any that have been changed.
+"""
+
+import hashlib
+import io
+import json
+import os
+import tempfile
+
+from .cache import digest as key_digest
+from .stream import is_compressed
+
+MANIFEST = "manifest.json"
+OBJECTS = ".objects"
+
+# cache_key digests of diagrams saved -> document digest
+_MAX_RENDERED = 65536
+
+
+class OutputStore(object):
+    """
+    directory: where diagrams are saved; filenames must be inside it
+    objects:   where the distinct documents are kept (default: .objects,
+               in directory, so it's on the same filesystem)
+    manifest:  the manifest's filename, in directory
+    link:      hard link files to the documents; if false, copy them
+    """
+
+    def __init__(self, directory, objects=None, manifest=MANIFEST, link=True):
+        self.directory = directory
+        self.objects = objects or os.path.join(directory, OBJECTS)
+        self.manifest = os.path.join(directory, manifest)
+        self.link = link
+        # name (relative to directory) -> digest, for files saved
+        self.files = {}
+        # ...and as of the last manifest written
+        self.previous = self._read_manifest()
+        self.stats = {"saved": 0, "rendered": 0, "documents": 0, "unchanged": 0}
+        self._rendered = {}
+        os.makedirs(self.objects, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.write_manifest()
+
+    def name(self, filename):
+        """A filename, relative to the directory, as it goes in the manifest"""
+        name = os.path.relpath(filename, self.directory)
+        if name == os.pardir or name.startswith(os.pardir + os.sep):
+            raise ValueError(f"{filename} is outside {self.directory}")
+        return name.replace(os.sep, "/")
+
+    def path(self, digest, extension=".svg"):
+        """Where the document with a digest is kept"""
+        return os.path.join(self.objects, digest[:2], f"{digest}{extension}")
+
+    def save(self, diagram, filename, backend=None, cache=None):
+        """
+        Save a Chord or Fretboard as filename (gzipped, if it ends with
+        .svgz), returning its document's digest
+        """
+        compress = is_compressed(filename)
+        key = (key_digest(diagram.cache_key(backend)), compress)
+        digest = self._rendered.get(key)
+        if digest is not None and self._stored(digest, _extension(filename)):
+            self.place(filename, digest)
+            return digest
+
+        output = io.BytesIO()
+        diagram.stream(output, backend=backend, cache=cache, compress=compress)
+        self.stats["rendered"] += 1
+        digest = self.add(filename, output.getvalue())
+        if len(self._rendered) >= _MAX_RENDERED:
+            self._rendered.clear()
+        self._rendered[key] = digest
+        return digest
+
+    def add(self, filename, data):
+        """Save a document (bytes) as filename, returning its digest"""
+        digest = hashlib.sha256(data).hexdigest()
+        extension = _extension(filename)
+        if not self._stored(digest, extension):
+            _write_atomic(
+                self.path(digest, extension), lambda tmp: _write_bytes(tmp, data)
+            )
+            self.stats["documents"] += 1
+        self.place(filename, digest)
+        return digest
+
+    def _stored(self, digest, extension):
+        """
+        Is the document with a digest in the store? Not if it's missing, or
+        has been written over since (through one of its links)
+        """
+        return _file_digest(self.path(digest, extension)) == digest
+
+    def place(self, filename, digest):
+        """Make filename the document with a digest, already in the store"""
+        name = self.name(filename)
+        target = self.path(digest, _extension(filename))
+        self.files[name] = digest
+        self.stats["saved"] += 1
+
+        if self._unchanged(filename, name, target, digest):
+            self.stats["unchanged"] += 1
+            return
+
+        def link(tmp):
+            if self.link:
+                try:
+                    os.link(target, tmp)
+                    return
+                except OSError:
+                    # no hard links here (or across these filesystems)
+                    pass
+            with open(target, "rb") as document:
+                _write_bytes(tmp, document.read())
+
+        _write_atomic(filename, link)
+
+    def _unchanged(self, filename, name, target, digest):
+        try:
+            if self.link:
+                return os.path.samefile(filename, target)
+            # a copy: is it still the document it was?
+            return self.previous.get(name) == digest == _file_digest(filename)
+        except OSError:
+            return False
+
+    def changed(self):
+        """Names of files saved whose digest isn't the last manifest's"""
+        return sorted(
+            name
+            for name, digest in self.files.items()
+            if self.previous.get(name) != digest
+        )
+
+    def removed(self):
+        """Names in the last manifest which haven't been saved since"""
+        return sorted(self.previous.keys() - self.files.keys())
+
+    def write_manifest(self):
+        """Write the manifest of the files saved, returning its filename"""
+
+        def write(tmp):
+            with open(tmp, "w", encoding="utf-8") as output:
+                json.dump(self.files, output, indent=1, sort_keys=True)
+                output.write("\n")
+
+        _write_atomic(self.manifest, write)
+        return self.manifest
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest, encoding="utf-8") as fd:
+                return json.load(fd)
+        except FileNotFoundError:
+            return {}
+
+
+def _extension(filename):
+    # documents are named after their contents, but keep the extension
+    return os.path.splitext(filename)[1].lower()
+
+
+def _file_digest(filename):
+    """The SHA-256 digest of a file's contents, or None if it's missing"""
+    try:
+        with open(filename, "rb") as document:
+            return hashlib.sha256(document.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def _write_bytes(filename, data):
+    with open(filename, "wb") as output:
+        output.write(data)
+
+
+def _write_atomic(path, write):
+    """
+    Call write(tmp) to make a temporary file, and move it to path, so no one
+    sees a partly written file
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    os.close(fd)
+    try:
+        # os.link won't replace the (empty) file mkstemp made
+        os.unlink(tmp)
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
@@ -0,0 +1,134 @@
+"""
+Streaming SVG output to binary files, sockets and pipes.
+
+``render()`` builds the whole document as one string before writing it.
+The functions here instead write a drawing as it is serialised, a
+buffer-full at a time, encoded as UTF-8 and optionally gzipped (as for
+``.svgz`` files), so no full copy of the document is made::
+
+    with open("chord.svgz", "wb") as fd:
+        chord.stream(fd, compress=True)
+
+Drawings from the "string" backend (see fretboard2.backends) are
+serialised element by element. svgwrite drawings can only be serialised
+whole, so they are written as one fragment.
+
+Gzipped output has no timestamp, so the same diagram always compresses to
+the same bytes.
+
+``save_file`` is how diagrams are saved: to a new file, moved into place.
+"""
+
+import io
+import os
+import zlib
+
+from .svg import XML_HEADER
+
+# bytes (well, characters) to collect before writing; a single diagram fits
+BUFFER_SIZE = 64 * 1024
+
+
+def drawing_fragments(drawing):
+    """A drawing's document, as a series of strings"""
+    try:
+        fragments = drawing.fragments
+    except AttributeError:
+        # svgwrite
+        return iter((XML_HEADER, drawing.tostring()))
+    return fragments()
+
+
+def _sender(fileobj):
+    try:
+        return fileobj.write
+    except AttributeError:
+        # sockets
+        return fileobj.sendall
+
+
+def write_fragments(fragments, fileobj, compress=False, buffer_size=BUFFER_SIZE):
+    """
+    Write strings to a binary file object (or a socket), encoded as UTF-8.
+
+    Fragments are buffered until there are buffer_size characters, and then
+    written. With compress, output is gzipped.
+
+    Text file objects (StringIO, files opened in text mode) are accepted
+    too, without compression, and written to as text.
+
+    Returns the number of bytes (or, for text files, characters) written.
+    """
+    text = isinstance(fileobj, io.TextIOBase)
+    if text and compress:
+        raise ValueError("Compressed output needs a binary file object")
+
+    send = _sender(fileobj)
+    # wbits=31: a gzip header and trailer, with no timestamp
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 31) if compress else None
+    written = 0
+
+    def flush(chunk):
+        nonlocal written
+        if not text:
+            chunk = chunk.encode("utf-8")
+            if compressor is not None:
+                chunk = compressor.compress(chunk)
+        if chunk:
+            send(chunk)
+            written += len(chunk)
+
+    pending = []
+    pending_size = 0
+    for fragment in fragments:
+        pending.append(fragment)
+        pending_size += len(fragment)
+        if pending_size >= buffer_size:
+            flush("".join(pending))
+            pending = []
+            pending_size = 0
+
+    flush("".join(pending))
+    if compressor is not None:
+        tail = compressor.flush()
+        send(tail)
+        written += len(tail)
+    return written
+
+
+def write_drawing(drawing, fileobj, compress=False, buffer_size=BUFFER_SIZE):
+    """Stream a drawing's document to fileobj, see write_fragments()"""
+    return write_fragments(
+        drawing_fragments(drawing), fileobj, compress=compress, buffer_size=buffer_size
+    )
+
+
+def write_text(document, fileobj, compress=False):
+    """Write an already rendered document (e.g. from a cache) to fileobj"""
+    return write_fragments((document,), fileobj, compress=compress)
+
+
+def is_compressed(filename):
+    """Should a file be gzipped, going by its name?"""
+    return str(filename).lower().endswith((".svgz", ".gz"))
+
+
+def save_file(filename, write, binary=False):
+    """
+    Call write(fileobj) with a new file (binary, or text), and move it to
+    filename. A file already there is replaced, not written over, so files
+    hard linked to it (see fretboard2.store) keep their contents, and no one
+    sees a partly written file.
+    """
+    directory, name = os.path.split(filename)
+    tmp = os.path.join(directory, f".{name}.{os.urandom(4).hex()}.tmp")
+    # not mkstemp, which makes files only we can read
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with open(fd, "wb" if binary else "w") as output:
+            write(output)
+        os.replace(tmp, filename)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
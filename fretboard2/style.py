@@ -0,0 +1,232 @@
+"""
+Compiled, immutable diagram styles.
+
+Style overrides are plain (nested) dicts, as they always have been.
+``compile_style`` merges an override onto a set of defaults and turns the
+result into a tree of small, frozen, slotted objects, so that
+``style.marker.color`` is a plain slot lookup rather than a walk through
+nested dicts.
+
+Compiled styles are cached per distinct override, so every diagram
+sharing the same override shares the same ``Style`` object, and a
+``Chord`` hands its style to the ``Fretboard`` it builds by reference.
+"""
+
+from __future__ import annotations
+
+import copy
+from collections.abc import Mapping
+
+from ._defaults import DEFAULTS
+from .utils import dict_merge
+
+# font sizes may be given as numbers or CSS-style strings such as "80%"
+Size = int | float | str
+
+
+class _SectionType(type):
+    """
+    Give each style section ``__slots__`` matching its annotated fields.
+
+    This is a (much) lighter-weight stand-in for frozen, slotted dataclasses,
+    which would cost more at import time than the rest of the package.
+    """
+
+    def __new__(mcls, name, bases, namespace):
+        namespace["__slots__"] = tuple(namespace.get("__annotations__", ()))
+        return super().__new__(mcls, name, bases, namespace)
+
+
+class _Section(metaclass=_SectionType):
+    """Shared behaviour for the compiled (frozen) style sections"""
+
+    # field name -> section class, for nested sections
+    _nested = {}
+
+    def __init__(self, **kwargs):
+        for name in self.__slots__:
+            object.__setattr__(self, name, kwargs[name])
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __hash__(self):
+        return hash(self._values())
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({values})"
+
+    def __reduce__(self):
+        return (_rebuild, (type(self), self._values()))
+
+    def _values(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    @classmethod
+    def from_dict(cls, data: Mapping):
+        """Build a section from a mapping, ignoring keys we don't know about"""
+        kwargs = {}
+        for name in cls.__slots__:
+            value = data.get(name)
+            section = cls._nested.get(name)
+            if section is not None:
+                value = section.from_dict(value or {})
+            kwargs[name] = value
+        return cls(**kwargs)
+
+    def to_dict(self) -> dict:
+        """Convert back into a nested dict, suitable for use as an override"""
+        result = {}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if isinstance(value, _Section):
+                value = value.to_dict()
+            result[name] = value
+        return result
+
+
+def _rebuild(cls, values):
+    return cls(**dict(zip(cls.__slots__, values)))
+
+
+class DrawingStyle(_Section):
+    orientation: str
+    background_color: str | None
+    font_color: str
+    font_family: str
+    font_size: Size
+    height: int | float
+    width: int | float
+    spacing: int | float
+    label_all_frets: bool
+
+
+class NutStyle(_Section):
+    color: str
+    size: int | float
+
+
+class FretLabelFontStyle(_Section):
+    font_size: Size
+    font_style: str
+
+
+class FretStyle(_Section):
+    _nested = {"label": FretLabelFontStyle}
+
+    color: str
+    size: int | float
+    label: FretLabelFontStyle
+
+
+class FretLabelStyle(_Section):
+    width: int | float
+    font_style: str
+    font_size: Size
+    font_color: str
+
+
+class InlayStyle(_Section):
+    color: str
+    radius: int | float
+
+
+class StringStyle(_Section):
+    color: str
+    size: int | float
+    muted_font_color: str
+    open_font_color: str
+    label_font_family: str
+    label_font_size: Size
+    equal_weight: bool
+
+
+class MarkerStyle(_Section):
+    border_color: str
+    color: str
+    font_color: str
+    radius: int | float
+    stroke_width: int | float
+
+
+class TitleStyle(_Section):
+    font_color: str
+    font_family: str
+    font_size: Size
+
+
+class Style(_Section):
+    """The complete, compiled style for a diagram"""
+
+    _nested = {
+        "drawing": DrawingStyle,
+        "nut": NutStyle,
+        "fret": FretStyle,
+        "fret_label": FretLabelStyle,
+        "inlays": InlayStyle,
+        "string": StringStyle,
+        "marker": MarkerStyle,
+        "title": TitleStyle,
+    }
+
+    drawing: DrawingStyle
+    nut: NutStyle
+    fret: FretStyle
+    fret_label: FretLabelStyle
+    inlays: InlayStyle
+    string: StringStyle
+    marker: MarkerStyle
+    title: TitleStyle
+
+
+def freeze(value):
+    """
+    Turn a (nested) override into something hashable, for use as a cache key.
+    Mappings become sorted tuples of pairs, lists and tuples become tuples.
+    """
+    if isinstance(value, Mapping):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+_cache: dict[tuple, tuple[Mapping, Style]] = {}
+# guard against unbounded growth if callers generate endless distinct styles
+_CACHE_SIZE = 1024
+
+
+def compile_style(style=None, defaults: Mapping = DEFAULTS) -> Style:
+    """
+    Merge ``style`` onto ``defaults`` and return the compiled ``Style``.
+
+    style:    a (nested) dict of overrides, or an already-compiled Style,
+              which is returned as-is.
+    defaults: the dict the overrides are merged onto. This is treated as
+              read-only; the compiled result is cached against it.
+    """
+    if isinstance(style, Style):
+        return style
+
+    key = (id(defaults), freeze(style or {}))
+    try:
+        return _cache[key][1]
+    except KeyError:
+        pass
+
+    compiled = Style.from_dict(dict_merge(copy.deepcopy(defaults), style or {}))
+
+    if len(_cache) >= _CACHE_SIZE:
+        _cache.clear()
+    # keep a reference to the defaults so their id() can't be reused
+    _cache[key] = (defaults, compiled)
+    return compiled
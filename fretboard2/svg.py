@@ -0,0 +1,170 @@
+"""
+A minimal SVG writer that produces markup directly from strings.
+
+``SVGDrawing`` implements the small part of the ``svgwrite.Drawing`` API
+that ``Fretboard`` uses (``add``, ``line``, ``circle``, ``rect``, ``text``
+and ``write``), but each element is formatted into a string as soon as it
+is created, rather than building and validating a tree of element objects
+to be serialised later.
+
+Containers (``g``, ``symbol`` and the drawing's ``defs``) hold their
+children until they are written out.
+
+``fragments()`` yields the document piece by piece, for streaming (see
+fretboard2.stream), rather than as one string.
+
+The output matches svgwrite's, attribute order included, so the two
+backends can be used interchangeably.
+"""
+
+XML_HEADER = '<?xml version="1.0" encoding="utf-8" ?>\n'
+
+SVG_NAMESPACES = (
+    'xmlns="http://www.w3.org/2000/svg" '
+    'xmlns:ev="http://www.w3.org/2001/xml-events" '
+    'xmlns:xlink="http://www.w3.org/1999/xlink"'
+)
+
+_ESCAPES = str.maketrans(
+    {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "\n": "&#10;"}
+)
+_TEXT_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+
+# keyword argument names -> sorted (xml name, keyword) pairs, per call site
+_attribute_order = {}
+
+
+def attribute_name(name):
+    """Convert a python keyword to an SVG attribute name, as svgwrite does"""
+    return name.rstrip("_").replace("_", "-")
+
+
+def format_value(value):
+    if isinstance(value, str):
+        return value.translate(_ESCAPES)
+    return str(value)
+
+
+def format_attributes(attributes):
+    """Format a dict of attributes as svgwrite would, sorted by name"""
+    keys = tuple(attributes)
+    try:
+        order = _attribute_order[keys]
+    except KeyError:
+        order = _attribute_order[keys] = sorted(
+            (attribute_name(key), key) for key in keys
+        )
+    return "".join(
+        f' {name}="{format_value(attributes[key])}"'
+        for name, key in order
+        if attributes[key] is not None
+    )
+
+
+class SVGContainer(object):
+    """
+    An element holding other elements (which may be containers themselves)
+    """
+
+    def __init__(self, tag, attributes=None):
+        self.tag = tag
+        self.attributes = attributes or {}
+        self.elements = []
+
+    def add(self, element):
+        self.elements.append(element)
+        return element
+
+    def __str__(self):
+        attributes = format_attributes(self.attributes)
+        if not self.elements:
+            return f"<{self.tag}{attributes} />"
+        children = "".join(map(str, self.elements))
+        return f"<{self.tag}{attributes}>{children}</{self.tag}>"
+
+
+class SVGDrawing(object):
+    """
+    An SVG document, built from pre-formatted fragments.
+    """
+
+    # see Fretboard.presentation()
+    classes = None
+    # elements are finished strings, which several drawings can share (see
+    # fretboard2.backgrounds)
+    shared_elements = True
+
+    def __init__(self, size=("100%", "100%")):
+        self.width, self.height = size
+        self.elements = []
+        self.defs = SVGContainer("defs")
+
+    def add(self, element):
+        self.elements.append(element)
+        return element
+
+    def element(self, tag, attributes, text=None):
+        """Format a single element"""
+        if text is None:
+            return f"<{tag}{format_attributes(attributes)} />"
+        text = str(text).translate(_TEXT_ESCAPES)
+        return f"<{tag}{format_attributes(attributes)}>{text}</{tag}>"
+
+    def line(self, start, end, **extra):
+        x1, y1 = start
+        x2, y2 = end
+        return self.element("line", dict(x1=x1, y1=y1, x2=x2, y2=y2, **extra))
+
+    def circle(self, center, r, **extra):
+        cx, cy = center
+        return self.element("circle", dict(cx=cx, cy=cy, r=r, **extra))
+
+    def rect(self, insert, size, **extra):
+        x, y = insert
+        width, height = size
+        return self.element("rect", dict(x=x, y=y, width=width, height=height, **extra))
+
+    def text(self, text, insert, **extra):
+        x, y = insert
+        return self.element("text", dict(x=x, y=y, **extra), text=text)
+
+    def g(self, **extra):
+        return SVGContainer("g", extra)
+
+    def symbol(self, **extra):
+        return SVGContainer("symbol", extra)
+
+    def use(self, href, insert=None, size=None, **extra):
+        attributes = {"xlink:href": href}
+        if insert is not None:
+            attributes["x"], attributes["y"] = insert
+        if size is not None:
+            attributes["width"], attributes["height"] = size
+        return self.element("use", dict(attributes, **extra))
+
+    def header(self):
+        return (
+            f'<svg baseProfile="full" height="{format_value(self.height)}" '
+            f'version="1.1" width="{format_value(self.width)}" '
+            f"{SVG_NAMESPACES}>{self.defs}"
+        )
+
+    def footer(self):
+        return "</svg>"
+
+    def tostring(self):
+        return "".join((self.header(), *map(str, self.elements), self.footer()))
+
+    def fragments(self):
+        """
+        The whole document, XML header included, as a series of strings: one
+        per top level element (e.g. each diagram's group, on a songsheet)
+        """
+        yield XML_HEADER
+        yield self.header()
+        yield from map(str, self.elements)
+        yield self.footer()
+
+    def write(self, fd):
+        fd.write(XML_HEADER)
+        fd.write(self.tostring())
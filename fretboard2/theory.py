@@ -0,0 +1,220 @@
+"""
+Just enough music theory to name notes and chords.
+
+Pitches are MIDI note numbers (C4 = 60), pitch classes are 0-11 (C = 0),
+and sets of pitch classes are 12-bit masks, with bit n set for pitch
+class n.
+"""
+
+NOTE_NAMES = ("C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B")
+FLAT_NAMES = ("C", "Db", "D", "Eb", "E", "F", "Gb", "G", "Ab", "A", "Bb", "B")
+
+_NATURALS = {"C": 0, "D": 2, "E": 4, "F": 5, "G": 7, "A": 9, "B": 11}
+_ACCIDENTALS = {"#": 1, "b": -1, "": 0}
+
+# chord qualities (suffixes) and their intervals, in semitones from the root
+CHORD_QUALITIES = {
+    "": (0, 4, 7),
+    "m": (0, 3, 7),
+    "5": (0, 7),
+    "dim": (0, 3, 6),
+    "aug": (0, 4, 8),
+    "sus2": (0, 2, 7),
+    "sus4": (0, 5, 7),
+    "6": (0, 4, 7, 9),
+    "m6": (0, 3, 7, 9),
+    "7": (0, 4, 7, 10),
+    "maj7": (0, 4, 7, 11),
+    "m7": (0, 3, 7, 10),
+    "mmaj7": (0, 3, 7, 11),
+    "dim7": (0, 3, 6, 9),
+    "m7b5": (0, 3, 6, 10),
+    "7sus4": (0, 5, 7, 10),
+    "add9": (0, 2, 4, 7),
+    "9": (0, 2, 4, 7, 10),
+    "maj9": (0, 2, 4, 7, 11),
+    "m9": (0, 2, 3, 7, 10),
+}
+
+# alternative spellings of chord qualities
+QUALITY_ALIASES = {
+    "maj": "",
+    "M": "",
+    "min": "m",
+    "-": "m",
+    "+": "aug",
+    "M7": "maj7",
+    "min7": "m7",
+    "-7": "m7",
+    "ø": "m7b5",
+    "o": "dim",
+    "o7": "dim7",
+    "sus": "sus4",
+}
+
+
+def split_note(name):
+    """Split a note name into (pitch class, remainder), e.g. "F#m7" -> (6, "m7")"""
+    try:
+        natural = _NATURALS[name[0].upper()]
+    except (IndexError, KeyError):
+        raise ValueError(f"Not a note name: {name!r}") from None
+    accidental = name[1:2] if name[1:2] in ("#", "b") else ""
+    return (natural + _ACCIDENTALS[accidental]) % 12, name[1 + len(accidental) :]
+
+
+def pitch_class(name):
+    """The pitch class of a note name, e.g. "Eb" -> 3"""
+    pc, rest = split_note(name)
+    if rest and not rest.lstrip("-").isdigit():
+        raise ValueError(f"Not a note name: {name!r}")
+    return pc
+
+
+def note_number(name):
+    """The MIDI number of a note name with an octave, e.g. "E2" -> 40"""
+    if isinstance(name, int):
+        return name
+    pc, octave = split_note(name)
+    try:
+        return pc + (int(octave) + 1) * 12
+    except ValueError:
+        raise ValueError(f"Not a note name with an octave: {name!r}") from None
+
+
+def note_name(number, flats=False):
+    """The name of a pitch class, or a MIDI number (modulo the octave)"""
+    return (FLAT_NAMES if flats else NOTE_NAMES)[number % 12]
+
+
+def parse_chord(name):
+    """Parse a chord name into (root pitch class, quality), e.g. "Bbm7" -> (10, "m7")"""
+    root, quality = split_note(name)
+    quality = QUALITY_ALIASES.get(quality, quality)
+    if quality not in CHORD_QUALITIES:
+        raise ValueError(f"Unknown chord quality in {name!r}")
+    return root, quality
+
+
+def chord_name(root, quality, flats=False):
+    return f"{note_name(root, flats)}{quality}"
+
+
+def pitch_class_mask(pitch_classes):
+    """A 12-bit mask from an iterable of pitch classes (or MIDI numbers)"""
+    mask = 0
+    for pc in pitch_classes:
+        mask |= 1 << (pc % 12)
+    return mask
+
+
+def chord_mask(root, intervals):
+    """The pitch class mask for a chord"""
+    return pitch_class_mask(root + interval for interval in intervals)
+
+
+# interval names, in semitones from the root
+INTERVALS = {
+    "1": 0,
+    "R": 0,
+    "b2": 1,
+    "b9": 1,
+    "2": 2,
+    "9": 2,
+    "#2": 3,
+    "#9": 3,
+    "b3": 3,
+    "3": 4,
+    "4": 5,
+    "11": 5,
+    "#4": 6,
+    "#11": 6,
+    "b5": 6,
+    "5": 7,
+    "#5": 8,
+    "b6": 8,
+    "b13": 8,
+    "6": 9,
+    "13": 9,
+    "bb7": 9,
+    "b7": 10,
+    "7": 11,
+}
+# the usual name for each number of semitones
+INTERVAL_NAMES = ("1", "b2", "2", "b3", "3", "4", "b5", "5", "#5", "6", "b7", "7")
+
+
+def interval(name):
+    """Semitones from the root for an interval name, e.g. "b3" -> 3"""
+    try:
+        return INTERVALS[name]
+    except KeyError:
+        raise ValueError(f"Not an interval name: {name!r}") from None
+
+
+def interval_name(semitones):
+    return INTERVAL_NAMES[semitones % 12]
+
+
+class PitchTable(object):
+    """
+    The pitch of every string and fret for a tuning (and capo).
+
+    notes[string][fret]:         MIDI number
+    pitch_classes[string][fret]: pitch class
+    positions[pitch class]:      ((string, fret), ...) on the whole neck
+
+    Frets are numbered from the nut, whether or not there's a capo. With a
+    capo, fret 0 (an open string) sounds at the capo, and the frets below
+    it aren't included in ``positions``.
+
+    Tables are shared (see ``get_pitch_table``), so treat them as read-only.
+    """
+
+    __slots__ = ("tuning", "capo", "fret_count", "notes", "pitch_classes", "positions")
+
+    def __init__(self, tuning, capo=0, fret_count=24):
+        self.tuning = tuple(tuning)
+        self.capo = capo
+        self.fret_count = fret_count
+
+        self.notes = tuple(
+            tuple(
+                note_number(open_note) + max(fret, capo)
+                for fret in range(fret_count + 1)
+            )
+            for open_note in self.tuning
+        )
+        self.pitch_classes = tuple(
+            tuple(note % 12 for note in string) for string in self.notes
+        )
+
+        positions = [[] for _ in range(12)]
+        for string, pitch_classes in enumerate(self.pitch_classes):
+            positions[pitch_classes[0]].append((string, 0))
+            for fret in range(capo + 1, fret_count + 1):
+                positions[pitch_classes[fret]].append((string, fret))
+        self.positions = tuple(tuple(sorted(p)) for p in positions)
+
+    def __repr__(self):
+        return f"PitchTable({self.tuning!r}, capo={self.capo})"
+
+
+_pitch_tables = {}
+# tunings are few, but don't let unusual callers grow this forever
+_PITCH_TABLE_CACHE_SIZE = 1024
+
+
+def get_pitch_table(tuning, capo=0, fret_count=24):
+    """The (shared) PitchTable for a tuning and capo"""
+    key = (tuple(tuning), capo, fret_count)
+    try:
+        return _pitch_tables[key]
+    except KeyError:
+        pass
+
+    table = PitchTable(*key)
+    if len(_pitch_tables) >= _PITCH_TABLE_CACHE_SIZE:
+        _pitch_tables.clear()
+    _pitch_tables[key] = table
+    return table
@@ -1,7 +1,7 @@
 try:
-    from collections import Mapping
-except ImportError:
     from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
 
 
 # https://gist.github.com/angstwad/bf22d1822c38a92ec0a9
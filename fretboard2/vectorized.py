@@ -0,0 +1,164 @@
+"""
+Bulk marker and barre geometry, vectorised with NumPy where available.
+
+Everything on a diagram except its markers and barres comes from the
+shared ``Layout`` tables for its shape (see fretboard2.layout), which are
+computed once. Markers and barres differ per diagram, so when laying out
+thousands of diagrams their positions are the remaining per-element
+arithmetic. ``marker_positions`` computes them for a whole batch of
+diagrams at once: diagrams are grouped by shape, and the positions for
+each group are calculated with a few array operations.
+
+NumPy is optional. Without it (or with ``use_numpy=False``) the same
+positions are looked up one at a time from the layout tables, with
+identical results.
+
+    svgs = render_batch(chords, backend="string")
+"""
+
+from .chord import Chord
+from .compat import StringIO
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - depends on the environment
+    numpy = None
+
+
+def get_fretboard(diagram):
+    """The fretboard for a diagram, drawing chords to build theirs"""
+    if isinstance(diagram, Chord):
+        diagram.draw()
+        return diagram.fretboard
+    return diagram
+
+
+def marker_positions(fretboards, use_numpy=None):
+    """
+    Positions for the markers of many fretboards.
+
+    Returns a list (one per fretboard) of lists of positions: a (start, end)
+    for each barre, then a centre (x, y) for each marker, suitable for
+    ``Fretboard.draw(marker_positions=...)``.
+
+    use_numpy: True/False to force a choice, or None to use NumPy if installed.
+    """
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    elif use_numpy and numpy is None:
+        raise RuntimeError("NumPy is not installed")
+
+    for fb in fretboards:
+        fb.calculate_layout()
+
+    if not use_numpy:
+        return [_python_positions(fb) for fb in fretboards]
+
+    results = [[None] * (len(fb.barres) + len(fb.markers)) for fb in fretboards]
+
+    # diagrams of the same shape share a layout
+    groups = {}
+    for index, fb in enumerate(fretboards):
+        groups.setdefault(id(fb.layout), []).append(index)
+
+    for indices in groups.values():
+        _numpy_positions(
+            [fretboards[i] for i in indices], [results[i] for i in indices]
+        )
+
+    return results
+
+
+def _python_positions(fb):
+    layout = fb.layout
+    first_fret = fb.frets[0]
+    positions = [
+        layout.barre_position(first, last, fret - first_fret)
+        for (first, last), fret in zip(fb.barres.strings, fb.barres.frets)
+    ]
+    positions.extend(
+        layout.marker_position(string, fret - first_fret)
+        for string, fret in zip(fb.markers.strings, fb.markers.frets)
+    )
+    return positions
+
+
+def _numpy_positions(fretboards, results):
+    """Fill in results for a group of fretboards sharing one layout"""
+    layout = fretboards[0].layout
+    orientation = layout.orientation
+    base = layout.fret_origin
+
+    def along(frets, first_frets):
+        # same arithmetic as Layout.fret_centre, so results match exactly
+        indices = numpy.array(frets, dtype=numpy.float64) - numpy.array(
+            first_frets, dtype=numpy.float64
+        )
+        return (
+            (base + layout._nut_size)
+            + (layout.fret_space * indices - layout.fret_space / 2)
+        ).tolist()
+
+    # concatenate the columns of every fretboard in the group
+    barre_first, barre_last, barre_frets, barre_offsets = [], [], [], []
+    marker_strings, marker_frets, marker_offsets = [], [], []
+    for fb in fretboards:
+        first_fret = fb.frets[0]
+        for first, last in fb.barres.strings:
+            barre_first.append(first)
+            barre_last.append(last)
+        barre_frets.extend(fb.barres.frets)
+        barre_offsets.extend([first_fret] * len(fb.barres))
+        marker_strings.extend(fb.markers.strings)
+        marker_frets.extend(fb.markers.frets)
+        marker_offsets.extend([first_fret] * len(fb.markers))
+
+    barre_positions = []
+    if barre_frets:
+        barre_strings = numpy.array(layout.barre_strings, dtype=numpy.float64)
+        starts = barre_strings[numpy.array(barre_first, dtype=numpy.intp)].tolist()
+        ends = barre_strings[numpy.array(barre_last, dtype=numpy.intp)].tolist()
+        barre_positions = list(
+            map(orientation.span, starts, ends, along(barre_frets, barre_offsets))
+        )
+
+    marker_positions = []
+    if marker_frets:
+        across = numpy.array(layout.marker_strings, dtype=numpy.float64)[
+            numpy.array(marker_strings, dtype=numpy.intp)
+        ].tolist()
+        marker_positions = list(
+            map(orientation.point, across, along(marker_frets, marker_offsets))
+        )
+
+    # and split them up again, barres first for each fretboard
+    barre_index = marker_index = 0
+    for fb, fb_results in zip(fretboards, results):
+        barre_count = len(fb.barres)
+        marker_count = len(fb.markers)
+        fb_results[:barre_count] = barre_positions[
+            barre_index : barre_index + barre_count
+        ]
+        fb_results[barre_count:] = marker_positions[
+            marker_index : marker_index + marker_count
+        ]
+        barre_index += barre_count
+        marker_index += marker_count
+
+
+def render_batch(diagrams, backend=None, use_numpy=None):
+    """
+    Render many chords and fretboards, computing their marker geometry in bulk.
+
+    Returns a list of SVG documents, in the same order as ``diagrams``.
+    """
+    fretboards = [get_fretboard(diagram) for diagram in diagrams]
+    positions = marker_positions(fretboards, use_numpy=use_numpy)
+
+    documents = []
+    for fb, fb_positions in zip(fretboards, positions):
+        fb.draw(backend=backend, marker_positions=fb_positions)
+        output = StringIO()
+        fb.drawing.write(output)
+        documents.append(output.getvalue())
+    return documents
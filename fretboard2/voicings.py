@@ -0,0 +1,417 @@
+"""
+Finding playable voicings for a chord.
+
+``find_voicings`` lists every way to play a chord on an instrument within a
+window of frets, subject to limits on hand span and fingers::
+
+    for voicing in find_voicings(GuitarChord, "Am7", frets=(0, 12)):
+        print(voicing.positions_string, voicing.fingers_string)
+
+The search walks the strings from lowest to highest, trying only the frets
+on each string whose note is in the chord (or muting the string). Partial
+voicings are abandoned as soon as they exceed the span or finger limits,
+or can no longer cover every note of the chord with the strings left.
+
+``VoicingIndex`` runs (and caches) searches for every root and chord
+quality, and can be saved to and loaded from a JSON file.
+"""
+
+import json
+from operator import itemgetter
+
+from .theory import CHORD_QUALITIES, chord_mask, chord_name, note_number, parse_chord
+
+FIFTH = 7
+
+# above any fret, for the lowest fret fretted before any are
+NO_FRET = 1 << 16
+
+_fret_tables = {}
+# tunings and windows are few, but don't let unusual callers grow this forever
+_FRET_TABLE_CACHE_SIZE = 1024
+
+
+def fret_table(tuning, frets):
+    """
+    For each string of a tuning (as pitch classes), the frets to consider in
+    a window of frets, as (fret, pitch class): the open string, and the
+    frets in the window
+    """
+    key = (tuning, frets)
+    try:
+        return _fret_tables[key]
+    except KeyError:
+        pass
+
+    first, last = frets
+    table = tuple(
+        ((0, open_pc),)
+        + tuple(
+            (fret, (open_pc + fret) % 12) for fret in range(max(first, 1), last + 1)
+        )
+        for open_pc in tuning
+    )
+    if len(_fret_tables) >= _FRET_TABLE_CACHE_SIZE:
+        _fret_tables.clear()
+    _fret_tables[key] = table
+    return table
+
+
+def fretboard_class(chord_cls):
+    """The Fretboard class for a Chord class (fretboard_cls is a property)"""
+    return chord_cls.fretboard_cls.fget(chord_cls)
+
+
+def open_pitch_classes(chord_cls):
+    return tuple(note_number(n) % 12 for n in fretboard_class(chord_cls).tuning)
+
+
+class Voicing(object):
+    """
+    A playable voicing.
+
+    positions: fret per string, None for muted strings
+    fingers:   finger per string (1-4), None for open or muted strings.
+               Notes played with a barre share finger 1.
+    """
+
+    __slots__ = ("chord_cls", "name", "positions", "fingers")
+
+    def __init__(self, chord_cls, name, positions, fingers):
+        self.chord_cls = chord_cls
+        self.name = name
+        self.positions = tuple(positions)
+        self.fingers = tuple(fingers)
+
+    def __repr__(self):
+        return (
+            f"Voicing({self.chord_cls.__name__}, {self.name!r}, "
+            f"{self.positions_string!r}, {self.fingers_string!r})"
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, Voicing):
+            return NotImplemented
+        return (self.chord_cls, self.name, self.positions, self.fingers) == (
+            other.chord_cls,
+            other.name,
+            other.positions,
+            other.fingers,
+        )
+
+    def __hash__(self):
+        return hash((self.chord_cls, self.name, self.positions, self.fingers))
+
+    @property
+    def positions_string(self):
+        """Positions as accepted by Chord, e.g. "xx0232" or "x-x-12-12-12-x" """
+        values = ["x" if p is None else str(p) for p in self.positions]
+        if any(p is not None and p > 9 for p in self.positions):
+            return "-".join(values)
+        return "".join(values)
+
+    @property
+    def fingers_string(self):
+        return "".join("-" if f is None else str(f) for f in self.fingers)
+
+    @property
+    def span(self):
+        fretted = [p for p in self.positions if p]
+        return max(fretted) - min(fretted) + 1 if fretted else 0
+
+    def to_chord(self, title=None, style=None):
+        """A ready-to-render Chord, titled with the chord name by default"""
+        return self.chord_cls(
+            positions=self.positions_string,
+            fingers=self.fingers_string,
+            title=self.name if title is None else title,
+            style=style,
+        )
+
+
+def assign_fingers(positions, max_fingers=4):
+    """
+    Work out a fingering for positions, or None if it needs too many fingers.
+
+    Notes on the lowest fretted fret are barred with finger 1 when they
+    span more than one string and every string in between is fretted.
+    Remaining notes get the next finger, in order of fret then string.
+    """
+    fingers = [None] * len(positions)
+    fretted = sorted((fret, string) for string, fret in enumerate(positions) if fret)
+    if not fretted:
+        return fingers
+
+    # the notes on the lowest fret come first, in string order
+    lowest = fretted[0][0]
+    on_lowest = 1
+    while on_lowest < len(fretted) and fretted[on_lowest][0] == lowest:
+        on_lowest += 1
+    first, last = fretted[0][1], fretted[on_lowest - 1][1]
+    barre = on_lowest > 1 and all(positions[first : last + 1])
+
+    if len(fretted) - (on_lowest - 1 if barre else 0) > max_fingers:
+        return None
+    finger = 0
+    for index, (_, string) in enumerate(fretted):
+        if not (barre and 0 < index < on_lowest):
+            finger += 1
+        fingers[string] = finger
+    return fingers
+
+
+def find_voicings(
+    chord_cls,
+    chord,
+    frets=(0, 12),
+    max_span=4,
+    max_fingers=4,
+    min_strings=None,
+    open_strings=True,
+    inner_mutes=False,
+    root_in_bass=False,
+    omit_fifth=None,
+):
+    """
+    Find every playable voicing of a chord.
+
+    chord_cls:    GuitarChord, BassChord, UkuleleChord (or another Chord class
+                  whose fretboard has a tuning)
+    chord:        a chord name such as "C#m7", or (root pitch class, intervals)
+    frets:        (lowest, highest) frets to use for fretted notes
+    max_span:     the most frets a voicing may span, lowest to highest note
+    max_fingers:  the most fingers a voicing may need (a barre counts as one)
+    min_strings:  the fewest strings to play, by default all but two (but no
+                  fewer than three)
+    open_strings: allow open strings, even if the window doesn't include fret 0
+    inner_mutes:  allow muted strings between played ones
+    root_in_bass: only voicings with the root as their lowest note
+    omit_fifth:   allow leaving out the fifth; by default, only for chords of
+                  four or more notes
+
+    Returns a list of Voicing objects, easiest (lowest, fewest muted strings)
+    first.
+    """
+    if isinstance(chord, str):
+        name = chord
+        root, quality = parse_chord(chord)
+        intervals = CHORD_QUALITIES[quality]
+    else:
+        root, intervals = chord
+        name = None
+
+    # a list, from JSON (see VoicingIndex.load), is fine, but fret_table
+    # caches on it
+    frets = tuple(frets)
+    tuning = open_pitch_classes(chord_cls)
+    string_count = len(tuning)
+    if min_strings is None:
+        min_strings = min(string_count, max(3, string_count - 2))
+    if omit_fifth is None:
+        omit_fifth = len(intervals) >= 4
+
+    mask = chord_mask(root, intervals)
+    required = mask
+    if omit_fifth and FIFTH in intervals:
+        required &= ~chord_mask(root, (FIFTH,))
+
+    # the frets worth trying on each string: those whose note is in the chord
+    allow_open = open_strings or frets[0] == 0
+    candidates = [
+        [
+            (fret, 1 << pc)
+            for fret, pc in string_frets
+            if mask >> pc & 1 and (fret or allow_open)
+        ]
+        for string_frets in fret_table(tuning, frets)
+    ]
+
+    # (sort key, voicing), see the end
+    results = []
+    positions = [None] * string_count
+
+    def search(string, covered, low, high, fretted, above, sounded, state):
+        """
+        low, high: the lowest and highest frets fretted so far (NO_FRET and
+                   0 until there are any)
+        fretted:   the number of strings fretted
+        above:     ...of which, those above the lowest fret
+
+        Only called if the strings left can still play the notes missing,
+        and enough strings.
+        """
+        if string == string_count:
+            fingers = assign_fingers(positions, max_fingers)
+            if fingers is not None:
+                key = (high, string_count - sounded, high - low + 1 if fretted else 0)
+                results.append((key, Voicing(chord_cls, name, positions, fingers)))
+            return
+
+        # the strings left after this one
+        remaining = string_count - string - 1
+
+        # mute this string. state is 0 until a string is played, then 1, then
+        # 2 once a string after that is muted (unless inner_mutes is allowed)
+        if (required & ~covered).bit_count() <= remaining and (
+            sounded + remaining >= min_strings
+        ):
+            positions[string] = None
+            search(
+                string + 1,
+                covered,
+                low,
+                high,
+                fretted,
+                above,
+                sounded,
+                2 if state == 1 and not inner_mutes else state,
+            )
+        if state == 2:
+            return
+
+        for fret, bit in candidates[string]:
+            if root_in_bass and not sounded and bit != root_bit:
+                continue
+            if (required & ~(covered | bit)).bit_count() > remaining:
+                continue
+            if fret:
+                if fret < low:
+                    new_low = fret
+                    # everything fretted so far is above the new lowest fret
+                    new_above = fretted
+                else:
+                    new_low = low
+                    new_above = above + (fret > low)
+                new_high = fret if fret > high else high
+                if new_high - new_low >= max_span:
+                    continue
+                # at best, everything above the lowest fret needs its own finger
+                if new_above + 1 > max_fingers:
+                    continue
+                new_fretted = fretted + 1
+            else:
+                new_low, new_high = low, high
+                new_fretted, new_above = fretted, above
+
+            positions[string] = fret
+            search(
+                string + 1,
+                covered | bit,
+                new_low,
+                new_high,
+                new_fretted,
+                new_above,
+                sounded + 1,
+                1,
+            )
+        positions[string] = None
+
+    root_bit = 1 << root
+    if required.bit_count() <= string_count and string_count >= min_strings:
+        search(0, 0, NO_FRET, 0, 0, 0, 0, 0)
+
+    # easiest (lowest, fewest muted strings, smallest span) first
+    results.sort(key=itemgetter(0))
+    return [voicing for _, voicing in results]
+
+
+class VoicingIndex(object):
+    """
+    Voicings for every root and chord quality on an instrument.
+
+    Searches are run when a chord is first queried (or for everything, with
+    ``build()``), and their results kept, keyed on the chord's pitch
+    classes, so enharmonic names ("C#m", "Dbm") share results.
+
+        index = VoicingIndex(UkuleleChord, frets=(0, 7))
+        index.chords("Am7", limit=3)   # ready-to-render Chord objects
+    """
+
+    def __init__(self, chord_cls, **options):
+        self.chord_cls = chord_cls
+        self.options = options
+        # (root, quality) -> tuple of position tuples
+        self._index = {}
+
+    def __len__(self):
+        return len(self._index)
+
+    def build(self, qualities=None):
+        """Search every root and quality (or the given qualities)"""
+        for quality in qualities or CHORD_QUALITIES:
+            for root in range(12):
+                self._lookup(root, quality)
+        return self
+
+    def _lookup(self, root, quality):
+        key = (root, quality)
+        try:
+            return self._index[key]
+        except KeyError:
+            voicings = find_voicings(
+                self.chord_cls, (root, CHORD_QUALITIES[quality]), **self.options
+            )
+            self._index[key] = tuple(v.positions for v in voicings)
+            return self._index[key]
+
+    def query(self, chord, limit=None, max_fret=None, min_fret=None):
+        """
+        Voicings for a chord name, optionally only those between two frets
+        """
+        root, quality = parse_chord(chord)
+        results = []
+        for positions in self._lookup(root, quality):
+            fretted = [p for p in positions if p]
+            if max_fret is not None and fretted and max(fretted) > max_fret:
+                continue
+            if min_fret is not None and (not fretted or min(fretted) < min_fret):
+                continue
+            fingers = assign_fingers(positions, self.options.get("max_fingers", 4))
+            results.append(Voicing(self.chord_cls, chord, positions, fingers))
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+    def chords(self, chord, limit=None, style=None, **filters):
+        """Chord objects for each voicing of a chord, ready to render"""
+        return [
+            voicing.to_chord(style=style)
+            for voicing in self.query(chord, limit=limit, **filters)
+        ]
+
+    def save(self, filename):
+        data = {
+            "instrument": _class_name(self.chord_cls),
+            "options": self.options,
+            "voicings": [
+                [chord_name(root, quality), [list(p) for p in positions]]
+                for (root, quality), positions in self._index.items()
+            ],
+        }
+        with open(filename, "w") as output:
+            json.dump(data, output)
+
+    @classmethod
+    def load(cls, filename, chord_cls):
+        """
+        Load an index saved with save(), for the given Chord class (the one
+        it was saved for, or a subclass of it)
+        """
+        with open(filename) as fd:
+            data = json.load(fd)
+        instrument = data.get("instrument")
+        if instrument is not None and instrument not in map(
+            _class_name, chord_cls.__mro__
+        ):
+            raise ValueError(
+                f"{filename} is an index for {instrument}, "
+                f"not {_class_name(chord_cls)}"
+            )
+        index = cls(chord_cls, **data["options"])
+        for name, positions in data["voicings"]:
+            index._index[parse_chord(name)] = tuple(tuple(p) for p in positions)
+        return index
+
+
+def _class_name(cls):
+    return f"{cls.__module__}.{cls.__qualname__}"
@@ -0,0 +1,80 @@
+import pytest
+
+from fretboard2 import GuitarChord, GuitarFretboard, UkuleleChord, backgrounds
+
+
+@pytest.fixture
+def pool():
+    pool = backgrounds.pool
+    pool.clear()
+    pool.stats.reset()
+    yield pool
+    pool.clear()
+
+
+def render(diagram, backend="string"):
+    return diagram.render(backend=backend).getvalue()
+
+
+def test_shared_between_diagrams(pool):
+    render(GuitarChord("x32010", "-32-1-", title="C"))
+    assert (pool.stats.hits, pool.stats.misses) == (0, 1)
+
+    # the same shape: open position, five frets, a title
+    g = GuitarChord("320003", "21---3", title="G")
+    assert render(g) == render(g, "svgwrite")
+    assert pool.stats.hits == 1
+    assert len(pool) == 1
+
+
+def test_shapes(pool):
+    shapes = [
+        GuitarChord("x32010", title="C"),
+        # no title
+        GuitarChord("x32010"),
+        # up the neck, no nut
+        GuitarChord("x-x-12-12-12-x", title="A"),
+        UkuleleChord("0003", title="C"),
+        GuitarChord(
+            "x32010", title="C", style={"drawing": {"orientation": "landscape"}}
+        ),
+    ]
+    for chord in shapes:
+        assert render(chord) == render(chord, "svgwrite")
+    assert pool.stats.misses == len(shapes)
+    assert len(pool) == len(shapes)
+
+
+def test_fret_labels_not_shared(pool):
+    # the same shape (inlays on the second and fourth frets shown), but
+    # different fret numbers
+    render(GuitarFretboard(frets=(2, 6)))
+    high = GuitarFretboard(frets=(6, 10))
+    assert render(high) == render(high, "svgwrite")
+    assert pool.stats.hits == 1
+
+
+def test_only_shareable_backends(pool):
+    for backend in ("svgwrite", "css"):
+        render(GuitarChord("x32010", title="C"), backend)
+    assert len(pool) == 0
+    render(GuitarChord("x32010", title="C"), "minified")
+    assert len(pool) == 1
+
+
+def test_bounded(pool, monkeypatch):
+    monkeypatch.setattr(pool, "maxsize", 2)
+    chords = [
+        GuitarChord("x32010", title="C"),
+        GuitarChord("x32010"),
+        GuitarChord("x-x-12-12-12-x"),
+    ]
+    for chord in chords:
+        render(chord)
+    assert len(pool) == 2
+    assert pool.stats.evictions == 1
+
+    # the first shape was evicted, and is drawn again
+    fresh = GuitarChord("x32010", title="C")
+    assert render(fresh) == render(fresh, "svgwrite")
+    assert pool.stats.misses == 4
@@ -0,0 +1,82 @@
+import os
+
+from fretboard2 import GuitarChord
+from fretboard2.cache import LRUCache, RenderCache, digest
+
+
+def test_lru_hit_and_miss():
+    cache = LRUCache(maxsize=2)
+    assert cache.get("a") is None
+    cache.set("a", "A")
+    assert cache.get("a") == "A"
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", "A")
+    cache.set("b", "B")
+    cache.get("a")
+    cache.set("c", "C")
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache
+    assert len(cache) == 2
+    assert cache.stats.evictions == 1
+
+
+def test_digest_is_stable_and_distinct():
+    assert digest(("chord", "x32010")) == digest(("chord", "x32010"))
+    assert digest(("chord", "x32010")) != digest(("chord", "x32013"))
+
+
+def test_render_cache_hit():
+    cache = RenderCache(maxsize=4)
+    chord = GuitarChord("x32010", title="C")
+    first = chord.render(cache=cache).getvalue()
+    second = GuitarChord("x32010", title="C").render(cache=cache).getvalue()
+    assert first == second == chord.render().getvalue()
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+    assert len(cache) == 1
+
+
+def test_render_cache_miss_on_different_chord():
+    cache = RenderCache(maxsize=4)
+    GuitarChord("x32010").render(cache=cache)
+    GuitarChord("320003").render(cache=cache)
+    assert (cache.stats.hits, cache.stats.misses) == (0, 2)
+
+
+def test_render_cache_eviction():
+    cache = RenderCache(maxsize=1)
+    GuitarChord("x32010").render(cache=cache)
+    GuitarChord("320003").render(cache=cache)
+    GuitarChord("x32010").render(cache=cache)
+    assert cache.stats.hits == 0
+    assert cache.stats.evictions == 2
+
+
+def test_render_cache_disk_reload(tmp_path):
+    directory = str(tmp_path / "cache")
+    chord = GuitarChord("xx0232", title="D")
+    expected = chord.render(cache=RenderCache(directory=directory)).getvalue()
+
+    # a new cache (as in another process) finds the document on disk
+    cache = RenderCache(directory=directory)
+    assert GuitarChord("xx0232", title="D").render(cache=cache).getvalue() == expected
+    assert cache.stats.disk_hits == 1
+    assert cache.stats.disk_writes == 0
+
+    # ...and keeps it in memory from then on
+    GuitarChord("xx0232", title="D").render(cache=cache)
+    assert cache.stats.hits == 1
+
+
+def test_render_cache_clear_disk(tmp_path):
+    directory = str(tmp_path / "cache")
+    cache = RenderCache(directory=directory)
+    key = digest(("chord", "x32010"))
+    cache.set(key, "<svg/>")
+    assert os.path.exists(cache.path(key))
+    cache.clear(disk=True)
+    assert not os.path.exists(cache.path(key))
+    assert cache.get(key) is None
@@ -0,0 +1,108 @@
+import json
+import tarfile
+
+import pytest
+
+from fretboard2 import GuitarChord
+from fretboard2.cli import main
+
+GOOD = {"instrument": "guitar", "positions": "x32010", "title": "C"}
+
+
+def render(tmp_path, capsys, text, name="specs.jsonl"):
+    specs = tmp_path / name
+    specs.write_text(text, encoding="utf-8")
+    status = main(["render", str(specs), "-o", str(tmp_path / "out"), "-j", "0"])
+    return status, capsys.readouterr().err.splitlines()
+
+
+def lines(*specs):
+    return "".join(
+        spec if isinstance(spec, str) else json.dumps(spec) + "\n" for spec in specs
+    )
+
+
+def test_renders(tmp_path, capsys):
+    status, errors = render(
+        tmp_path, capsys, lines(GOOD, dict(GOOD, filename="sub/c.svg"))
+    )
+    assert status == 0
+    assert errors[-1].startswith("rendered 2 diagrams")
+    assert errors[-1].endswith(", 0 failed")
+    expected = GuitarChord("x32010", title="C").render(backend="string").getvalue()
+    assert (tmp_path / "out" / "00000000.svg").read_text() == expected
+    assert (tmp_path / "out" / "sub" / "c.svg").read_text() == expected
+
+
+def test_failures_by_line(tmp_path, capsys):
+    text = lines(
+        GOOD,
+        "\n",
+        "not json\n",
+        [1, 2],
+        "\n",
+        dict(GOOD, filename="../escaped.svg"),
+        {"instrument": "guitar", "positions": "zz"},
+        dict(GOOD, filename="last.svg"),
+    )
+    status, errors = render(tmp_path, capsys, text)
+    assert status == 1
+    assert [error.split(":")[0] for error in errors[:-1]] == [
+        "line 3",
+        "line 4",
+        "line 6",
+        "line 7",
+    ]
+    assert "invalid JSON" in errors[0]
+    assert errors[1] == "line 4: expected a mapping"
+    assert errors[2] == "line 6: filename is outside the output"
+    assert errors[-1].startswith("rendered 2 diagrams")
+    assert errors[-1].endswith(", 4 failed")
+    # the rest are rendered regardless, and named by their place among the specs
+    assert sorted(path.name for path in (tmp_path / "out").iterdir()) == [
+        "00000000.svg",
+        "last.svg",
+    ]
+    assert not (tmp_path / "escaped.svg").exists()
+
+
+def test_yaml_failures_by_line(tmp_path, capsys):
+    pytest.importorskip("yaml")
+    text = (
+        "instrument: guitar\n"
+        "positions: x32010\n"
+        "---\n"
+        "- instrument: guitar\n"
+        "  positions: zz\n"
+        "- 5\n"
+        "---\n"
+        "key: [unclosed\n"
+    )
+    status, errors = render(tmp_path, capsys, text, "specs.yaml")
+    assert status == 1
+    assert sorted(error.split(":")[0] for error in errors[:-1]) == [
+        "line 4",
+        "line 6",
+        "line 9",
+    ]
+    assert "invalid YAML" in next(e for e in errors if e.startswith("line 9"))
+    assert errors[-1].endswith(", 3 failed")
+
+
+def test_quiet(tmp_path, capsys):
+    specs = tmp_path / "specs.jsonl"
+    specs.write_text("not json\n")
+    status = main(["render", str(specs), "-o", str(tmp_path), "-j", "0", "-q"])
+    errors = capsys.readouterr().err.splitlines()
+    assert status == 1
+    assert len(errors) == 1
+    assert errors[0].endswith(", 1 failed")
+
+
+def test_tar(tmp_path, capsys):
+    specs = tmp_path / "specs.jsonl"
+    specs.write_text(lines(GOOD, dict(GOOD, filename="c.svg")))
+    archive = tmp_path / "out.tar.gz"
+    assert main(["render", str(specs), "--tar", str(archive), "-j", "0"]) == 0
+    with tarfile.open(archive) as tar:
+        assert tar.getnames() == ["00000000.svg", "c.svg"]
@@ -0,0 +1,148 @@
+import re
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from fretboard2 import (
+    GuitarChord,
+    GuitarFretboard,
+    Songsheet,
+    UkuleleChord,
+    compile_style,
+)
+from fretboard2.backends import css
+from fretboard2.css import stylesheet
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+ORIENTATIONS = ("portrait", "landscape")
+
+
+def diagrams(orientation, **overrides):
+    style = dict(overrides, drawing={"orientation": orientation})
+    yield GuitarChord("x32010", "-32-1-", title="C & <co> ♭", style=style)
+    yield GuitarChord("x-x-12-12-12-x", "--111-", barre=12, title="A", style=style)
+    yield UkuleleChord("0003", style=style)
+    fretboard = GuitarFretboard(frets=(0, 12), title="Neck", style=style)
+    fretboard.add_notes(["C", "E", "G"], label="note", root_color="red")
+    fretboard.add_marker(1, 3, color="blue", label="x", font_color="yellow")
+    fretboard.add_string_label(0, "E", font_color="purple")
+    yield fretboard
+
+
+def rules(css_text):
+    """class -> {property: value}, from a stylesheet"""
+    return {
+        name: parse_declarations(body)
+        for name, body in re.findall(r"\.([\w-]+)\{([^}]*)\}", css_text)
+    }
+
+
+def parse_declarations(text):
+    return dict(declaration.split(":", 1) for declaration in text.split(";") if text)
+
+
+def value(text):
+    # CSS lengths have units, attributes needn't
+    text = re.sub(r"^(-?[\d.]+)px$", r"\1", text)
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def drawn(svg, classes=None):
+    """
+    What each element draws, as (tag, attributes, text), with its class's
+    rules and its style attribute applied
+    """
+    root = ET.fromstring(svg.encode("utf-8"))
+    if classes is None:
+        style = root.find(f"{SVG}style")
+        classes = rules(style.text) if style is not None else {}
+    elements = []
+    for element in root:
+        tag = element.tag[len(SVG) :]
+        if tag in ("defs", "style"):
+            continue
+        attributes = dict(element.attrib)
+        resolved = dict(classes.get(attributes.pop("class", None), {}))
+        resolved.update(parse_declarations(attributes.pop("style", "")))
+        resolved.update(attributes)
+        elements.append(
+            (tag, {name: value(text) for name, text in resolved.items()}, element.text)
+        )
+    return elements
+
+
+@pytest.mark.parametrize("orientation", ORIENTATIONS)
+def test_draws_the_same(orientation):
+    for diagram in diagrams(orientation):
+        expected = drawn(diagram.render(backend="string").getvalue())
+        assert drawn(diagram.render(backend="css").getvalue()) == expected
+
+
+@pytest.mark.parametrize("orientation", ORIENTATIONS)
+def test_draws_the_same_styled(orientation):
+    overrides = {
+        "marker": {"color": "steelblue", "font_color": "black"},
+        "fret": {"color": "tan", "size": 3},
+    }
+    for diagram in diagrams(orientation, **overrides):
+        expected = drawn(diagram.render(backend="string").getvalue())
+        assert drawn(diagram.render(backend="css").getvalue()) == expected
+
+
+def test_elements_carry_classes():
+    svg = GuitarChord("x32010", "-32-1-").render(backend="css").getvalue()
+    root = ET.fromstring(svg)
+    classes = {element.get("class") for element in root if element.get("class")}
+    assert {"fret", "string", "nut", "marker", "marker-label"} <= classes
+    for element in root.iter(f"{SVG}line"):
+        assert element.get("stroke") is None
+    for element in root.iter(f"{SVG}text"):
+        assert element.get("font-family") is None
+
+
+def test_only_roles_used():
+    svg = GuitarChord("x32010").render(backend="css").getvalue()
+    css_text = ET.fromstring(svg).find(f"{SVG}style").text
+    assert ".fret{" in css_text
+    # no barre, title or background
+    assert ".barre" not in css_text
+    assert ".title" not in css_text
+    assert ".background" not in css_text
+
+
+def test_smaller():
+    fretboard = next(
+        diagram
+        for diagram in diagrams("portrait")
+        if isinstance(diagram, GuitarFretboard)
+    )
+    full = fretboard.render(backend="string").getvalue()
+    assert len(fretboard.render(backend="css").getvalue()) < len(full) * 0.8
+
+
+def test_page_stylesheet():
+    chord = GuitarChord("x32010", "-32-1-", title="C")
+    svg = chord.render(backend=css(embed=False)).getvalue()
+    assert "<style>" not in svg
+
+    page = stylesheet(compile_style(None, GuitarChord.default_style))
+    expected = drawn(chord.render(backend="string").getvalue())
+    assert drawn(svg, rules(page)) == expected
+
+
+def test_songsheet_styles():
+    sheet = Songsheet(
+        [
+            GuitarChord("x32010", title="C"),
+            GuitarChord("320003", title="G", style={"marker": {"color": "red"}}),
+        ]
+    )
+    svg = sheet.render(backend="css").getvalue()
+    css_text = ET.fromstring(svg).find(f"{SVG}style").text
+    assert ".marker{" in css_text
+    assert ".s1-marker{fill:red" in css_text
+    assert 'class="s1-marker"' in svg
@@ -0,0 +1,127 @@
+import pytest
+
+from fretboard2 import GuitarChord, GuitarFretboard, UkuleleChord, backgrounds
+
+BACKENDS = ("svgwrite", "string", "minified", "css")
+
+ORIENTATIONS = ("portrait", "landscape")
+
+# changes to a fretboard, made one after another
+FRETBOARD_CHANGES = (
+    lambda fb: fb.add_marker(0, 3, label="G"),
+    lambda fb: fb.add_marker(2, 2, color="red", label="E", font_color="white"),
+    lambda fb: fb.add_barre(1, (1, 5), "1"),
+    lambda fb: fb.add_string_label(5, "X", font_color="green"),
+    lambda fb: fb.add_notes(["C"], label="note"),
+    lambda fb: setattr(fb, "title", "Changed"),
+    lambda fb: setattr(fb, "title", None),
+    lambda fb: setattr(fb, "frets", (5, 9)),
+    lambda fb: fb.add_marker(3, 7, label="7"),
+)
+
+# changes to a chord, made one after another
+CHORD_CHANGES = (
+    lambda chord: setattr(chord, "fingers", list("-32-1-")),
+    lambda chord: setattr(chord, "positions", [None, 3, 2, 0, 1, 3]),
+    lambda chord: setattr(chord, "fingers", list("-32-14")),
+    lambda chord: setattr(chord, "title", "C"),
+    lambda chord: setattr(chord, "positions", [None, None, 12, 12, 12, None]),
+    lambda chord: setattr(chord, "fingers", list("--111-")),
+    lambda chord: setattr(chord, "barre", 12),
+    lambda chord: setattr(chord, "title", None),
+    lambda chord: setattr(chord, "barre", None),
+    lambda chord: setattr(chord, "positions", [3, 2, 0, 0, 0, 3]),
+)
+
+
+def fresh_fretboard(style, changes):
+    fretboard = GuitarFretboard(frets=(0, 5), title="Neck", style=style)
+    for change in changes:
+        change(fretboard)
+    return fretboard
+
+
+def fresh_chord(style, changes):
+    chord = GuitarChord("x32010", title=None, style=style)
+    for change in changes:
+        change(chord)
+    return chord
+
+
+@pytest.fixture(autouse=True)
+def empty_pool():
+    backgrounds.pool.clear()
+    yield
+    backgrounds.pool.clear()
+
+
+@pytest.mark.parametrize("orientation", ORIENTATIONS)
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_fretboard_rerender(backend, orientation):
+    style = {"drawing": {"orientation": orientation}}
+    fretboard = fresh_fretboard(style, ())
+    first = fretboard.render(backend=backend).getvalue()
+    # unchanged
+    assert fretboard.render(backend=backend).getvalue() == first
+
+    for done in range(1, len(FRETBOARD_CHANGES) + 1):
+        FRETBOARD_CHANGES[done - 1](fretboard)
+        expected = fresh_fretboard(style, FRETBOARD_CHANGES[:done])
+        rendered = fretboard.render(backend=backend).getvalue()
+        # drawn from scratch, not from the pool
+        backgrounds.pool.clear()
+        assert rendered == expected.render(backend=backend).getvalue(), done
+
+
+@pytest.mark.parametrize("orientation", ORIENTATIONS)
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_chord_rerender(backend, orientation):
+    style = {"drawing": {"orientation": orientation}}
+    chord = fresh_chord(style, ())
+    chord.render(backend=backend)
+
+    for done in range(1, len(CHORD_CHANGES) + 1):
+        CHORD_CHANGES[done - 1](chord)
+        expected = fresh_chord(style, CHORD_CHANGES[:done])
+        rendered = chord.render(backend=backend).getvalue()
+        # drawn from scratch, not from the pool
+        backgrounds.pool.clear()
+        assert rendered == expected.render(backend=backend).getvalue(), done
+
+
+def test_chord_reuses_static_layer():
+    chord = GuitarChord("x32010", "-32-1-")
+    chord.render(backend="string")
+    static = chord.fretboard._static
+    assert static is not None
+
+    chord.fingers = list("-32-14")
+    chord.positions = [None, 3, 2, 0, 1, 3]
+    chord.render(backend="string")
+    assert chord.fretboard._static is static
+
+    # a different shape (a title moves everything down) draws it again
+    chord.title = "C"
+    chord.render(backend="string")
+    assert chord.fretboard._static is not static
+
+
+def test_style_change():
+    chord = GuitarChord("x32010", title="C")
+    chord.render(backend="string")
+    chord.style = GuitarChord("x32010", style={"marker": {"color": "red"}}).style
+    expected = GuitarChord("x32010", title="C", style={"marker": {"color": "red"}})
+    assert (
+        chord.render(backend="string").getvalue()
+        == expected.render(backend="string").getvalue()
+    )
+
+
+def test_different_instruments():
+    guitar = GuitarChord("x32010", title="C")
+    ukulele = UkuleleChord("0003", title="C")
+    for chord in (guitar, ukulele, guitar, ukulele):
+        assert (
+            chord.render(backend="string").getvalue()
+            == chord.render(backend="svgwrite").getvalue()
+        )
@@ -0,0 +1,140 @@
+import pytest
+
+from fretboard2 import BassChord, GuitarChord, UkuleleChord
+from fretboard2 import library as library_module
+from fretboard2.library import HEADER, ChordLibrary, LibraryWriter, write_library
+from fretboard2.voicings import find_voicings
+
+
+@pytest.fixture
+def items():
+    return [
+        GuitarChord("x32010", "-32-1-", title="C"),
+        GuitarChord("x-x-12-12-12-x", "--111-", barre=12, title="Ä♭"),
+        {"instrument": "ukulele", "positions": "0003", "fingers": "---3"},
+        {"instrument": "bass", "positions": "x221", "title": "C"},
+        *find_voicings(GuitarChord, "Am7", frets=(0, 5))[:3],
+    ]
+
+
+@pytest.fixture
+def filename(tmp_path, items):
+    filename = str(tmp_path / "chords.fbl")
+    assert write_library(filename, items) == len(items)
+    return filename
+
+
+def test_round_trip(filename, items):
+    with ChordLibrary(filename) as library:
+        assert len(library) == len(items)
+        chords = list(library)
+
+    assert [type(chord) for chord in chords] == [
+        GuitarChord,
+        GuitarChord,
+        UkuleleChord,
+        BassChord,
+        GuitarChord,
+        GuitarChord,
+        GuitarChord,
+    ]
+    assert chords[0].positions == [None, 3, 2, 0, 1, 0]
+    assert chords[0].title == "C"
+    assert (chords[1].barre, chords[1].title) == (12, "Ä♭")
+    assert chords[2].title is None
+    assert chords[3].title == "C"
+    voicing = items[4]
+    assert chords[4].positions == list(voicing.positions)
+    assert chords[4].title == "Am7"
+
+
+def test_renders_the_same(filename, items):
+    with ChordLibrary(filename) as library:
+        assert library[1].render().getvalue() == items[1].render().getvalue()
+
+
+def test_records(filename):
+    with ChordLibrary(filename) as library:
+        records = list(library.records())
+        assert records[0] == (GuitarChord, [None, 3, 2, 0, 1, 0], "-32-1-", None, "C")
+        assert library.record(-1) == records[-1]
+
+
+def test_records_in_chunks(tmp_path, monkeypatch):
+    monkeypatch.setattr(library_module, "_CHUNK", 2)
+    filename = str(tmp_path / "chunks.fbl")
+    write_library(filename, [GuitarChord(f"x{fret}2010") for fret in range(5)])
+    with ChordLibrary(filename) as library:
+        assert [record[1][1] for record in library.records()] == [0, 1, 2, 3, 4]
+
+
+def test_slicing(filename):
+    with ChordLibrary(filename) as library:
+        view = library[2:4]
+        assert len(view) == 2
+        assert [type(chord) for chord in view] == [UkuleleChord, BassChord]
+        assert view[1].positions == library[3].positions
+        assert [chord.title for chord in library[:2:-2]] == ["Am7", "Am7"]
+        assert len(library[::-1]) == len(library)
+        assert library[::-1][0].positions == library[-1].positions
+        with pytest.raises(IndexError):
+            view[2]
+        with pytest.raises(IndexError):
+            library[len(library)]
+
+
+def test_writer_counts(tmp_path):
+    filename = str(tmp_path / "empty.fbl")
+    with LibraryWriter(filename) as writer:
+        pass
+    assert writer.count == 0
+    with ChordLibrary(filename) as library:
+        assert len(library) == 0
+        assert list(library) == []
+
+
+@pytest.mark.parametrize(
+    "item",
+    [
+        {"type": "fretboard"},
+        {"positions": "x32010", "style": {}},
+        {"positions": "x-300-1"},
+        {"instrument": "banjo"},
+    ],
+)
+def test_rejects_unstorable(tmp_path, item):
+    with pytest.raises(ValueError):
+        write_library(str(tmp_path / "bad.fbl"), [item])
+
+
+def test_rejects_wrong_magic(tmp_path):
+    filename = tmp_path / "wrong.fbl"
+    filename.write_bytes(b"nope" * 20)
+    with pytest.raises(ValueError, match="isn't a chord library"):
+        ChordLibrary(str(filename))
+
+
+def test_rejects_short_header(tmp_path):
+    filename = tmp_path / "short.fbl"
+    filename.write_bytes(b"FB2CHORD")
+    with pytest.raises(ValueError, match="isn't a chord library"):
+        ChordLibrary(str(filename))
+
+
+def test_rejects_truncated(filename, tmp_path):
+    with open(filename, "rb") as fd:
+        data = fd.read()
+    truncated = tmp_path / "truncated.fbl"
+    truncated.write_bytes(data[: HEADER.size + 10])
+    with pytest.raises(ValueError, match="is truncated"):
+        ChordLibrary(str(truncated))
+
+
+def test_rejects_other_versions(filename, tmp_path):
+    with open(filename, "rb") as fd:
+        data = bytearray(fd.read())
+    data[8] = 99
+    other = tmp_path / "other.fbl"
+    other.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="version"):
+        ChordLibrary(str(other))
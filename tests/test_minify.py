@@ -0,0 +1,115 @@
+import re
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from fretboard2 import GuitarChord, GuitarFretboard, UkuleleChord
+from fretboard2.backends import minified
+from fretboard2.minify import INITIAL_VALUES
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+ORIENTATIONS = ("portrait", "landscape")
+
+
+def diagrams(orientation):
+    style = {"drawing": {"orientation": orientation}}
+    yield GuitarChord("x32010", "-32-1-", title="C & <co> ♭", style=style)
+    yield GuitarChord("x-x-12-12-12-x", "--111-", barre=12, title="A", style=style)
+    yield UkuleleChord("0003", style=style)
+    fretboard = GuitarFretboard(frets=(0, 12), title="Neck", style=style)
+    fretboard.add_notes(["C", "E", "G"], label="note")
+    fretboard.add_string_label(0, "E")
+    yield fretboard
+
+
+def normalise(value, precision):
+    try:
+        number = float(value)
+    except ValueError:
+        return value
+    return float(f"{number:.{precision}f}")
+
+
+def drawn(svg, precision):
+    """
+    What each element draws, as (tag, attributes, text): with attributes set
+    by groups applied, numbers rounded, and initial values left out
+    """
+    initial = {
+        name: normalise(value, precision) for name, value in INITIAL_VALUES.items()
+    }
+    elements = []
+
+    def walk(node, inherited):
+        for child in node:
+            tag = child.tag[len(SVG) :]
+            attributes = dict(inherited, **child.attrib)
+            if tag == "g":
+                walk(child, attributes)
+                continue
+            if tag == "defs":
+                continue
+            attributes = {
+                name: normalise(value, precision) for name, value in attributes.items()
+            }
+            attributes = {
+                name: value
+                for name, value in attributes.items()
+                if initial.get(name) != value
+            }
+            elements.append((tag, attributes, child.text))
+
+    walk(ET.fromstring(svg.encode("utf-8")), {})
+    return elements
+
+
+@pytest.mark.parametrize("orientation", ORIENTATIONS)
+@pytest.mark.parametrize("precision", (0, 1, 2))
+def test_draws_the_same(orientation, precision):
+    for diagram in diagrams(orientation):
+        full = diagram.render(backend="string").getvalue()
+        small = diagram.render(backend=minified(precision)).getvalue()
+        assert drawn(small, precision) == drawn(full, precision)
+
+
+@pytest.mark.parametrize("orientation", ORIENTATIONS)
+def test_smaller(orientation):
+    for diagram in diagrams(orientation):
+        full = diagram.render(backend="string").getvalue()
+        small = diagram.render(backend="minified").getvalue()
+        assert len(small) < len(full) * 0.85
+
+
+@pytest.mark.parametrize("precision", (0, 1, 2))
+def test_rounded(precision):
+    chord = GuitarChord("x32010", "-32-1-", title="C")
+    svg = chord.render(backend=minified(precision)).getvalue()
+    decimals = [len(d) for d in re.findall(r'="-?\d*\.(\d+)"', svg)]
+    assert max(decimals, default=0) == precision
+    # no trailing zeros, nor leading ones
+    assert not re.search(r'="-?\d*\.\d*0"', svg)
+    assert not re.search(r'="-?0\.\d', svg)
+
+
+def test_no_initial_values():
+    svg = GuitarChord("x32010", title="C").render(backend="minified").getvalue()
+    root = ET.fromstring(svg)
+    for element in root.iter():
+        for name, value in element.attrib.items():
+            assert INITIAL_VALUES.get(name) != value, (element.tag, name)
+
+
+def test_no_declaration():
+    svg = GuitarChord("x32010").render(backend="minified").getvalue()
+    assert svg.startswith("<svg ")
+    assert "baseProfile" not in svg
+    assert "xmlns:ev" not in svg
+
+
+def test_groups_shared_attributes():
+    svg = GuitarChord("x32010").render(backend="minified").getvalue()
+    root = ET.fromstring(svg)
+    frets = root.find(f"{SVG}g")
+    assert frets.get("stroke") == "darkgray"
+    assert all(line.get("stroke") is None for line in frets)
@@ -0,0 +1,121 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from fretboard2 import GuitarChord, UkuleleChord
+from fretboard2.naming import identify, identify_many, title_matches
+
+
+@pytest.mark.parametrize(
+    "positions, name",
+    [
+        ("x32010", "C"),
+        ("320003", "G"),
+        ("xx0232", "D"),
+        ("022100", "E"),
+        ("x02210", "Am"),
+        ("x21202", "B7"),
+        ("xx0212", "D7"),
+        ("x02010", "Am7"),
+        ("x3201x", "C"),
+    ],
+)
+def test_known_shapes(positions, name):
+    match = identify(positions, GuitarChord)[0]
+    assert match.name == name
+    assert match.inversion == 0
+
+
+@pytest.mark.parametrize(
+    "positions, name, bass, inversion",
+    [
+        ("032010", "C/E", 4, 1),
+        ("332010", "C/G", 7, 2),
+    ],
+)
+def test_inversions(positions, name, bass, inversion):
+    match = identify(positions, GuitarChord)[0]
+    assert (match.name, match.root, match.bass, match.inversion) == (
+        name,
+        0,
+        bass,
+        inversion,
+    )
+
+
+def test_alternatives_follow():
+    names = [match.name for match in identify("x02210", GuitarChord)]
+    assert names == ["Am", "C6/A"]
+
+
+def test_flats():
+    assert identify("x46654", GuitarChord, flats=True)[0].name == "Dbm"
+
+
+def test_other_instruments():
+    assert identify("0003", UkuleleChord)[0].name == "C"
+
+
+def test_unknown_and_silent():
+    assert identify("xxxxxx", GuitarChord) == []
+    # A and D#
+    assert identify("x012xx", GuitarChord) == []
+
+
+def test_identify_many():
+    names = [
+        match and match.name
+        for match in identify_many(
+            ["x32010", "032010", "xxxxxx", "x32010", [None, 0, 2, 2, 1, 0]],
+            GuitarChord,
+        )
+    ]
+    assert names == ["C", "C/E", None, "C", "Am"]
+
+
+def test_identify_many_forgets(monkeypatch):
+    from fretboard2 import naming as module
+
+    monkeypatch.setattr(module, "_SEEN_CACHE_SIZE", 1)
+    shapes = ["x32010", "320003", "x32010", "320003"]
+    names = [match.name for match in identify_many(shapes, GuitarChord)]
+    assert names == ["C", "G", "C", "G"]
+
+
+def test_title_matches():
+    assert title_matches(GuitarChord("x32010", title="C"))
+    assert title_matches(GuitarChord("032010", title="C/E"))
+    assert title_matches(GuitarChord("x46654", title="Dbmin"))
+    assert not title_matches(GuitarChord("032010", title="C"))
+    assert not title_matches(GuitarChord("x32010", title="G"))
+    assert not title_matches(GuitarChord("x32010"))
+
+
+def test_exported_after_auto_title():
+    # in a new interpreter, as fretboard2 keeps what it has imported
+    script = """
+from fretboard2 import GuitarChord
+GuitarChord.auto_title = True
+GuitarChord("x32010").render()
+import fretboard2.naming
+from fretboard2 import identify
+print(identify("032010", GuitarChord)[0].name)
+"""
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "C/E"
+
+
+def test_auto_title():
+    class Titled(GuitarChord):
+        auto_title = True
+
+    assert Titled("032010").get_title() == "C/E"
+    assert Titled("032010", title="E bass").get_title() == "E bass"
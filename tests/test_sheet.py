@@ -0,0 +1,120 @@
+import gzip
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from fretboard2 import GuitarChord, GuitarFretboard, Songsheet, UkuleleChord
+
+SVG = "{http://www.w3.org/2000/svg}"
+XLINK = "{http://www.w3.org/1999/xlink}"
+
+
+def parse(svg):
+    return ET.fromstring(svg.encode("utf-8"))
+
+
+def sheet():
+    return Songsheet(
+        [
+            GuitarChord("xx0232", "---132", title="D"),
+            GuitarChord("320003", "21---3", title="G"),
+            {"instrument": "ukulele", "positions": "0003", "title": "C"},
+            GuitarChord("x02020", title="A7"),
+            GuitarChord("x32010"),
+        ],
+        columns=2,
+    )
+
+
+@pytest.mark.parametrize("backend", ("string", "svgwrite"))
+def test_grids_shared(backend):
+    root = parse(sheet().render(backend=backend).getvalue())
+    symbols = root.findall(f"{SVG}defs/{SVG}symbol")
+    # titled open guitar, ukulele, untitled open guitar
+    assert len(symbols) == 3
+
+    groups = root.findall(f"{SVG}g")
+    assert len(groups) == 5
+    uses = [group.find(f"{SVG}use").get(f"{XLINK}href") for group in groups]
+    assert uses == ["#grid-0", "#grid-0", "#grid-1", "#grid-0", "#grid-2"]
+    assert {symbol.get("id") for symbol in symbols} == {"grid-0", "grid-1", "grid-2"}
+
+
+def test_layout():
+    root = parse(sheet().render(backend="string").getvalue())
+    assert (root.get("width"), root.get("height")) == ("600", "1200")
+    transforms = [group.get("transform") for group in root.findall(f"{SVG}g")]
+    assert transforms == [
+        "translate(0,0)",
+        "translate(300,0)",
+        "translate(0,400)",
+        "translate(300,400)",
+        "translate(0,800)",
+    ]
+
+
+def test_each_diagram_keeps_its_own_parts():
+    root = parse(sheet().render(backend="string").getvalue())
+    titles = [
+        [text.text for text in group.iter(f"{SVG}text")][-1]
+        for group in root.findall(f"{SVG}g")[:4]
+    ]
+    assert titles == ["D", "G", "C", "A7"]
+    # the D has three fingers, the G three too
+    circles = [
+        len(list(group.iter(f"{SVG}circle"))) for group in root.findall(f"{SVG}g")
+    ]
+    assert circles[:2] == [3, 3]
+
+
+def test_backends_match():
+    assert (
+        sheet().render(backend="string").getvalue()
+        == sheet().render(backend="svgwrite").getvalue()
+    )
+
+
+def test_smaller_than_separate_diagrams():
+    shapes = (("xx0232", "D"), ("320003", "G"), ("x02020", "A7")) * 4
+    diagrams = [GuitarChord(positions, title=title) for positions, title in shapes]
+    separate = sum(
+        len(diagram.render(backend="string").getvalue()) for diagram in diagrams
+    )
+    combined = len(Songsheet(diagrams).render(backend="string").getvalue())
+    # each grid is drawn once, rather than for every diagram
+    assert combined < separate * 0.6
+
+
+def test_fretboards():
+    fretboard = GuitarFretboard(frets=(0, 12), title="C major")
+    fretboard.add_notes(["C", "E", "G"], label="note")
+    root = parse(
+        Songsheet([fretboard, GuitarChord("x32010")])
+        .render(backend="string")
+        .getvalue()
+    )
+    assert len(root.findall(f"{SVG}defs/{SVG}symbol")) == 2
+
+
+def test_empty():
+    root = parse(Songsheet().render(backend="string").getvalue())
+    assert root.findall(f"{SVG}g") == []
+
+
+def test_stream_and_save(tmp_path):
+    expected = sheet().render(backend="string").getvalue()
+
+    sheet().save(str(tmp_path / "sheet.svg"), backend="string")
+    assert (tmp_path / "sheet.svg").read_text() == expected
+
+    sheet().save(str(tmp_path / "sheet.svgz"), backend="string")
+    assert gzip.decompress((tmp_path / "sheet.svgz").read_bytes()).decode() == expected
+
+
+def test_ukulele_only():
+    root = parse(
+        Songsheet([UkuleleChord("0003"), UkuleleChord("2010")])
+        .render(backend="string")
+        .getvalue()
+    )
+    assert len(root.findall(f"{SVG}defs/{SVG}symbol")) == 1
@@ -0,0 +1,171 @@
+import gzip
+import json
+import os
+
+import pytest
+
+from fretboard2 import GuitarChord
+from fretboard2.store import OutputStore
+
+
+def save_song(store, directory, song, chords):
+    for name, positions in chords.items():
+        GuitarChord(positions, title=name).save(
+            os.path.join(directory, song, f"{name}.svg"), store=store
+        )
+
+
+def test_dedupes_with_links(tmp_path):
+    directory = str(tmp_path)
+    with OutputStore(directory) as store:
+        for song in ("one", "two", "three"):
+            save_song(store, directory, song, {"C": "x32010", "G": "320003"})
+
+    assert store.stats["saved"] == 6
+    assert store.stats["rendered"] == 2
+    assert store.stats["documents"] == 2
+
+    c_files = [tmp_path / song / "C.svg" for song in ("one", "two", "three")]
+    # three files, and the document in the store
+    assert {os.stat(path).st_nlink for path in c_files} == {4}
+    assert len({os.stat(path).st_ino for path in c_files}) == 1
+    document = store.path(store.files["one/C.svg"])
+    assert os.path.samefile(c_files[0], document)
+    expected = GuitarChord("x32010", title="C").render().getvalue()
+    assert c_files[0].read_text(encoding="utf-8") == expected
+
+
+def test_copies_without_links(tmp_path):
+    directory = str(tmp_path)
+    with OutputStore(directory, link=False) as store:
+        save_song(store, directory, "one", {"C": "x32010"})
+        save_song(store, directory, "two", {"C": "x32010"})
+
+    assert os.stat(tmp_path / "one" / "C.svg").st_nlink == 1
+    assert (tmp_path / "one" / "C.svg").read_bytes() == (
+        tmp_path / "two" / "C.svg"
+    ).read_bytes()
+
+
+def test_compressed(tmp_path):
+    directory = str(tmp_path)
+    with OutputStore(directory) as store:
+        GuitarChord("x32010").save(str(tmp_path / "C.svgz"), store=store)
+        GuitarChord("x32010").save(str(tmp_path / "C.svg"), store=store)
+
+    assert store.stats["documents"] == 2
+    svg = (tmp_path / "C.svg").read_bytes()
+    assert gzip.decompress((tmp_path / "C.svgz").read_bytes()) == svg
+
+
+def test_manifest(tmp_path):
+    directory = str(tmp_path)
+    with OutputStore(directory) as store:
+        save_song(store, directory, "one", {"C": "x32010", "G": "320003"})
+
+    with open(tmp_path / "manifest.json") as fd:
+        manifest = json.load(fd)
+    assert manifest == store.files
+    assert sorted(manifest) == ["one/C.svg", "one/G.svg"]
+    assert store.changed() == ["one/C.svg", "one/G.svg"]
+    assert store.removed() == []
+
+
+def test_changed_since_last_manifest(tmp_path):
+    directory = str(tmp_path)
+    with OutputStore(directory) as store:
+        save_song(
+            store, directory, "one", {"C": "x32010", "G": "320003", "D": "xx0232"}
+        )
+
+    # G is now played differently, D is gone and Am is new
+    with OutputStore(directory) as store:
+        save_song(
+            store, directory, "one", {"C": "x32010", "G": "320033", "Am": "x02210"}
+        )
+        assert store.changed() == ["one/Am.svg", "one/G.svg"]
+        assert store.removed() == ["one/D.svg"]
+        assert store.stats["unchanged"] == 1
+
+    # nothing changed
+    with OutputStore(directory) as store:
+        save_song(
+            store, directory, "one", {"C": "x32010", "G": "320033", "Am": "x02210"}
+        )
+        assert store.changed() == []
+        assert store.removed() == []
+        assert store.stats["unchanged"] == 3
+        assert store.stats["documents"] == 0
+
+
+def test_no_manifest_after_failure(tmp_path):
+    directory = str(tmp_path)
+    with pytest.raises(RuntimeError):
+        with OutputStore(directory) as store:
+            save_song(store, directory, "one", {"C": "x32010"})
+            raise RuntimeError
+    assert not os.path.exists(tmp_path / "manifest.json")
+
+
+def test_outside_directory(tmp_path):
+    store = OutputStore(str(tmp_path / "out"))
+    with pytest.raises(ValueError):
+        store.add(str(tmp_path / "elsewhere.svg"), b"<svg/>")
+
+
+def test_plain_save_leaves_links_alone(tmp_path):
+    directory = str(tmp_path)
+    with OutputStore(directory) as store:
+        for song in ("one", "two"):
+            save_song(store, directory, song, {"C": "x32010"})
+    c = (tmp_path / "two" / "C.svg").read_bytes()
+
+    # saved over, without the store
+    GuitarChord("320003", title="C").save(str(tmp_path / "one" / "C.svg"))
+
+    assert (tmp_path / "two" / "C.svg").read_bytes() == c
+    assert store._stored(store.files["two/C.svg"], ".svg")
+    assert os.stat(tmp_path / "one" / "C.svg").st_nlink == 1
+    assert os.stat(tmp_path / "two" / "C.svg").st_nlink == 2
+
+    # saving with the store again links it back
+    with OutputStore(directory) as store:
+        for song in ("one", "two"):
+            save_song(store, directory, song, {"C": "x32010"})
+    assert (tmp_path / "one" / "C.svg").read_bytes() == c
+    assert os.stat(tmp_path / "one" / "C.svg").st_nlink == 3
+    assert store.changed() == []
+
+
+def test_replaces_documents_written_over(tmp_path):
+    directory = str(tmp_path)
+    with OutputStore(directory) as store:
+        for song in ("one", "two"):
+            save_song(store, directory, song, {"C": "x32010"})
+    c = (tmp_path / "two" / "C.svg").read_bytes()
+
+    # written over in place, through a link, as an editor might
+    with open(tmp_path / "one" / "C.svg", "w") as fd:
+        fd.write("<svg/>")
+    assert (tmp_path / "two" / "C.svg").read_bytes() == b"<svg/>"
+
+    with OutputStore(directory) as store:
+        for song in ("one", "two"):
+            save_song(store, directory, song, {"C": "x32010"})
+        assert store.stats["documents"] == 1
+    for song in ("one", "two"):
+        assert (tmp_path / song / "C.svg").read_bytes() == c
+
+
+def test_replaces_copies_written_over(tmp_path):
+    directory = str(tmp_path)
+    with OutputStore(directory, link=False) as store:
+        save_song(store, directory, "one", {"C": "x32010"})
+    c = (tmp_path / "one" / "C.svg").read_bytes()
+
+    GuitarChord("320003", title="C").save(str(tmp_path / "one" / "C.svg"))
+
+    with OutputStore(directory, link=False) as store:
+        save_song(store, directory, "one", {"C": "x32010"})
+        assert store.stats["unchanged"] == 0
+    assert (tmp_path / "one" / "C.svg").read_bytes() == c
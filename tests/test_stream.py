@@ -0,0 +1,109 @@
+import gzip
+import io
+import socket
+
+import pytest
+
+from fretboard2 import GuitarChord, GuitarFretboard, RenderCache
+from fretboard2.stream import is_compressed, write_fragments
+
+
+def chord():
+    return GuitarChord("x32010", "-32-1-", title="C ♭ & <co>")
+
+
+def fretboard():
+    fretboard = GuitarFretboard(frets=(0, 12), title="Neck")
+    fretboard.add_notes(["C", "E", "G"], label="note")
+    return fretboard
+
+
+class Recorder(io.BytesIO):
+    """A binary file, noting each write"""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, data):
+        self.writes += 1
+        return super().write(data)
+
+
+@pytest.mark.parametrize("make", (chord, fretboard))
+@pytest.mark.parametrize("backend", ("string", "svgwrite", "minified", "css"))
+def test_stream_matches_render(make, backend):
+    expected = make().render(backend=backend).getvalue().encode("utf-8")
+    output = io.BytesIO()
+    written = make().stream(output, backend=backend)
+    assert output.getvalue() == expected
+    assert written == len(expected)
+
+
+@pytest.mark.parametrize("make", (chord, fretboard))
+def test_compressed(make):
+    expected = make().render(backend="string").getvalue().encode("utf-8")
+    first, second = io.BytesIO(), io.BytesIO()
+    make().stream(first, backend="string", compress=True)
+    make().stream(second, backend="string", compress=True)
+    assert gzip.decompress(first.getvalue()) == expected
+    # no timestamp, so the same every time
+    assert first.getvalue() == second.getvalue()
+
+
+def test_text_files():
+    output = io.StringIO()
+    chord().stream(output, backend="string")
+    assert output.getvalue() == chord().render(backend="string").getvalue()
+    with pytest.raises(ValueError):
+        chord().stream(io.StringIO(), compress=True)
+
+
+def test_buffered():
+    fragments = ["a" * 10] * 10
+    output = Recorder()
+    assert write_fragments(fragments, output, buffer_size=25) == 100
+    assert output.getvalue() == b"a" * 100
+    # at 30, 60 and 90 characters (the first past 25 each time), then the rest
+    assert output.writes == 4
+
+
+def test_socket():
+    expected = chord().render(backend="string").getvalue().encode("utf-8")
+    ours, theirs = socket.socketpair()
+    with ours, theirs:
+        chord().stream(ours, backend="string")
+        ours.shutdown(socket.SHUT_WR)
+        received = b""
+        while True:
+            data = theirs.recv(65536)
+            if not data:
+                break
+            received += data
+    assert received == expected
+
+
+def test_cached():
+    cache = RenderCache()
+    expected = chord().render(backend="string").getvalue().encode("utf-8")
+    for _ in range(2):
+        output = io.BytesIO()
+        chord().stream(output, backend="string", cache=cache)
+        assert output.getvalue() == expected
+    assert cache.stats.hits == 1
+
+
+@pytest.mark.parametrize("make", (chord, fretboard))
+def test_save(tmp_path, make):
+    expected = make().render(backend="string").getvalue()
+    make().save(str(tmp_path / "plain.svg"), backend="string")
+    make().save(str(tmp_path / "packed.svgz"), backend="string")
+    assert (tmp_path / "plain.svg").read_text() == expected
+    packed = (tmp_path / "packed.svgz").read_bytes()
+    assert gzip.decompress(packed).decode("utf-8") == expected
+
+
+def test_is_compressed():
+    assert is_compressed("a.svgz")
+    assert is_compressed("A.SVG.GZ")
+    assert not is_compressed("a.svg")
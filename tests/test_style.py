@@ -0,0 +1,80 @@
+import copy
+import pickle
+
+import pytest
+
+from fretboard2 import GuitarChord, GuitarFretboard, Style, compile_style
+from fretboard2 import style as style_module
+from fretboard2._defaults import DEFAULTS
+
+
+def test_defaults():
+    style = compile_style()
+    assert isinstance(style, Style)
+    assert style.drawing.orientation == "portrait"
+    assert style.marker.color == "black"
+    assert style.fret.label.font_size == "80%"
+
+
+def test_override():
+    style = compile_style({"marker": {"color": "red"}, "drawing": {"width": 150}})
+    assert style.marker.color == "red"
+    assert style.drawing.width == 150
+    # the rest are defaults
+    assert style.marker.font_color == "white"
+    assert style.drawing.height == 400
+
+
+def test_unknown_keys_ignored():
+    assert compile_style({"marker": {"shape": "star"}}) == compile_style()
+
+
+def test_defaults_not_changed():
+    before = copy.deepcopy(DEFAULTS)
+    compile_style({"marker": {"color": "red"}, "fret": {"label": {"font_size": 9}}})
+    assert DEFAULTS == before
+
+
+def test_shared():
+    first = compile_style({"marker": {"color": "red", "radius": 3}})
+    # the same override, however it's written
+    assert compile_style({"marker": {"radius": 3, "color": "red"}}) is first
+    assert compile_style(first) is first
+    assert compile_style({"marker": {"color": "blue"}}) is not first
+
+
+def test_shared_by_diagrams():
+    override = {"drawing": {"orientation": "landscape"}}
+    one = GuitarChord("x32010", style=override)
+    two = GuitarChord("320003", style={"drawing": {"orientation": "landscape"}})
+    assert one.style is two.style
+    one.render(backend="string")
+    assert one.fretboard.style is one.style
+
+    fretboards = GuitarFretboard(style=override), GuitarFretboard(style=override)
+    assert fretboards[0].style is fretboards[1].style
+
+
+def test_immutable():
+    style = compile_style()
+    with pytest.raises(AttributeError):
+        style.marker = None
+    with pytest.raises(AttributeError):
+        style.marker.color = "red"
+    with pytest.raises(AttributeError):
+        del style.drawing.width
+
+
+def test_round_trips():
+    style = compile_style({"marker": {"color": "red"}})
+    assert compile_style(style.to_dict()) == style
+    assert pickle.loads(pickle.dumps(style)) == style
+    assert hash(pickle.loads(pickle.dumps(style))) == hash(style)
+
+
+def test_cache_bounded(monkeypatch):
+    monkeypatch.setattr(style_module, "_cache", {})
+    monkeypatch.setattr(style_module, "_CACHE_SIZE", 2)
+    styles = [compile_style({"drawing": {"width": width}}) for width in range(5)]
+    assert len(style_module._cache) <= 2
+    assert [style.drawing.width for style in styles] == list(range(5))
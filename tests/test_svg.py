@@ -0,0 +1,99 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from fretboard2 import (
+    BassChord,
+    BassFretboard,
+    GuitarChord,
+    GuitarFretboard,
+    UkuleleChord,
+    UkuleleFretboard,
+)
+from fretboard2.svg import SVGDrawing
+
+ORIENTATIONS = ("portrait", "landscape")
+
+TITLES = (None, "C", 'A & <B> "c"', "Ä♭m7♯11 – ü")
+
+
+def chords(title, style):
+    yield GuitarChord("x32010", "-32-1-", title=title, style=style)
+    yield GuitarChord("x-x-12-12-12-x", "--111-", barre=12, title=title, style=style)
+    yield BassChord("x221", "-321", title=title, style=style)
+    yield UkuleleChord("0003", "---3", title=title, style=style)
+
+
+def fretboards(title, style):
+    fretboard = GuitarFretboard(frets=(0, 12), title=title, style=style)
+    fretboard.add_notes(["C", "E", "G"], label="note")
+    fretboard.add_string_label(0, "x & <y>")
+    yield fretboard
+
+    fretboard = BassFretboard(frets=(3, 7), title=title, style=style)
+    fretboard.add_marker(0, 5, color="red", label="R", font_color="white")
+    fretboard.add_barre(5, (1, 3), "1")
+    yield fretboard
+
+    fretboard = UkuleleFretboard(frets=(0, 5), title=title, style=style)
+    fretboard.add_notes(["1", "b3", "5"], label="interval", root="A", root_color="red")
+    yield fretboard
+
+
+def diagrams(title, style):
+    yield from chords(title, style)
+    yield from fretboards(title, style)
+
+
+@pytest.mark.parametrize("orientation", ORIENTATIONS)
+@pytest.mark.parametrize("title", TITLES)
+def test_string_backend_matches_svgwrite(orientation, title):
+    style = {"drawing": {"orientation": orientation}}
+    for diagram in diagrams(title, style):
+        expected = diagram.render(backend="svgwrite").getvalue()
+        assert diagram.render(backend="string").getvalue() == expected
+
+
+@pytest.mark.parametrize("orientation", ORIENTATIONS)
+def test_string_backend_matches_svgwrite_styled(orientation):
+    style = {
+        "drawing": {
+            "orientation": orientation,
+            "background_color": "ivory",
+            "font_family": 'Fira "Sans" & co',
+            "label_all_frets": False,
+        },
+        "marker": {"color": "steelblue"},
+    }
+    for diagram in diagrams("Styled", style):
+        expected = diagram.render(backend="svgwrite").getvalue()
+        assert diagram.render(backend="string").getvalue() == expected
+
+
+@pytest.mark.parametrize("title", TITLES)
+def test_escaped(title):
+    svg = GuitarChord("x32010", title=title).render(backend="string").getvalue()
+    root = ET.fromstring(svg.encode("utf-8"))
+    texts = [element.text for element in root.iter("{http://www.w3.org/2000/svg}text")]
+    if title is not None:
+        assert title in texts
+
+
+def test_backend_selected_globally(monkeypatch):
+    chord = GuitarChord("x32010", title="C")
+    expected = chord.render(backend="string").getvalue()
+
+    calls = []
+
+    def backend(size):
+        calls.append(size)
+        return SVGDrawing(size)
+
+    monkeypatch.setattr(GuitarFretboard, "backend", staticmethod(backend))
+    assert GuitarChord("x32010", title="C").render().getvalue() == expected
+    assert len(calls) == 1
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError, match="Unknown backend"):
+        GuitarChord("x32010").render(backend="png")
@@ -0,0 +1,95 @@
+import pytest
+
+from fretboard2 import GuitarChord, UkuleleChord
+from fretboard2.voicings import VoicingIndex, assign_fingers, find_voicings
+
+
+def shapes(voicings):
+    return {voicing.positions_string: voicing.fingers_string for voicing in voicings}
+
+
+@pytest.mark.parametrize(
+    "name, positions, fingers",
+    [
+        ("C", "x32010", "-32-1-"),
+        ("G", "320003", "21---3"),
+        ("D", "xx0232", "---121"),
+        ("A", "x02220", "--111-"),
+        ("E", "022100", "-231--"),
+        ("Am", "x02210", "--231-"),
+        ("Em", "022000", "-11---"),
+        ("Dm", "xx0231", "---231"),
+        ("F", "133211", "134211"),
+    ],
+)
+def test_open_shapes(name, positions, fingers):
+    found = shapes(find_voicings(GuitarChord, name, frets=(0, 3)))
+    assert found[positions] == fingers
+
+
+def test_ukulele():
+    assert "0003" in shapes(find_voicings(UkuleleChord, "C", frets=(0, 3)))
+
+
+def test_limits():
+    for voicing in find_voicings(GuitarChord, "C", frets=(0, 12), max_span=3):
+        assert voicing.span <= 3
+        assert max(f for f in voicing.fingers if f is not None) <= 4
+
+
+def test_root_in_bass():
+    found = shapes(find_voicings(GuitarChord, "C", frets=(0, 3), root_in_bass=True))
+    assert "x32010" in found
+    assert "032010" not in found
+
+
+def test_easiest_first():
+    voicings = find_voicings(GuitarChord, "Am", frets=(0, 12))
+    highest = [max(f for f in v.positions if f is not None) for v in voicings]
+    assert highest == sorted(highest)
+
+
+def test_assign_fingers():
+    assert assign_fingers([None, 3, 2, 0, 1, 0]) == [None, 3, 2, None, 1, None]
+    # a barre on the first fret
+    assert assign_fingers([1, 3, 3, 2, 1, 1]) == [1, 3, 4, 2, 1, 1]
+    # five fingers
+    assert assign_fingers([1, 2, 3, 4, 5, None]) is None
+
+
+def test_index_enharmonics():
+    index = VoicingIndex(GuitarChord, frets=(0, 5))
+    sharp = [v.positions for v in index.query("C#m", limit=3)]
+    flat = [v.positions for v in index.query("Dbm", limit=3)]
+    assert len(sharp) == 3
+    assert sharp == flat
+    assert len(index) == 1
+
+
+def test_frets_as_a_list():
+    assert shapes(find_voicings(GuitarChord, "C", frets=[0, 3])) == shapes(
+        find_voicings(GuitarChord, "C", frets=(0, 3))
+    )
+
+
+def test_index_save_and_load(tmp_path):
+    filename = str(tmp_path / "index.json")
+    index = VoicingIndex(GuitarChord, frets=(0, 5))
+    saved = [v.positions for v in index.query("C")]
+    index.save(filename)
+
+    loaded = VoicingIndex.load(filename, GuitarChord)
+    assert len(loaded) == 1
+    assert [v.positions for v in loaded.query("C")] == saved
+    # not in the saved index, so searched for with the options loaded
+    assert [v.positions for v in loaded.query("G", limit=3)] == [
+        v.positions for v in VoicingIndex(GuitarChord, frets=(0, 5)).query("G", limit=3)
+    ]
+    assert len(loaded) == 2
+
+
+def test_index_load_checks_instrument(tmp_path):
+    filename = str(tmp_path / "index.json")
+    VoicingIndex(UkuleleChord, frets=(0, 5)).build(["m"]).save(filename)
+    with pytest.raises(ValueError, match="UkuleleChord"):
+        VoicingIndex.load(filename, GuitarChord)